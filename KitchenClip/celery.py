@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_shutdown
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'KitchenClip.settings')
@@ -15,3 +16,10 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+
+
+@worker_process_shutdown.connect
+def close_http_clients(**kwargs):
+    """Release pooled outbound connections when a worker process exits."""
+    from recipes.http_client import close_clients
+    close_clients()
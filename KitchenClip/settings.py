@@ -140,6 +140,10 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Uploaded and generated files (cached recipe images)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", str(BASE_DIR / 'media'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -168,6 +172,71 @@ DEFAULT_DINNER_TIME = "18:30"
 BEACON_URL = os.environ.get("BEACON_URL", "https://beacon.soehlert.com/homeassistant/alert")
 ENABLE_COOKING_NOTIFICATIONS = os.environ.get("ENABLE_COOKING_NOTIFICATIONS", "0") == "1"
 
+# Outbound HTTP (shared connection pool used by parsers and notifications)
+HTTP_CLIENT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_TIMEOUT", "15"))
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.environ.get("HTTP_CLIENT_MAX_CONNECTIONS", "20"))
+HTTP_CLIENT_MAX_KEEPALIVE = int(os.environ.get("HTTP_CLIENT_MAX_KEEPALIVE", "10"))
+HTTP_CLIENT_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_CLIENT_KEEPALIVE_EXPIRY", "30"))
+HTTP_CLIENT_PER_HOST_CONNECTIONS = int(os.environ.get("HTTP_CLIENT_PER_HOST_CONNECTIONS", "4"))
+# Requires the optional 'h2' package (pip install "kitchenclip[http2]")
+HTTP_CLIENT_HTTP2 = os.environ.get("HTTP_CLIENT_HTTP2", "0") == "1"
+
+# Raw HTML cache for fetched recipe pages (revalidated with ETag/Last-Modified)
+HTML_CACHE_ENABLED = os.environ.get("HTML_CACHE_ENABLED", "1") == "1"
+HTML_CACHE_DIR = os.environ.get("HTML_CACHE_DIR", str(BASE_DIR / 'data' / 'html_cache'))
+HTML_CACHE_TTL = int(os.environ.get("HTML_CACHE_TTL", str(60 * 60 * 24)))
+HTML_CACHE_MAX_BYTES = int(os.environ.get("HTML_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Recipe pages are streamed: never read more than FETCH_MAX_BYTES, and stop
+# as soon as a complete Recipe JSON-LD block has arrived.
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+FETCH_STOP_AT_RECIPE = os.environ.get("FETCH_STOP_AT_RECIPE", "1") == "1"
+
+# Per-domain fetch politeness. Token buckets, concurrency leases and backoff
+# state live in Redis so every web and Celery process shares one budget per
+# site; an empty URL keeps the state per-process.
+FETCH_STATE_REDIS_URL = os.environ.get("FETCH_STATE_REDIS_URL", "redis://redis:6379/2")
+FETCH_DOMAIN_RATE = float(os.environ.get("FETCH_DOMAIN_RATE", "1"))  # requests per second
+FETCH_DOMAIN_BURST = int(os.environ.get("FETCH_DOMAIN_BURST", "3"))
+FETCH_DOMAIN_CONCURRENCY = int(os.environ.get("FETCH_DOMAIN_CONCURRENCY", "2"))
+FETCH_MAX_RETRIES = int(os.environ.get("FETCH_MAX_RETRIES", "2"))  # retries after 403/429/503
+FETCH_BACKOFF_BASE = float(os.environ.get("FETCH_BACKOFF_BASE", "2"))
+FETCH_BACKOFF_MAX = float(os.environ.get("FETCH_BACKOFF_MAX", "300"))
+# Longest a single fetch waits for its domain before giving up. Celery and
+# bulk imports use FETCH_MAX_WAIT; a page imported from the web form uses
+# FETCH_INTERACTIVE_MAX_WAIT so it never ties up a gunicorn worker for long.
+FETCH_MAX_WAIT = float(os.environ.get("FETCH_MAX_WAIT", "60"))
+FETCH_INTERACTIVE_MAX_WAIT = float(os.environ.get("FETCH_INTERACTIVE_MAX_WAIT", "5"))
+# Failed URLs are not retried for FETCH_FAILURE_TTL seconds, and a domain is
+# skipped for FETCH_BREAKER_COOLDOWN after FETCH_BREAKER_THRESHOLD failures in a row.
+FETCH_FAILURE_TTL = float(os.environ.get("FETCH_FAILURE_TTL", str(15 * 60)))
+FETCH_BREAKER_THRESHOLD = int(os.environ.get("FETCH_BREAKER_THRESHOLD", "5"))
+FETCH_BREAKER_COOLDOWN = float(os.environ.get("FETCH_BREAKER_COOLDOWN", str(10 * 60)))
+
+# crawl_sitemap: the sitemap protocol caps a file at 50MB uncompressed, and
+# indexes are followed at most SITEMAP_MAX_DEPTH levels deep.
+SITEMAP_MAX_BYTES = int(os.environ.get("SITEMAP_MAX_BYTES", str(50 * 1024 * 1024)))
+SITEMAP_MAX_DEPTH = int(os.environ.get("SITEMAP_MAX_DEPTH", "3"))
+
+# Recipe images are downloaded once and resized into these (width, height)
+# variants under MEDIA_ROOT; a height of None keeps the aspect ratio.
+# Django only serves MEDIA_URL itself in DEBUG, so in production enable this
+# once the web server in front of gunicorn serves MEDIA_ROOT at MEDIA_URL.
+RECIPE_IMAGE_CACHE_ENABLED = os.environ.get("RECIPE_IMAGE_CACHE_ENABLED", "1" if DEBUG else "0") == "1"
+RECIPE_IMAGE_MAX_BYTES = int(os.environ.get("RECIPE_IMAGE_MAX_BYTES", str(15 * 1024 * 1024)))
+RECIPE_IMAGE_SIZES = {
+    "thumb": (96, 96),     # sidebar cards, rendered at 40x40
+    "card": (640, 384),    # recipe list cards and meal plan slots
+    "full": (1200, None),  # recipe detail page
+}
+
+# Share parse_ingredient_line results between processes through the
+# ParsedIngredientLine table (see recipes.parse_cache)
+INGREDIENT_PARSE_CACHE_DB = os.environ.get("INGREDIENT_PARSE_CACHE_DB", "1") == "1"
+
+# Maximum number of pages fetched at once by ParserRegistry.aget_parsers
+PARSER_ASYNC_CONCURRENCY = int(os.environ.get("PARSER_ASYNC_CONCURRENCY", "16"))
+
 # Celery Configuration
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
@@ -176,6 +245,12 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Bulk imports run on their own queue so they never delay the beat-driven tasks
+CELERY_TASK_ROUTES = {
+    'recipes.tasks.import_recipe_task': {'queue': 'imports'},
+    'recipes.tasks.cache_recipe_image_task': {'queue': 'imports'},
+}
+
 CELERY_BEAT_SCHEDULE = {
     'check-upcoming-meals-every-15-mins': {
         'task': 'recipes.tasks.check_upcoming_meals_task',
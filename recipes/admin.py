@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from .models import Ingredient, Recipe, RecipeIngredient, RecipeTag
+from .models import (
+    CrawledUrl,
+    ImportBatch,
+    ImportBatchItem,
+    Ingredient,
+    ParsedIngredientLine,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+)
 
 
 class RecipeIngredientInline(admin.TabularInline):
@@ -24,4 +33,27 @@ class IngredientAdmin(admin.ModelAdmin):
 class RecipeTagAdmin(admin.ModelAdmin):
     list_display = ("name", "slug", "color_preview", "color")
     search_fields = ("name", "slug")
-    readonly_fields = ("color_preview",)
\ No newline at end of file
+    readonly_fields = ("color_preview",)
+
+class ImportBatchItemInline(admin.TabularInline):
+    model = ImportBatchItem
+    extra = 0
+    fields = ("url", "status", "recipe", "error")
+    readonly_fields = fields
+
+@admin.register(ImportBatch)
+class ImportBatchAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_at", "is_future")
+    inlines = [ImportBatchItemInline]
+
+@admin.register(CrawledUrl)
+class CrawledUrlAdmin(admin.ModelAdmin):
+    list_display = ("url", "kind", "lastmod", "updated_at")
+    list_filter = ("kind",)
+    search_fields = ("url",)
+
+@admin.register(ParsedIngredientLine)
+class ParsedIngredientLineAdmin(admin.ModelAdmin):
+    list_display = ("line", "parser_version", "created_at")
+    list_filter = ("parser_version",)
+    search_fields = ("line",)
@@ -19,3 +19,9 @@ class RecipesConfig(AppConfig):
                 connection.cursor().execute('PRAGMA synchronous=NORMAL;')
 
         connection_created.connect(set_wal_mode)
+
+        # Cache a local resized copy whenever a recipe's image_url changes
+        from django.db.models.signals import post_save
+
+        from .images import queue_image_cache
+        post_save.connect(queue_image_cache, sender=self.get_model('Recipe'))
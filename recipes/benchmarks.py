@@ -0,0 +1,191 @@
+"""
+Replays the parser HTML fixtures through the import pipeline and measures
+each stage, so changes to the parsing hot path can be compared against a
+saved baseline instead of guessed at.
+"""
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from pathlib import Path
+
+from recipes.ingredient_processor import (
+    clear_parse_cache,
+    parse_cache_stats,
+    parse_ingredient_line,
+    parse_ingredients,
+    process_ingredients,
+)
+from recipes.parsers.registry import ParserRegistry
+
+FIXTURE_DIR = Path(__file__).resolve().parent / 'parsers' / 'tests' / 'fixtures'
+
+# The page URL each fixture was saved from, so registry routing is exercised too
+FIXTURE_URLS = {
+    'allrecipes_100_grand.html': 'https://www.allrecipes.com/100-grand-bars-recipe-11918066',
+    'houseofnasheats_banana_bread.html': 'https://houseofnasheats.com/best-banana-bread-recipe/',
+    'lesswithlaur_chicken_gnocchi.html': 'https://lesswithlaur.com/one-pan-lemon-chicken-gnocchi/',
+    'mock_recipe.html': 'https://www.allrecipes.com/recipe/99999/mock-recipe/',
+    'purelyyum_shrimp_ramen.html': 'https://purelyyumrecipes.com/spicy-shrimp-ramen-bowls-flavorful-and-quick-meal/',
+}
+DEFAULT_URL = 'https://benchmark.invalid/{name}'
+
+STAGES = ('resolve', 'extract', 'snapshot', 'parse_lines', 'process')
+
+
+def _run_pipeline(url: str, html: str, timer, stage_totals: dict):
+    """Run one page through every stage, adding each stage's cost to stage_totals via timer."""
+    parser_class = timer('resolve', lambda: ParserRegistry.resolve(url), stage_totals)
+    parser = timer('extract', lambda: parser_class(url, html=html), stage_totals)
+    snapshot = timer('snapshot', parser.to_snapshot, stage_totals)
+    lines = [line.strip() for line in snapshot.ingredients if line and line.strip()]
+    # Replaying the same pages would otherwise time nothing but cache hits
+    clear_parse_cache()
+    parsed = timer('parse_lines', lambda: [parse_ingredient_line(line) for line in lines], stage_totals)
+    timer('process', lambda: process_ingredients(parsed), stage_totals)
+    return lines
+
+
+def _time_stage(stage, fn, totals):
+    start = time.perf_counter()
+    result = fn()
+    totals[stage] = totals.get(stage, 0.0) + time.perf_counter() - start
+    return result
+
+
+def _trace_stage(stage, fn, peaks):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    peaks[stage] = max(peaks.get(stage, 0), tracemalloc.get_traced_memory()[1] - before)
+    return result
+
+
+def _parse_per_line(lines: list[str]) -> list[dict]:
+    return process_ingredients([parse_ingredient_line(line) for line in lines])
+
+
+def _lines_per_second(fn, lines: list[str], iterations: int, cold: bool) -> float:
+    elapsed = 0.0
+    for _ in range(iterations):
+        if cold:
+            clear_parse_cache()
+        start = time.perf_counter()
+        fn(lines)
+        elapsed += time.perf_counter() - start
+    return len(lines) * iterations / elapsed if elapsed else 0.0
+
+
+def run_line_benchmark(lines: list[str], iterations: int = 20) -> dict:
+    """
+    Ingredient lines per second through the per-line path (parse_ingredient_line
+    then process_ingredients) and through parse_ingredients, both from an
+    empty parse cache, plus parse_ingredients with every line already cached.
+    fast_path_ratio is the share of lines the tokenizer parsed without the slicer.
+    """
+    results = {
+        'per_line': _lines_per_second(_parse_per_line, lines, iterations, cold=True),
+        'fast_path_ratio': parse_cache_stats()['fast_path_ratio'],
+        'batched': _lines_per_second(parse_ingredients, lines, iterations, cold=True),
+        'batched_cached': _lines_per_second(parse_ingredients, lines, iterations, cold=False),
+    }
+    clear_parse_cache()
+    return results
+
+
+def load_fixtures(directory: Path = FIXTURE_DIR) -> list[tuple[str, str, str]]:
+    """Return (name, url, html) for every .html file in directory."""
+    return [
+        (path.name, FIXTURE_URLS.get(path.name, DEFAULT_URL.format(name=path.stem)), path.read_text())
+        for path in sorted(directory.glob('*.html'))
+    ]
+
+
+def run_benchmark(fixtures: list[tuple[str, str, str]], iterations: int = 20) -> dict:
+    """
+    Time every stage for every fixture.
+
+    Per-stage times are the median over `iterations` runs, in milliseconds.
+    Allocation peaks come from a separate tracemalloc pass so tracing does
+    not distort the timings. Throughput is pages per second across all
+    fixtures and iterations.
+    """
+    # Warm-up: lazy parser imports and regex compilation are not what we measure
+    lines = []
+    for _name, url, html in fixtures:
+        lines.extend(_run_pipeline(url, html, _time_stage, {}))
+
+    per_fixture = {}
+    wall_total = 0.0
+    for name, url, html in fixtures:
+        samples = {stage: [] for stage in STAGES}
+        for _ in range(iterations):
+            totals = {}
+            start = time.perf_counter()
+            _run_pipeline(url, html, _time_stage, totals)
+            wall_total += time.perf_counter() - start
+            for stage in STAGES:
+                samples[stage].append(totals.get(stage, 0.0))
+        per_fixture[name] = {stage: statistics.median(values) * 1000 for stage, values in samples.items()}
+
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for _name, url, html in fixtures:
+            _run_pipeline(url, html, _trace_stage, peaks)
+    finally:
+        tracemalloc.stop()
+
+    pages = len(fixtures) * iterations
+    return {
+        'meta': {
+            'created': datetime.now(UTC).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'iterations': iterations,
+            'fixtures': len(fixtures),
+        },
+        'stages': {
+            stage: {
+                'ms': sum(times[stage] for times in per_fixture.values()),
+                'peak_kb': peaks.get(stage, 0) / 1024,
+            }
+            for stage in STAGES
+        },
+        'fixtures': per_fixture,
+        'pages_per_second': pages / wall_total if wall_total else 0.0,
+        'lines_per_second': run_line_benchmark(lines, iterations),
+    }
+
+
+def compare_results(current: dict, baseline: dict, threshold: float = 0.10, min_delta_ms: float = 0.05) -> list[str]:
+    """
+    Return a description of every metric that regressed by more than
+    `threshold` (0.10 = 10%) against baseline; an empty list means no regression.
+    Stage slowdowns smaller than min_delta_ms are timer noise and are ignored.
+    """
+    regressions = []
+    for stage, stats in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base or not base['ms']:
+            continue
+        change = stats['ms'] / base['ms'] - 1
+        if change > threshold and stats['ms'] - base['ms'] > min_delta_ms:
+            regressions.append(f"{stage}: {base['ms']:.3f} ms -> {stats['ms']:.3f} ms (+{change:.0%})")
+
+    base_pps = baseline.get('pages_per_second')
+    if base_pps:
+        change = current['pages_per_second'] / base_pps - 1
+        if change < -threshold:
+            regressions.append(f"throughput: {base_pps:.1f} -> {current['pages_per_second']:.1f} pages/s ({change:.0%})")
+    return regressions
+
+
+def save_results(results: dict, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+
+
+def load_results(path: Path) -> dict:
+    return json.loads(path.read_text())
@@ -0,0 +1,332 @@
+"""
+Whole-site import from sitemaps.
+
+SitemapCrawler reads a site's sitemap.xml (following sitemap indexes and
+.xml.gz files), keeps the URLs that look like recipe pages and feeds them to
+RecipeImportService in chunks, so the Celery import workers start on the
+first URLs while the rest of the site's sitemaps are still being read.
+
+The <lastmod> of every queued page and followed child sitemap is stored in
+CrawledUrl; a later crawl skips child sitemaps and pages whose lastmod has
+not moved. A page whose import fails loses its CrawledUrl row (see
+RecipeImportService.run_batch_item), so the next crawl queues it again.
+"""
+import logging
+import re
+import tempfile
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, time
+from urllib.parse import urljoin, urlparse
+from xml.etree import ElementTree
+
+import httpx
+from django.conf import settings
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .http_client import BROWSER_HEADERS, http_clients
+from .models import CrawledUrl, ImportBatch
+from .parsers.politeness import (
+    DomainThrottled,
+    domain_key,
+    polite_slot,
+    record_fetch_failure,
+    record_response,
+)
+from .parsers.registry import ParserRegistry
+from .services import RecipeImportService
+
+logger = logging.getLogger(__name__)
+
+_GZIP_MAGIC = b"\x1f\x8b"
+# Most output one decompress() call may produce, so a gzip bomb is caught
+# after at most this much past SITEMAP_MAX_BYTES
+_INFLATE_STEP = 64 * 1024
+# Downloaded sitemaps are spooled to disk past this size
+_SPOOL_BYTES = 1024 * 1024
+_READ_BYTES = 64 * 1024
+
+
+class SitemapError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class SitemapEntry:
+    """One <url> or <sitemap> element; is_sitemap marks index entries."""
+    loc: str
+    lastmod: datetime | None
+    is_sitemap: bool = False
+
+
+@dataclass
+class CrawlStats:
+    sitemaps: int = 0
+    sitemaps_unchanged: int = 0
+    sitemaps_failed: int = 0
+    urls_seen: int = 0
+    urls_filtered: int = 0
+    urls_unchanged: int = 0
+    urls_queued: int = 0
+    urls_duplicate: int = 0
+
+
+def parse_lastmod(value: str | None) -> datetime | None:
+    """Parse a W3C datetime ('2024-05-01', '2024-05-01T10:00:00+02:00') as an aware datetime."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        parsed = None
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _read_entries(parser: ElementTree.XMLPullParser, state: dict) -> Iterator[SitemapEntry]:
+    for event, element in parser.read_events():
+        if event == "start":
+            state.setdefault("root", element)
+            continue
+        kind = _local_name(element.tag)
+        if kind not in ("url", "sitemap"):
+            continue
+
+        values = {_local_name(child.tag): (child.text or "").strip() for child in element}
+        # Drop everything parsed so far; the tree never holds more than one entry
+        state["root"].clear()
+        if values.get("loc"):
+            yield SitemapEntry(values["loc"], parse_lastmod(values.get("lastmod")), kind == "sitemap")
+
+
+def _inflate(decompressor, chunk: bytes) -> Iterator[bytes]:
+    """Decompress chunk in pieces of at most _INFLATE_STEP bytes."""
+    data = chunk
+    while data:
+        yield decompressor.decompress(data, _INFLATE_STEP)
+        data = decompressor.unconsumed_tail
+
+
+def _download(url: str, spool) -> None:
+    """Write the (decompressed) body of url to spool, within SITEMAP_MAX_BYTES."""
+    size = 0
+    decompressor = None
+    with polite_slot(url), http_clients.stream(url, headers=BROWSER_HEADERS) as response:
+        record_response(url, response)
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            if size == 0 and decompressor is None and chunk[:2] == _GZIP_MAGIC:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            for piece in _inflate(decompressor, chunk) if decompressor else (chunk,):
+                size += len(piece)
+                if size > settings.SITEMAP_MAX_BYTES:
+                    raise SitemapError(f"{url} is larger than SITEMAP_MAX_BYTES ({settings.SITEMAP_MAX_BYTES} bytes)")
+                spool.write(piece)
+
+
+def iter_sitemap(url: str) -> Iterator[SitemapEntry]:
+    """
+    Read the <url> and <sitemap> entries of one sitemap file.
+
+    The body (gzip-compressed files included) is downloaded first, into a
+    spooled temporary file, so the politeness slot and the connection are
+    released before any entry is handed to the caller. Entries are then
+    parsed incrementally, so memory stays flat however many the file has.
+    Raises SitemapError for HTTP errors, oversized or malformed files.
+    """
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    state: dict = {}
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES) as spool:
+        try:
+            _download(url, spool)
+        except SitemapError:
+            raise
+        except zlib.error as e:
+            raise SitemapError(f"Corrupt gzip sitemap {url}: {e}") from e
+        except (httpx.HTTPError, DomainThrottled) as e:
+            record_fetch_failure(url, type(e).__name__, domain_failure=False)
+            raise SitemapError(f"Could not fetch sitemap {url}: {e}") from e
+
+        spool.seek(0)
+        try:
+            while chunk := spool.read(_READ_BYTES):
+                parser.feed(chunk)
+                yield from _read_entries(parser, state)
+            parser.close()
+            yield from _read_entries(parser, state)
+        except ElementTree.ParseError as e:
+            raise SitemapError(f"Malformed sitemap {url}: {e}") from e
+
+
+def discover_sitemaps(site_url: str) -> list[str]:
+    """
+    Return the sitemaps to start from. A URL with a path is used as is;
+    a bare site root is looked up in robots.txt, then /sitemap.xml.
+    """
+    parts = urlparse(site_url)
+    if parts.path not in ("", "/"):
+        return [site_url]
+
+    root = f"{parts.scheme}://{parts.netloc}/"
+    robots_url = urljoin(root, "robots.txt")
+    try:
+        with polite_slot(robots_url):
+            response = http_clients.get(robots_url, headers=BROWSER_HEADERS)
+        if response.is_success:
+            found = [
+                line.split(":", 1)[1].strip()
+                for line in response.text.splitlines()
+                if line.lower().startswith("sitemap:")
+            ]
+            if found:
+                return found
+    except (httpx.HTTPError, DomainThrottled) as e:
+        logger.info(f"Could not read {robots_url}: {e}")
+    return [urljoin(root, "sitemap.xml")]
+
+
+class SitemapCrawler:
+    """
+    Crawl the sitemaps of one site and queue changed recipe pages for import.
+
+    include/exclude are regexes matched with re.search against each URL;
+    include defaults to the RECIPE_URL_PATTERNS of the parser ParserRegistry
+    resolves for the site. force ignores the stored lastmods, and dry_run
+    only counts what would be queued.
+    """
+
+    def __init__(self, site_url: str, include: list[str] | None = None, exclude: list[str] = (),
+                 limit: int | None = None, force: bool = False, dry_run: bool = False,
+                 is_future: bool = False, tags=(), chunk_size: int = 500):
+        self.site_url = site_url
+        self.domain = domain_key(site_url)
+        if include is None:
+            include = ParserRegistry.resolve(site_url).RECIPE_URL_PATTERNS
+        self.include = [re.compile(pattern) for pattern in include]
+        self.exclude = [re.compile(pattern) for pattern in exclude]
+        self.limit = limit
+        self.force = force
+        self.dry_run = dry_run
+        self.is_future = is_future
+        self.tags = list(tags)
+        self.chunk_size = chunk_size
+        self.stats = CrawlStats()
+        self.batch: ImportBatch | None = None
+        self._visited: set[str] = set()
+
+    def run(self) -> CrawlStats:
+        chunk_size = min(self.chunk_size, self.limit) if self.limit else self.chunk_size
+        chunk: list[SitemapEntry] = []
+        for entry in self._candidates():
+            chunk.append(entry)
+            if len(chunk) >= chunk_size:
+                self._flush(chunk)
+                chunk = []
+                if self.limit and self.stats.urls_queued >= self.limit:
+                    return self.stats
+        self._flush(chunk)
+        return self.stats
+
+    def _candidates(self) -> Iterator[SitemapEntry]:
+        for sitemap_url in discover_sitemaps(self.site_url):
+            yield from self._crawl_sitemap(SitemapEntry(sitemap_url, None, True), depth=0)
+
+    def _crawl_sitemap(self, sitemap: SitemapEntry, depth: int) -> Iterator[SitemapEntry]:
+        if sitemap.loc in self._visited:
+            return
+        self._visited.add(sitemap.loc)
+        if not self._changed(sitemap):
+            self.stats.sitemaps_unchanged += 1
+            return
+
+        children = []
+        try:
+            for entry in iter_sitemap(sitemap.loc):
+                if entry.is_sitemap:
+                    # Followed once this file is closed so only one connection is held
+                    children.append(entry)
+                elif self._wanted(entry.loc):
+                    yield entry
+        except SitemapError as e:
+            logger.error(str(e))
+            self.stats.sitemaps_failed += 1
+            return
+        self.stats.sitemaps += 1
+
+        for child in children:
+            if depth + 1 > settings.SITEMAP_MAX_DEPTH:
+                logger.warning(f"Not following {child.loc}: deeper than SITEMAP_MAX_DEPTH")
+                continue
+            yield from self._crawl_sitemap(child, depth + 1)
+
+        # Only remembered once fully read, so an interrupted crawl re-reads it
+        if sitemap.lastmod and not self.dry_run:
+            CrawledUrl.objects.update_or_create(
+                url=sitemap.loc, defaults={"kind": CrawledUrl.Kind.SITEMAP, "lastmod": sitemap.lastmod}
+            )
+
+    def _wanted(self, url: str) -> bool:
+        self.stats.urls_seen += 1
+        wanted = (
+            domain_key(url) == self.domain
+            and (not self.include or any(p.search(url) for p in self.include))
+            and not any(p.search(url) for p in self.exclude)
+        )
+        if not wanted:
+            self.stats.urls_filtered += 1
+        return wanted
+
+    def _changed(self, sitemap: SitemapEntry) -> bool:
+        if self.force or sitemap.lastmod is None:
+            return True
+        stored = CrawledUrl.objects.filter(url=sitemap.loc).values_list("lastmod", flat=True)
+        return self._is_newer(sitemap, stored.first(), exists=stored.exists())
+
+    @staticmethod
+    def _is_newer(entry: SitemapEntry, stored: datetime | None, exists: bool) -> bool:
+        if not exists:
+            return True
+        return entry.lastmod is not None and (stored is None or entry.lastmod > stored)
+
+    def _flush(self, chunk: list[SitemapEntry]):
+        if not chunk:
+            return
+        stored = dict(
+            CrawledUrl.objects.filter(url__in=[entry.loc for entry in chunk]).values_list("url", "lastmod")
+        )
+        changed = [
+            entry for entry in chunk
+            if self.force or self._is_newer(entry, stored.get(entry.loc), exists=entry.loc in stored)
+        ]
+        self.stats.urls_unchanged += len(chunk) - len(changed)
+        if self.limit:
+            changed = changed[:self.limit - self.stats.urls_queued]
+        if not changed:
+            return
+        if self.dry_run:
+            self.stats.urls_queued += len(changed)
+            return
+
+        if self.batch is None:
+            self.batch = ImportBatch.objects.create(is_future=self.is_future, tags=self.tags)
+        queued, duplicates = RecipeImportService.add_batch_items(self.batch, [entry.loc for entry in changed])
+        self.stats.urls_queued += queued
+        self.stats.urls_duplicate += duplicates
+
+        CrawledUrl.objects.bulk_create(
+            [CrawledUrl(url=entry.loc, kind=CrawledUrl.Kind.PAGE, lastmod=entry.lastmod, batch=self.batch)
+             for entry in changed],
+            update_conflicts=True,
+            unique_fields=["url"],
+            update_fields=["kind", "lastmod", "batch", "updated_at"],
+        )
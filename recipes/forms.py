@@ -1,10 +1,9 @@
 import logging
 
-import ingredient_slicer
 from django import forms
 
-from .ingredient_processor import process_ingredients
-from .models import Ingredient, Recipe, RecipeIngredient
+from .models import Recipe
+from .services import RecipeImportService
 from .utils import remove_instruction_headers
 
 logger = logging.getLogger(__name__)
@@ -166,29 +165,7 @@ class RecipeUpdateForm(forms.ModelForm):
 
             ingredients_text = self.cleaned_data.get('ingredients_text', '')
             try:
-                # Parse all lines
-                parsed_list = []
-                for line in ingredients_text.split('\n'):
-                    line = line.strip()
-                    if line:
-                        slicer = ingredient_slicer.IngredientSlicer(line)
-                        parsed_list.append(slicer.to_json())
-                
-                # Consolidate and format
-                processed = process_ingredients(parsed_list)
-
-                for idx, item in enumerate(processed):
-                    name = item["food"]
-                    ingredient, _ = Ingredient.objects.get_or_create(name=name)
-                    
-                    RecipeIngredient.objects.create(
-                        recipe=recipe,
-                        ingredient=ingredient,
-                        raw_text=f"{item['display_quantity']} {item['unit']} {name}".strip(),
-                        quantity=item["display_quantity"],
-                        unit=item["unit"],
-                        order=idx
-                    )
+                RecipeImportService.save_ingredients(recipe, ingredients_text.split('\n'))
             except Exception as e:
                 logger.warning(f"Failed to process ingredients during update: {e}")
 
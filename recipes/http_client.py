@@ -0,0 +1,189 @@
+import asyncio
+import atexit
+import importlib.util
+import logging
+import os
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Headers that make recipe sites treat us like a regular browser visit.
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate',
+    'Referer': 'https://www.google.com/',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'cross-site',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+}
+
+
+def _host_key(url: str) -> str:
+    """Return the lowercase host used to group per-host connection limits."""
+    return urlparse(url).netloc.lower()
+
+
+class HttpClientManager:
+    """
+    Owns the process-wide httpx clients.
+
+    A single keep-alive pool is shared by the parsers, the recipe-scrapers
+    fallback and the notification sender so repeated requests to the same
+    host reuse TCP/TLS connections instead of handshaking every time.
+    Clients are created lazily and re-created after a fork so Gunicorn and
+    Celery children never share sockets with their parent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self._pid: int | None = None
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._async_host_semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _client_options(self) -> dict:
+        http2 = getattr(settings, 'HTTP_CLIENT_HTTP2', False)
+        if http2 and importlib.util.find_spec('h2') is None:
+            logger.warning("HTTP_CLIENT_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+
+        return {
+            'follow_redirects': True,
+            'timeout': getattr(settings, 'HTTP_CLIENT_TIMEOUT', 15.0),
+            'http2': http2,
+            'limits': httpx.Limits(
+                max_connections=getattr(settings, 'HTTP_CLIENT_MAX_CONNECTIONS', 20),
+                max_keepalive_connections=getattr(settings, 'HTTP_CLIENT_MAX_KEEPALIVE', 10),
+                keepalive_expiry=getattr(settings, 'HTTP_CLIENT_KEEPALIVE_EXPIRY', 30.0),
+            ),
+        }
+
+    def get_client(self) -> httpx.Client:
+        """Return the shared synchronous client, creating it on first use."""
+        pid = os.getpid()
+        if self._client is not None and self._pid == pid and not self._client.is_closed:
+            return self._client
+
+        with self._lock:
+            if self._client is None or self._pid != pid or self._client.is_closed:
+                if self._pid not in (None, pid):
+                    # Inherited from the parent process; drop it without closing
+                    # so we don't tear down sockets the parent is still using.
+                    self._host_semaphores = {}
+                self._client = httpx.Client(**self._client_options())
+                self._pid = pid
+            return self._client
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared async client for the running event loop.
+        httpx async connections are bound to the loop that opened them, so
+        each loop gets its own pool.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**self._client_options())
+            self._async_clients[loop] = client
+        return client
+
+    def _per_host_limit(self) -> int:
+        return getattr(settings, 'HTTP_CLIENT_PER_HOST_CONNECTIONS', 4)
+
+    @contextmanager
+    def host_slot(self, url: str):
+        """Hold one of the limited per-host connection slots for a request."""
+        host = _host_key(url)
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self._per_host_limit())
+                self._host_semaphores[host] = semaphore
+        with semaphore:
+            yield
+
+    @asynccontextmanager
+    async def async_host_slot(self, url: str):
+        """Async counterpart of host_slot for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphores = self._async_host_semaphores.setdefault(loop, {})
+        host = _host_key(url)
+        semaphore = semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._per_host_limit())
+            semaphores[host] = semaphore
+        async with semaphore:
+            yield
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET through the shared pool while respecting the per-host limit."""
+        with self.host_slot(url):
+            return self.get_client().get(url, **kwargs)
+
+    async def aget(self, url: str, **kwargs) -> httpx.Response:
+        """Async GET through the loop's shared pool and per-host limit."""
+        async with self.async_host_slot(url):
+            return await self.get_async_client().get(url, **kwargs)
+
+    @contextmanager
+    def stream(self, url: str, **kwargs):
+        """Streaming GET through the shared pool; the body is read by the caller."""
+        with self.host_slot(url), self.get_client().stream("GET", url, **kwargs) as response:
+            yield response
+
+    @asynccontextmanager
+    async def astream(self, url: str, **kwargs):
+        """Async counterpart of stream."""
+        async with self.async_host_slot(url), self.get_async_client().stream("GET", url, **kwargs) as response:
+            yield response
+
+    def close(self):
+        """Close the synchronous client owned by this process."""
+        with self._lock:
+            client, self._client = self._client, None
+            owned = self._pid == os.getpid()
+            self._pid = None
+        if client is not None and owned and not client.is_closed:
+            client.close()
+            logger.debug("Closed shared HTTP client")
+
+    async def aclose(self):
+        """Close the async client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.pop(loop, None)
+        self._async_host_semaphores.pop(loop, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+
+http_clients = HttpClientManager()
+
+
+def get_client() -> httpx.Client:
+    return http_clients.get_client()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    return http_clients.get_async_client()
+
+
+def close_clients():
+    """Shut down pooled connections; safe to call more than once."""
+    http_clients.close()
+
+
+atexit.register(close_clients)
@@ -0,0 +1,151 @@
+"""
+Local copies of recipe images.
+
+Recipe.image_url points at full-size blog photos (often 1-3MB) on third-party
+hosts. cache_recipe_image downloads each one once and stores resized WebP and
+JPEG variants (RECIPE_IMAGE_SIZES) under MEDIA_ROOT; the recipe_image filter
+and recipe_picture tag then serve the right size, falling back to the
+hotlinked URL until the variants exist.
+
+The files are served by the web server in front of gunicorn (see
+RECIPE_IMAGE_CACHE_ENABLED); views.recipe_image_file only serves them in
+DEBUG. Resizing needs Pillow. Without it nothing is cached and templates keep
+hotlinking, the same way HTTP/2 degrades when 'h2' is missing.
+"""
+import hashlib
+import importlib.util
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .http_client import BROWSER_HEADERS, http_clients
+from .parsers.politeness import polite_slot
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DIR = "recipe_images"
+# Extension -> Pillow format and save options, in <picture> preference order
+IMAGE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def pillow_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def download_image(url: str) -> bytes:
+    """Fetch an image through the shared pool and politeness limits, capped at RECIPE_IMAGE_MAX_BYTES."""
+    max_bytes = settings.RECIPE_IMAGE_MAX_BYTES
+    with polite_slot(url), http_clients.stream(url, headers=BROWSER_HEADERS) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        if content_type and not content_type.startswith("image/"):
+            raise ValueError(f"{url} is not an image ({content_type})")
+
+        data = bytearray()
+        for chunk in response.iter_bytes():
+            data.extend(chunk)
+            if len(data) > max_bytes:
+                raise ValueError(f"{url} is larger than RECIPE_IMAGE_MAX_BYTES ({max_bytes} bytes)")
+    return bytes(data)
+
+
+def build_variants(data: bytes) -> dict[str, dict[str, str]]:
+    """
+    Resize an image into every RECIPE_IMAGE_SIZES variant and format.
+
+    Files are named after a hash of the source bytes, so they never change
+    once written (and can be cached forever); existing files are reused.
+    Returns {size: {extension: storage path}}.
+    """
+    from PIL import Image, ImageOps
+
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    variants = {}
+    with Image.open(BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode in ("RGBA", "LA", "P"):
+            # JPEG has no alpha; flatten transparent PNGs onto white
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+
+        for size, (width, height) in settings.RECIPE_IMAGE_SIZES.items():
+            if height:
+                resized = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+            else:
+                resized = image.copy()
+                resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+
+            variants[size] = {}
+            for ext, (image_format, options) in IMAGE_FORMATS.items():
+                path = f"{IMAGE_DIR}/{digest[:2]}/{digest}-{size}.{ext}"
+                if not default_storage.exists(path):
+                    buffer = BytesIO()
+                    resized.save(buffer, image_format, **options)
+                    default_storage.save(path, ContentFile(buffer.getvalue()))
+                variants[size][ext] = path
+    return variants
+
+
+def cache_recipe_image(recipe_id: int, force: bool = False) -> bool:
+    """
+    Download and resize a recipe's image unless its current image_url is
+    already cached. Returns True when new variants were stored.
+    """
+    from .models import Recipe
+
+    recipe = Recipe.objects.filter(pk=recipe_id).only("image_url", "image_variants").first()
+    if recipe is None or not recipe.image_url:
+        return False
+    if not force and recipe.image_variants.get("source") == recipe.image_url:
+        return False
+    if not pillow_available():
+        logger.warning("Pillow is not installed; recipe images stay hotlinked")
+        return False
+
+    data = download_image(recipe.image_url)
+    variants = build_variants(data)
+    # update() rather than save() so the post_save hook does not queue us again
+    Recipe.objects.filter(pk=recipe_id, image_url=recipe.image_url).update(
+        image_variants={"source": recipe.image_url, "sizes": variants}
+    )
+    logger.info(f"Cached {len(variants)} image sizes for recipe {recipe_id}")
+    return True
+
+
+def queue_image_cache(sender, instance, **kwargs):
+    """post_save hook: queue cache_recipe_image_task when a recipe's image_url changes."""
+    if not instance.image_url or instance.image_variants.get("source") == instance.image_url:
+        return
+    if not settings.RECIPE_IMAGE_CACHE_ENABLED:
+        return
+
+    def _queue():
+        from .tasks import cache_recipe_image_task
+        try:
+            cache_recipe_image_task.delay(instance.pk)
+        except Exception as e:
+            # A missing broker must never break saving a recipe
+            logger.warning(f"Could not queue image caching for recipe {instance.pk}: {e}")
+
+    transaction.on_commit(_queue)
+
+
+def variant_url(recipe, size: str, ext: str = "jpg") -> str:
+    """URL of a cached variant of the recipe image, or the hotlinked image_url if there is none."""
+    variants = recipe.image_variants or {}
+    if settings.RECIPE_IMAGE_CACHE_ENABLED and variants.get("source") == recipe.image_url:
+        path = variants.get("sizes", {}).get(size, {}).get(ext)
+        if path:
+            return default_storage.url(path)
+    return recipe.image_url or ""
@@ -1,8 +1,36 @@
+import copy
 import re
+import threading
+import unicodedata
+from collections import OrderedDict
 from fractions import Fraction
 
 import ingredient_slicer
 
+from . import units
+from .ingredient_tokenizer import PARSED_FIELDS, fast_parse
+
+# Bump whenever parse_ingredient_line's output changes, so memoized results
+# from the old logic are dropped instead of being served
+PARSER_VERSION = 3
+# Distinct normalized lines kept in the parse cache
+PARSE_CACHE_SIZE = 4096
+
+_OR_SPLIT = re.compile(r'(?:\s+|,)\s*or\s+', re.IGNORECASE)
+_NUMBER = re.compile(r"(\d+(?:\.\d+)?)")
+_PARENS = re.compile(r'\(.*?\)')
+_PAREN_CONTENT = re.compile(r'\((.*?)\)')
+# What display_quantity writes: "2", "1.5", "½", "1½", "1/2", "1 1/2" or "2 lb 4"
+_DISPLAY_QUANTITY = re.compile(
+    r'(?:(\d+) lb )?(?:(\d+(?:\.\d+)?)?([½⅓⅔¼¾⅕⅖⅗⅘⅙⅚⅛⅜⅝⅞])?|(?:(\d+) )?(\d+)/(\d+))'
+)
+_UNIT_WORD = re.compile(r'\bunit\b', re.IGNORECASE)
+_UNIT_FILLER = re.compile(r'\b(of|an|a|the|of an|of a|unit)\b', re.IGNORECASE)
+# Section headings that recipe sites list as if they were ingredients
+SECTION_HEADERS = frozenset({
+    "ingredients", "finish", "sauce", "garnish", "for the", "serve with", "to serve", "marinade", "dressing",
+})
+
 
 def _safe_float(value) -> float:
     """Internal helper to safely convert values to a float."""
@@ -17,7 +45,7 @@ def _extract_numbers(text: str) -> list[float]:
     """Internal helper to extract all numbers from a string as floats."""
     extracted_floats = []
     # Regex finds digits, optionally followed by a decimal point and more digits
-    number_matches = re.findall(r"(\d+(?:\.\d+)?)", text)
+    number_matches = _NUMBER.findall(text)
     
     for match in number_matches:
         # We can use standard float() here because the regex guarantees it's a valid number format
@@ -26,14 +54,145 @@ def _extract_numbers(text: str) -> list[float]:
     return extracted_floats
 
 
+class _ParseCache:
+    """
+    Bounded LRU of parse results keyed on the normalized line, with
+    hit/miss/eviction counters and a count of which parser served each miss.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.version = PARSER_VERSION
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        self.fast_path = self.slicer = 0
+
+    def _check_version(self):
+        if self.version != PARSER_VERSION:
+            self._entries.clear()
+            self.version = PARSER_VERSION
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            self._check_version()
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, keys) -> dict[str, dict]:
+        """The cached entries among keys, without counting lookups or touching recency."""
+        with self._lock:
+            self._check_version()
+            return {key: self._entries[key] for key in keys if key in self._entries}
+
+    def put(self, key: str, value: dict):
+        with self._lock:
+            self._check_version()
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def count_parse(self, fast: bool):
+        with self._lock:
+            if fast:
+                self.fast_path += 1
+            else:
+                self.slicer += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.fast_path = self.slicer = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            parses = self.fast_path + self.slicer
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "fast_path": self.fast_path,
+                "slicer": self.slicer,
+                "fast_path_ratio": self.fast_path / parses if parses else 0.0,
+            }
+
+
+_parse_cache = _ParseCache(PARSE_CACHE_SIZE)
+
+
+def parse_cache_stats() -> dict:
+    """
+    Hits, misses, evictions, size and hit_rate of the parse_ingredient_line
+    cache, plus how many misses the fast path parsed (fast_path, slicer,
+    fast_path_ratio).
+    """
+    return _parse_cache.stats()
+
+
+def clear_parse_cache():
+    """Empty the parse_ingredient_line cache and reset its counters."""
+    _parse_cache.clear()
+
+
+def normalize_line(line: str) -> str:
+    """The parse cache key of a line: stripped, with runs of whitespace collapsed."""
+    return " ".join(line.split())
+
+
+def cached_parses(keys) -> dict[str, dict]:
+    """
+    Parse results already held for the given normalized lines. The dicts are
+    the cached objects themselves: serialize them, never mutate them.
+    """
+    return _parse_cache.peek(keys)
+
+
+def prime_parse_cache(results: dict[str, dict]):
+    """Seed the cache with results parsed elsewhere (the shared table, another process)."""
+    for key, parsed_item in results.items():
+        _parse_cache.put(key, parsed_item)
+
+
 def parse_ingredient_line(line: str) -> dict:
     """
     Centralized parsing for a single ingredient line.
+
+    Lines that differ only in surrounding or repeated whitespace share one
+    memoized result; callers get their own copy, so mutating it is safe.
     """
-    
-    # TODO fix this comment
+    return copy.deepcopy(_cached_parse(normalize_line(line)))
+
+
+def _cached_parse(key: str) -> dict:
+    """The memoized parse of an already-normalized line. Shared with the cache: never mutate it."""
+    parsed_item = _parse_cache.get(key)
+    if parsed_item is None:
+        # Simple lines skip IngredientSlicer entirely (see recipes.ingredient_tokenizer)
+        parsed_item = fast_parse(key)
+        _parse_cache.count_parse(parsed_item is not None)
+        if parsed_item is None:
+            parsed_item = _parse_ingredient_line(key)
+        _parse_cache.put(key, parsed_item)
+    return parsed_item
+
+
+def _parse_ingredient_line(line: str) -> dict:
+    """Run IngredientSlicer on one line and correct its common mistakes. Returns the PARSED_FIELDS."""
     # If the line contains "or", we only parse the first half so the slicer
-    or_split = re.split(r'(?:\s+|,)\s*or\s+', line, maxsplit=1, flags=re.IGNORECASE)
+    # doesn't merge the alternatives; the remainder is appended to the food
+    or_split = _OR_SPLIT.split(line, maxsplit=1)
     if len(or_split) > 1:
         line_to_parse = or_split[0]
         or_remainder = " or " + or_split[1]
@@ -51,11 +210,11 @@ def parse_ingredient_line(line: str) -> dict:
     sec_qty = _safe_float(parsed_item.get("secondary_quantity"))
     
     # Extract "Safe" numbers (outside parentheses) from the parsed half
-    line_no_parens = re.sub(r'\(.*?\)', '', line_to_parse)
+    line_no_parens = _PARENS.sub('', line_to_parse)
     safe_nums = _extract_numbers(line_no_parens)
     
     # Extract "Danger" numbers (inside parentheses) from the parsed half
-    paren_matches = re.findall(r'\((.*?)\)', line_to_parse)
+    paren_matches = _PAREN_CONTENT.findall(line_to_parse)
     danger_nums = []
     for p_content in paren_matches:
         danger_nums.extend(_extract_numbers(p_content))
@@ -118,7 +277,7 @@ def parse_ingredient_line(line: str) -> dict:
     food = (parsed_item.get("food") or "").strip()
     if food:
         # Clean rogue "unit"
-        food = re.sub(r'\bunit\b', '', food, flags=re.IGNORECASE).strip()
+        food = _UNIT_WORD.sub('', food).strip()
         # Append the "or" remainder we stripped earlier
         if or_remainder:
             food = f"{food}{or_remainder}".strip()
@@ -134,7 +293,7 @@ def parse_ingredient_line(line: str) -> dict:
     # Clean units like "of an onion", "of pepper", etc. and "Unit" string
     u = parsed_item.get("unit") or ""
     if u:
-        parsed_item["unit"] = re.sub(r'\b(of|an|a|the|of an|of a|unit)\b', '', u, flags=re.IGNORECASE).strip()
+        parsed_item["unit"] = _UNIT_FILLER.sub('', u).strip()
 
     # Let's ensure quantity is always returned as a float, never a string
     parsed_item["quantity"] = qty
@@ -142,10 +301,11 @@ def parse_ingredient_line(line: str) -> dict:
     # 4. Filter Junk Headers (e.g. "Ingredients", "Finish")
     # If the quantity is 0 and the food is just a section header, empty it so it gets skipped
     food = parsed_item.get("food", "").lower().strip()
-    if qty == 0.0 and food in {"ingredients", "finish", "sauce", "garnish", "for the", "serve with", "to serve", "marinade", "dressing"}:
+    if qty == 0.0 and food in SECTION_HEADERS:
         parsed_item["food"] = ""
-        
-    return parsed_item
+
+    parsed_item["ingredient"] = line
+    return {field: parsed_item.get(field) for field in PARSED_FIELDS}
 
 FRACTION_MAP = {
     0.5: '½', 0.333: '⅓', 0.666: '⅔', 0.25: '¼', 0.75: '¾', 
@@ -153,32 +313,49 @@ FRACTION_MAP = {
     0.833: '⅚', 0.125: '⅛', 0.375: '⅜', 0.625: '⅝', 0.875: '⅞'
 }
 
+def _fraction_string(val: float) -> str:
+    """The display form of val: a unicode fraction, a simple n/d, or the number itself."""
+    # Check standard unicode fractions (allowing slight floating point variance)
+    for dec_val, frac_char in FRACTION_MAP.items():
+        if abs(val - dec_val) < 0.01:
+            return frac_char
+
+    # Fallback to Fraction string if it's a simple denominator
+    if val > 0 and val < 1:
+        f = Fraction(val).limit_denominator(10)
+        # Remainders too small or too close to 1 for a tenth round to a whole number
+        if f.denominator == 1:
+            return str(f.numerator)
+        return f"{f.numerator}/{f.denominator}"
+
+    if val.is_integer():
+        return str(int(val))
+
+    return str(val)
+
+# _fraction_string of every thousandth in [0, 1), which is all format_quantity ever asks for
+FRACTION_TABLE = tuple(_fraction_string(thousandths / 1000) for thousandths in range(1000))
+
 def decimal_to_fraction(decimal_str: str) -> str:
     """Converts a decimal string to a unicode fraction if possible."""
     try:
         val = float(decimal_str)
-        
-        # Check standard unicode fractions (allowing slight floating point variance)
-        for dec_val, frac_char in FRACTION_MAP.items():
-            if abs(val - dec_val) < 0.01:
-                return frac_char
-        
-        # Fallback to Fraction string if it's a simple denominator
-        if val > 0 and val < 1:
-            f = Fraction(val).limit_denominator(10)
-            return f"{f.numerator}/{f.denominator}"
-        
-        if val.is_integer():
-            return str(int(val))
-            
-        return str(val)
     except (ValueError, TypeError):
         return decimal_str
 
+    if 0 <= val < 1:
+        thousandths = round(val * 1000)
+        if thousandths < 1000 and thousandths / 1000 == val:
+            return FRACTION_TABLE[thousandths]
+    return _fraction_string(val)
+
+def _is_ounces(unit: str) -> bool:
+    measure = units.lookup(unit)
+    return measure is not None and measure.name == "oz"
+
 def normalize_ounces(quantity: float, unit: str) -> (float, str):
     """Converts ounces to lbs and oz if > 16."""
-    unit_lower = unit.lower()
-    if unit_lower in ['oz', 'ounce', 'ounces'] and quantity >= 16:
+    if _is_ounces(unit) and quantity >= 16:
         lbs = int(quantity // 16)
         remaining_oz = quantity % 16
         if remaining_oz == 0:
@@ -205,90 +382,181 @@ def format_quantity(quantity: float | str) -> str:
     # We pass the float string to decimal_to_fraction.
     # It will either return a unicode character or fallback to the string format.
     frac_str = decimal_to_fraction(str(round(fractional, 3)))
-    
+
+    # A remainder that rounds away (1 cup + 1 tsp) leaves the whole number
+    if frac_str in ("0", "1"):
+        return str(whole + int(frac_str)) if whole + int(frac_str) else str(round(quantity, 3))
     if whole > 0:
-        if "/" in frac_str or frac_str in FRACTION_MAP.values():
+        if "/" in frac_str:
+            # "3 1/10", not "31/10"
+            return f"{whole} {frac_str}"
+        if frac_str in FRACTION_MAP.values():
             return f"{whole}{frac_str}"
         return str(round(quantity, 3))
     return frac_str
 
+class ParsedIngredient:
+    """
+    One consolidated ingredient, as stored on a RecipeIngredient row.
+    base_quantity is quantity in base_unit (ml, g or the count unit; see recipes.units).
+    """
+
+    __slots__ = ("base_quantity", "base_unit", "display_quantity", "food", "prep", "quantity", "unit")
+
+    def __init__(self, food: str, unit: str, quantity: float, display_quantity: str = "", prep: str = "",
+                 base_quantity: float = 0.0, base_unit: str = ""):
+        self.food = food
+        self.unit = unit
+        self.quantity = quantity
+        self.display_quantity = display_quantity
+        self.prep = prep
+        self.base_quantity = base_quantity
+        self.base_unit = base_unit
+
+    def __repr__(self):
+        return f"ParsedIngredient({self.raw_text!r}, prep={self.prep!r})"
+
+    @property
+    def raw_text(self) -> str:
+        return " ".join(part for part in (self.display_quantity, self.unit, self.food) if part)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def row_fields(self) -> dict:
+        """The parsed values as RecipeIngredient fields."""
+        return {
+            "quantity": self.display_quantity,
+            "unit": self.unit,
+            "quantity_value": self.base_quantity or None,
+            "canonical_unit": self.base_unit,
+            "preparation": self.prep,
+        }
+
+
+def _food_key(food: str, unit: str) -> str:
+    """
+    food for grouping. When the slicer left a count unit inside the food
+    ("3 cloves garlic" -> unit "", food "cloves garlic"), its spellings are
+    folded so "clove garlic" lands in the same group.
+    """
+    if unit:
+        return food
+    first, _, rest = food.partition(" ")
+    measure = units.lookup(first)
+    if rest and measure is not None and measure.dimension == units.COUNT:
+        return f"{measure.name} {rest}"
+    return food
+
+
+def _consolidate(groups: dict, item: dict):
+    """
+    Add one parsed line to groups, summing quantities of the same food and
+    prep whose units can be added ("1 cup" and "2 tbsp"). The sum is kept in
+    the unit that food was first seen in.
+    """
+    food = (item.get("food") or "").strip().lower()
+    if not food:
+        return
+
+    unit = (item.get("unit") or "").strip().lower()
+    quantity = _safe_float(item.get("quantity"))
+    prep_val = item.get("prep") or ""
+    if isinstance(prep_val, list):
+        prep = ", ".join(prep_val).strip().lower()
+    else:
+        prep = str(prep_val).strip().lower()
+
+    key = (_food_key(food, unit), units.unit_group(unit), prep)
+    entry = groups.get(key)
+    if entry is None:
+        groups[key] = ParsedIngredient(food, unit, quantity, prep=prep)
+    else:
+        entry.quantity += units.convert(quantity, unit, entry.unit)
+
+
+def _finalize(entry: ParsedIngredient) -> ParsedIngredient:
+    """Normalize a consolidated entry's unit and fill in its display quantity."""
+    q, u, f = entry.quantity, entry.unit, entry.food
+
+    # Prevent unit/food redundancy (e.g., unit "onion" & food "yellow onion")
+    if u and f and (set(u.split()) & set(f.split())):
+        u = ""
+
+    entry.base_quantity, entry.base_unit = units.to_base(q, u)
+    entry.display_quantity, entry.unit = display_quantity(q, u)
+    entry.food = f.capitalize()
+    return entry
+
+
+def display_quantity(q: float, u: str) -> tuple[str, str]:
+    """The quantity as shown on a RecipeIngredient row, and the unit that goes with it."""
+    display_q = format_quantity(q)
+
+    # Normalize Ounces to Lbs
+    if _is_ounces(u) and q >= 16:
+        lbs = int(q // 16)
+        remain = q % 16
+        if remain == 0:
+            display_q = str(lbs)
+            u = "lb" if lbs == 1 else "lbs"
+        else:
+            # For display we combine them
+            display_q = f"{lbs} lb {format_quantity(remain)}"
+            u = "oz"
+    return display_q, u
+
+
+def parse_quantity(display: str, unit: str = "") -> float | None:
+    """
+    Read a display quantity back into a number: "2", "1.5", "½", "1½",
+    "1/2", "1 1/2", or "2 lb 4" with unit "oz" (36 ounces). None if the
+    text is not a quantity.
+    """
+    match = _DISPLAY_QUANTITY.fullmatch((display or "").strip())
+    if not match:
+        return None
+    pounds, whole, char, mixed_whole, num, den = match.groups()
+    if num is not None:
+        if not int(den):
+            return None
+        value = int(mixed_whole or 0) + int(num) / int(den)
+    elif whole or char:
+        value = float(whole or 0) + (unicodedata.numeric(char) if char else 0)
+    else:
+        return None
+    if pounds is not None:
+        if not _is_ounces(unit):
+            return None
+        value += int(pounds) * 16
+    return value
+
+
+def parse_ingredients(lines) -> list[ParsedIngredient]:
+    """
+    Parse, consolidate and format raw ingredient lines in one pass.
+
+    This is the entry point for saving a recipe's ingredients. Blank lines
+    and section headings are dropped, and repeated ingredients are summed.
+    """
+    groups = {}
+    for line in lines:
+        key = normalize_line(line)
+        if key:
+            _consolidate(groups, _cached_parse(key))
+    return [_finalize(entry) for entry in groups.values()]
+
+
 def process_ingredients(parsed_ingredients: list[dict[str, any]]) -> list[dict[str, any]]:
     """
     Consolidates identical ingredients and normalizes quantities/units.
     Each dict in parsed_ingredients should have: quantity, unit, food.
+    Prefer parse_ingredients when starting from raw lines.
     """
-    consolidated = {}
-
+    groups = {}
     for item in parsed_ingredients:
-        food = (item.get("food") or "").strip().lower()
-        if not food:
-            continue
-            
-        unit = (item.get("unit") or "").strip().lower()
-        
-        # Quantity is now guaranteed to be a float or converted to float
-        raw_quantity = item.get("quantity", 0.0)
-        try:
-            if isinstance(raw_quantity, str):
-                quantity = float(raw_quantity)
-            else:
-                quantity = float(raw_quantity)
-        except (ValueError, TypeError):
-            quantity = 0.0
-
-        # Create a unique key for grouping (food + unit + prep)
-        prep_val = item.get("prep") or ""
-        if isinstance(prep_val, list):
-            prep = ", ".join(prep_val).strip().lower()
-        else:
-            prep = str(prep_val).strip().lower()
-        key = (food, unit, prep)
-        
-        if key in consolidated:
-            consolidated[key]["quantity"] += quantity
-        else:
-            consolidated[key] = {
-                "food": food,
-                "unit": unit,
-                "quantity": quantity,
-                "prep": prep,
-            }
-
-    # Second pass: normalize and format
-    results = []
-    for key, data in consolidated.items():
-        q = data["quantity"]
-        u = data["unit"]
-        f = data["food"]
-        
-        # Prevent unit/food redundancy (e.g., unit "onion" & food "yellow onion")
-        if u and f and (set(u.split()) & set(f.split())):
-            u = ""
-        
-        display_q = format_quantity(q)
-        
-        # Normalize Ounces to Lbs
-        if u in ['oz', 'ounce', 'ounces'] and q >= 16:
-            lbs = int(q // 16)
-            remain = q % 16
-            if remain == 0:
-                display_q = str(lbs)
-                u = "lb" if lbs == 1 else "lbs"
-            else:
-                remain_fmt = format_quantity(remain)
-                # For display we combine them
-                display_q = f"{lbs} lb {remain_fmt}"
-                u = "oz"
-
-        results.append({
-            "food": f.capitalize(),
-            "unit": u,
-            "quantity": q,
-            "display_quantity": display_q,
-            "prep": data.get("prep", "")
-        })
-        
-    return results
+        _consolidate(groups, item)
+    return [_finalize(entry).as_dict() for entry in groups.values()]
 
 def format_time_h_m(minutes: int | None) -> str:
     """Format minutes into HH:MM."""
@@ -0,0 +1,167 @@
+"""
+A fast path for ingredient lines that need no guesswork.
+
+Most lines look like "2 cups flour", "1 tsp salt" or "3 eggs, beaten".
+fast_parse recognizes the <quantity> <unit> <food>[, <prep>] shape and
+returns the PARSED_FIELDS every parse_ingredient_line result has without
+building an IngredientSlicer. Anything it is not
+sure about returns None and goes through the slicer as before.
+
+Identical output is guaranteed by vocabulary: units come from
+INGREDIENT_STARTERS, and the food words may contain none of the words that
+IngredientSlicer strips from a food (its own unit, prep, modifier, stop word
+and number lists). If such a word shows up, the line is not simple and the
+fast path steps aside. recipes/tests/test_ingredient_tokenizer.py checks
+the fast path against the slicer field by field.
+"""
+import re
+
+from ingredient_slicer import _constants as slicer_vocab
+
+from .utils import INGREDIENT_STARTERS
+
+# The keys of every parse_ingredient_line result, whichever path produced it.
+# These are what gets memoized and stored in ParsedIngredientLine; the
+# slicer's other output (gram weights, secondary units...) is dropped.
+PARSED_FIELDS = ("ingredient", "food", "quantity", "unit", "prep")
+
+UNICODE_FRACTIONS = {
+    char: int(fraction.split("/")[0]) / int(fraction.split("/")[1])
+    for char, fraction in slicer_vocab.UNICODE_FRACTIONS.items()
+    if not char.startswith("-") and "/" in fraction
+}
+
+
+def _words(entries) -> set[str]:
+    return {word for entry in entries for word in re.findall(r"[a-z]+", entry.lower())}
+
+
+def _unit_spellings() -> frozenset[str]:
+    """Every spelling the slicer knows of each unit in INGREDIENT_STARTERS."""
+    spellings = set()
+    for variants in slicer_vocab.UNITS.values():
+        if any(starter in variants for starter in INGREDIENT_STARTERS):
+            # Single letters other than g/l are case-sensitive (T = tablespoon, t = teaspoon)
+            spellings.update(variant for variant in variants if re.fullmatch(r"[a-z]{2,}|[gl]", variant))
+    return frozenset(spellings)
+
+
+UNITS = _unit_spellings()
+PREP_WORDS = frozenset(word for word in slicer_vocab.PREP_WORDS if re.fullmatch(r"[a-z]+", word))
+# Dropped from the food by the slicer, leaving it unchanged otherwise
+MODIFIER_WORDS = frozenset(
+    word for word in slicer_vocab.SIZE_MODIFIERS_SET | slicer_vocab.UNIT_MODIFIERS if re.fullmatch(r"[a-z]+", word)
+) - PREP_WORDS
+# Words that make the slicer do something we do not reproduce
+RESERVED_WORDS = frozenset(
+    _words(slicer_vocab.UNITS_SET)
+    | _words(slicer_vocab.PREP_WORDS)
+    | _words(slicer_vocab.UNIT_MODIFIERS)
+    | _words(slicer_vocab.SIZE_MODIFIERS_SET)
+    | _words(slicer_vocab.DIMENSION_UNITS_SET)
+    | _words(slicer_vocab.APPROXIMATE_STRINGS)
+    | _words(slicer_vocab.CASUAL_QUANTITIES_SET)
+    | _words(slicer_vocab.CASUAL_UNITS_SET)
+    | _words(slicer_vocab.STOP_WORDS)
+    | _words(slicer_vocab.NUMBER_WORDS)
+    | _words(slicer_vocab.NUMBER_PREFIX_WORDS)
+    | _words(slicer_vocab.FRACTION_WORDS)
+    | _words(slicer_vocab.QUANTITY_PER_UNIT_STRINGS)
+    | _words(slicer_vocab.TEMPERATURE_UNITS)
+    | {"unit", "half", "optional"}
+) - PREP_WORDS - MODIFIER_WORDS
+# Multi-word prep phrases ("room temperature") that the slicer keeps whole
+PREP_PHRASES = tuple(phrase for phrase in slicer_vocab.PREP_WORDS if not re.fullmatch(r"[a-z]+", phrase))
+
+_FRACTION_CHARS = "".join(UNICODE_FRACTIONS)
+_QUANTITY = re.compile(
+    rf"(?P<whole>\d+(?:\.\d+)?)?(?P<char>[{_FRACTION_CHARS}])?$"
+    rf"|(?P<num>\d+)/(?P<den>\d+)$"
+)
+_GLUED_UNIT = re.compile(r"(\d+(?:\.\d+)?)([a-z]+)$")
+_WORD = re.compile(r"[a-z]+$")
+_PREP_SEPARATOR = re.compile(r"\s*,\s*|\s+and\s+|\s+")
+
+
+def _quantity(tokens: list[str]) -> tuple[float, int] | None:
+    """The leading quantity and how many tokens it used: 2, 1.5, 1/2, ½, 1½, 1 ½, 1 1/2."""
+    match = _QUANTITY.match(tokens[0])
+    if not match:
+        return None
+    if match.group("den"):
+        if not int(match.group("den")):
+            return None
+        value, used = int(match.group("num")) / int(match.group("den")), 1
+    elif match.group("whole") or match.group("char"):
+        value = float(match.group("whole") or 0) + UNICODE_FRACTIONS.get(match.group("char"), 0)
+        used = 1
+        if match.group("whole") and not match.group("char") and "." not in match.group("whole") and len(tokens) > 1:
+            fraction = _QUANTITY.match(tokens[1])
+            if fraction and fraction.group("den") and int(fraction.group("den")):
+                value += int(fraction.group("num")) / int(fraction.group("den"))
+                used = 2
+            elif fraction and fraction.group("char") and not fraction.group("whole"):
+                value += UNICODE_FRACTIONS[fraction.group("char")]
+                used = 2
+    else:
+        return None
+    return (round(value, 3), used) if value > 0 else None
+
+
+def fast_parse(line: str) -> dict | None:
+    """
+    Parse a simple "<quantity> <unit> <food>[, <prep>]" line, or return
+    None if the line needs the slicer. line is already normalized.
+    """
+    lowered = line.lower()
+    head, _, tail = lowered.partition(",")
+    tokens = head.split()
+    if len(tokens) < 2 or any(phrase in lowered for phrase in PREP_PHRASES):
+        return None
+
+    glued = _GLUED_UNIT.match(tokens[0])
+    if glued and glued.group(2) in UNITS:
+        tokens[:1] = [glued.group(1), glued.group(2)]
+    parsed = _quantity(tokens)
+    if parsed is None:
+        return None
+    quantity, used = parsed
+    tokens = tokens[used:]
+
+    # Without a unit the slicer guesses one from the food ("3 eggs", "2 cloves garlic")
+    # and reports it as "" or None; leave that to the slicer
+    if not tokens or tokens[0] not in UNITS:
+        return None
+    unit = tokens.pop(0)
+
+    food, prep = [], set()
+    for word in tokens:
+        if not _WORD.match(word):
+            return None
+        if word in PREP_WORDS or (word.endswith("ly") and word not in RESERVED_WORDS):
+            prep.add(word)
+        elif word in MODIFIER_WORDS:
+            continue
+        elif word in RESERVED_WORDS or word.endswith("ly"):
+            return None
+        else:
+            food.append(word)
+    if not food:
+        return None
+
+    for word in _PREP_SEPARATOR.split(tail.strip()) if tail.strip() else ():
+        if word in PREP_WORDS or (word.endswith("ly") and word not in RESERVED_WORDS and _WORD.match(word)):
+            prep.add(word)
+        else:
+            return None
+
+    # parse_ingredient_line drops a unit that repeats a word of the food
+    if unit in food:
+        unit = ""
+    return {
+        "ingredient": line,
+        "food": " ".join(food),
+        "quantity": quantity,
+        "unit": unit,
+        "prep": sorted(prep),
+    }
@@ -0,0 +1,46 @@
+import timeit
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from recipes.parsers.utils import extract_json_ld_scripts, extract_json_ld_scripts_soup
+
+FIXTURE_DIR = Path(__file__).resolve().parents[2] / 'parsers' / 'tests' / 'fixtures'
+
+
+class Command(BaseCommand):
+    help = 'Compare the single-pass JSON-LD scanner against the BeautifulSoup path on the parser fixtures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Extractions per fixture and method')
+        parser.add_argument('--fixtures', type=Path, default=FIXTURE_DIR, help='Directory of .html files to replay')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        fixtures = sorted(options['fixtures'].glob('*.html'))
+        if not fixtures:
+            self.stderr.write(self.style.ERROR(f"No .html fixtures found in {options['fixtures']}"))
+            return
+
+        self.stdout.write(f"{'fixture':<40} {'size':>9} {'soup ms':>9} {'scan ms':>9} {'speedup':>8}")
+        total_soup = total_scan = 0.0
+        for path in fixtures:
+            html = path.read_text()
+
+            if extract_json_ld_scripts(html) != extract_json_ld_scripts_soup(html):
+                self.stderr.write(self.style.WARNING(f"{path.name}: scanner and BeautifulSoup disagree"))
+
+            soup_s = min(timeit.repeat(lambda html=html: extract_json_ld_scripts_soup(html), number=iterations, repeat=3)) / iterations
+            scan_s = min(timeit.repeat(lambda html=html: extract_json_ld_scripts(html), number=iterations, repeat=3)) / iterations
+            total_soup += soup_s
+            total_scan += scan_s
+
+            self.stdout.write(
+                f"{path.name:<40} {len(html) / 1024:>7.1f}KB {soup_s * 1000:>9.3f} {scan_s * 1000:>9.3f} "
+                f"{soup_s / scan_s:>7.1f}x"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Total: soup {total_soup * 1000:.3f} ms, scan {total_scan * 1000:.3f} ms "
+            f"({total_soup / total_scan:.1f}x faster)"
+        ))
@@ -0,0 +1,74 @@
+import logging
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.benchmarks import (
+    FIXTURE_DIR,
+    STAGES,
+    compare_results,
+    load_fixtures,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay the parser fixtures through ParserRegistry, BaseParser, parse_ingredient_line and '
+        'process_ingredients, reporting per-stage time, tracemalloc peak and pages per second.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Runs per fixture (the median is reported)')
+        parser.add_argument('--fixtures', type=Path, default=FIXTURE_DIR, help='Directory of .html files to replay')
+        parser.add_argument('--save', type=Path, help='Write the results as JSON to this path')
+        parser.add_argument('--compare', type=Path, help='Baseline JSON from an earlier --save run')
+        parser.add_argument('--threshold', type=float, default=10.0, help='Allowed slowdown against the baseline, in percent')
+
+    def handle(self, *args, **options):
+        fixtures = load_fixtures(options['fixtures'])
+        if not fixtures:
+            raise CommandError(f"No .html fixtures found in {options['fixtures']}")
+
+        parser_logger = logging.getLogger('recipes.parsers')
+        previous_level = parser_logger.level
+        if options['verbosity'] < 2:
+            # Fallback warnings would repeat for every iteration
+            parser_logger.setLevel(logging.ERROR)
+        try:
+            results = run_benchmark(fixtures, options['iterations'])
+        finally:
+            parser_logger.setLevel(previous_level)
+        baseline = load_results(options['compare']) if options['compare'] else None
+
+        self.stdout.write(f"{'fixture':<40}" + "".join(f" {stage:>12}" for stage in STAGES))
+        for name, times in results['fixtures'].items():
+            self.stdout.write(f"{name:<40}" + "".join(f" {times[stage]:>9.3f} ms" for stage in STAGES))
+
+        self.stdout.write("")
+        self.stdout.write(f"{'stage':<12} {'total ms':>10} {'peak KB':>10} {'baseline':>10}")
+        for stage, stats in results['stages'].items():
+            line = f"{stage:<12} {stats['ms']:>10.3f} {stats['peak_kb']:>10.1f}"
+            if baseline and stage in baseline.get('stages', {}):
+                line += f" {baseline['stages'][stage]['ms']:>10.3f}"
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f"Throughput: {results['pages_per_second']:.1f} pages/s"))
+        lines = results['lines_per_second']
+        self.stdout.write(
+            f"Ingredient lines/s: {lines['per_line']:.0f} per line, {lines['batched']:.0f} batched, "
+            f"{lines['batched_cached']:.0f} batched from cache ({lines['fast_path_ratio']:.0%} fast path)"
+        )
+
+        if options['save']:
+            save_results(results, options['save'])
+            self.stdout.write(f"Saved results to {options['save']}")
+
+        if baseline:
+            regressions = compare_results(results, baseline, options['threshold'] / 100)
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(self.style.ERROR(f"Regression: {regression}"))
+                raise CommandError(f"{len(regressions)} metric(s) regressed more than {options['threshold']:.0f}%")
+            self.stdout.write(self.style.SUCCESS(f"No regressions beyond {options['threshold']:.0f}% against {options['compare']}"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.parsers.manifest import (
+    MANIFEST_PATH,
+    build_manifest,
+    load_manifest,
+    write_manifest,
+)
+
+
+class Command(BaseCommand):
+    help = 'Regenerate recipes/parsers/manifest.json, the domain -> module map used for lazy parser loading.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Exit with an error if the manifest is out of date instead of writing it')
+
+    def handle(self, *args, **options):
+        manifest = build_manifest()
+
+        if options['check']:
+            if load_manifest() != manifest:
+                raise CommandError(f"{MANIFEST_PATH} is out of date; run 'manage.py build_parser_manifest'")
+            self.stdout.write(self.style.SUCCESS(f"{MANIFEST_PATH} is up to date ({len(manifest)} domains)"))
+            return
+
+        write_manifest(manifest)
+        for domain, module_path in manifest.items():
+            self.stdout.write(f"  {domain} -> {module_path}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(manifest)} domains to {MANIFEST_PATH}"))
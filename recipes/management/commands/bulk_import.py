@@ -0,0 +1,54 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import ImportBatch
+from recipes.services import RecipeImportService
+
+
+class Command(BaseCommand):
+    help = 'Queue many recipe URLs for background import on the Celery "imports" queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', help='Recipe URLs to import')
+        parser.add_argument('--file', type=Path, help='Text file with one URL per line (# comments allowed)')
+        parser.add_argument('--future', action='store_true', help='Save imported recipes as future ideas')
+        parser.add_argument('--tags', default='', help='Comma-separated tags to add to every imported recipe')
+        parser.add_argument('--wait', action='store_true', help='Poll until every URL in the batch has been processed')
+
+    def handle(self, *args, **options):
+        urls = list(options['urls'])
+        if options['file']:
+            try:
+                urls.extend(options['file'].read_text().splitlines())
+            except OSError as e:
+                raise CommandError(f"Could not read {options['file']}: {e}")
+
+        if not urls:
+            raise CommandError('Please pass URLs or --file')
+
+        tags = [tag.strip() for tag in options['tags'].split(',') if tag.strip()]
+        batch = RecipeImportService.create_batch(urls, is_future=options['future'], tags=tags)
+        counts = batch.status_counts()
+        self.stdout.write(
+            f"Created import batch {batch.pk}: {counts['pending']} queued, "
+            f"{counts['duplicate']} already imported"
+        )
+
+        if options['wait']:
+            self.wait_for(batch)
+
+    def wait_for(self, batch: ImportBatch):
+        while not batch.is_complete:
+            counts = batch.status_counts()
+            self.stdout.write(f"  pending={counts['pending']} imported={counts['imported']} failed={counts['failed']}")
+            time.sleep(5)
+
+        for item in batch.items.filter(status='failed'):
+            self.stderr.write(self.style.ERROR(f"Failed: {item.url}: {item.error}"))
+        counts = batch.status_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f"Batch {batch.pk} complete: {counts['imported']} imported, "
+            f"{counts['duplicate']} duplicates, {counts['failed']} failed"
+        ))
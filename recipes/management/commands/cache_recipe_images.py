@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.images import cache_recipe_image, pillow_available
+from recipes.models import Recipe
+from recipes.tasks import cache_recipe_image_task
+
+
+class Command(BaseCommand):
+    help = 'Download recipe images once and store resized WebP/JPEG variants under MEDIA_ROOT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipe-id', type=int, help='Only cache this recipe')
+        parser.add_argument('--force', action='store_true', help='Rebuild variants even if image_url is already cached')
+        parser.add_argument('--queue', action='store_true', help='Queue Celery tasks instead of working inline')
+
+    def handle(self, *args, **options):
+        if not pillow_available():
+            raise CommandError('Pillow is not installed; install it to cache recipe images')
+
+        recipes = Recipe.objects.exclude(image_url__isnull=True).exclude(image_url='')
+        if options['recipe_id']:
+            recipes = recipes.filter(id=options['recipe_id'])
+        recipe_ids = list(recipes.values_list('id', flat=True))
+        self.stdout.write(f"Checking {len(recipe_ids)} recipe images")
+
+        if options['queue']:
+            for recipe_id in recipe_ids:
+                cache_recipe_image_task.delay(recipe_id)
+            self.stdout.write(self.style.SUCCESS(f"Queued {len(recipe_ids)} image tasks"))
+            return
+
+        cached = failed = 0
+        for recipe_id in recipe_ids:
+            try:
+                cached += cache_recipe_image(recipe_id, force=options['force'])
+            except Exception as e:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f"Recipe {recipe_id}: {e}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Cached {cached} images, {len(recipe_ids) - cached - failed} already cached, {failed} failed"
+        ))
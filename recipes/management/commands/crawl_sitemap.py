@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.crawler import SitemapCrawler
+
+
+class Command(BaseCommand):
+    help = (
+        "Read a site's sitemap (following sitemap indexes) and queue the recipe pages that are new "
+        "or changed since the last crawl for background import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help="Sitemap URL, or the site root to look up its sitemaps in robots.txt")
+        parser.add_argument(
+            '--include', action='append',
+            help="Regex a URL must match (repeatable); defaults to the site parser's RECIPE_URL_PATTERNS"
+        )
+        parser.add_argument('--exclude', action='append', default=[], help='Regex of URLs to skip (repeatable)')
+        parser.add_argument('--limit', type=int, help='Queue at most this many pages')
+        parser.add_argument('--force', action='store_true', help='Ignore stored lastmods and queue every matching page')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be queued without saving anything')
+        parser.add_argument('--future', action='store_true', help='Save imported recipes as future ideas')
+        parser.add_argument('--tags', default='', help='Comma-separated tags to add to every imported recipe')
+
+    def handle(self, *args, **options):
+        tags = [tag.strip() for tag in options['tags'].split(',') if tag.strip()]
+        crawler = SitemapCrawler(
+            options['url'],
+            include=options['include'],
+            exclude=options['exclude'],
+            limit=options['limit'],
+            force=options['force'],
+            dry_run=options['dry_run'],
+            is_future=options['future'],
+            tags=tags,
+        )
+        stats = crawler.run()
+
+        if stats.sitemaps == 0 and stats.sitemaps_unchanged == 0:
+            raise CommandError(f"No sitemap could be read for {options['url']}")
+
+        self.stdout.write(
+            f"Sitemaps: {stats.sitemaps} read, {stats.sitemaps_unchanged} unchanged, {stats.sitemaps_failed} failed"
+        )
+        self.stdout.write(
+            f"URLs: {stats.urls_seen} seen, {stats.urls_filtered} filtered out, {stats.urls_unchanged} unchanged"
+        )
+        verb = "Would queue" if options['dry_run'] else "Queued"
+        message = f"{verb} {stats.urls_queued} pages"
+        if crawler.batch:
+            message += f" in import batch {crawler.batch.pk} ({stats.urls_duplicate} already imported)"
+        self.stdout.write(self.style.SUCCESS(message))
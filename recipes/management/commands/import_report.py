@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What each long-running process imports before it can serve work
+PROCESS_IMPORTS = {
+    'web': "import django; django.setup(); import KitchenClip.wsgi, KitchenClip.urls",
+    'celery_worker': "import django; django.setup(); from KitchenClip.celery import app; app.loader.import_default_modules()",
+    'celery_beat': "import django; django.setup(); from KitchenClip.celery import app",
+    'flower': "import django; django.setup(); from KitchenClip.celery import app",
+    'first_import': (
+        "import django; django.setup(); import KitchenClip.urls; "
+        "from recipes.parsers.registry import ParserRegistry; "
+        "ParserRegistry.resolve('https://www.allrecipes.com/recipe/1/')"
+    ),
+}
+
+# Reproduces the old behaviour of importing every parser when recipes.parsers loads
+EAGER_PRELUDE = "import django; django.setup(); import recipes.parsers; recipes.parsers.discover_parsers(); "
+
+HEAVY_MODULES = ('bs4', 'recipe_scrapers', 'ingredient_slicer', 'lxml')
+
+
+def measure_imports(statement: str) -> tuple[float, set[str]]:
+    """
+    Run statement in a fresh interpreter with -X importtime.
+    Returns the total import time in milliseconds and the top-level packages loaded.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'KitchenClip.settings')}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, cwd=settings.BASE_DIR, env=env, check=True,
+    )
+
+    total_us = 0
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        total_us += int(self_us)
+        packages.add(name.split('.')[0])
+    return total_us / 1000, packages
+
+
+class Command(BaseCommand):
+    help = 'Report import time per process type (python -X importtime) and which heavy parser dependencies each one loads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--process', choices=sorted(PROCESS_IMPORTS), action='append', help='Only report these process types')
+        parser.add_argument('--compare-eager', action='store_true', help='Also measure with every parser imported up front, as before lazy loading')
+
+    def handle(self, *args, **options):
+        processes = options['process'] or list(PROCESS_IMPORTS)
+        compare = options['compare_eager']
+
+        header = f"{'process':<15} {'lazy ms':>9}"
+        if compare:
+            header += f" {'eager ms':>9} {'saved ms':>9}"
+        self.stdout.write(header + "  heavy modules loaded")
+
+        for name in processes:
+            statement = PROCESS_IMPORTS[name]
+            lazy_ms, packages = measure_imports(statement)
+            heavy = ", ".join(m for m in HEAVY_MODULES if m in packages) or "-"
+            line = f"{name:<15} {lazy_ms:>9.1f}"
+            if compare:
+                eager_ms, _ = measure_imports(EAGER_PRELUDE + statement)
+                line += f" {eager_ms:>9.1f} {eager_ms - lazy_ms:>9.1f}"
+            self.stdout.write(f"{line}  {heavy}")
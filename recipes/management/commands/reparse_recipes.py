@@ -1,17 +1,24 @@
 import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
-from recipes.ingredient_processor import (format_time_h_m,
-                                          parse_ingredient_line,
-                                          process_ingredients)
+from recipes.ingredient_processor import format_time_h_m, normalize_line
 from recipes.models import Ingredient, Recipe, RecipeIngredient
-from recipes.parsers.registry import ParserRegistry
+from recipes.parse_cache import load_parsed, save_parsed
+from recipes.parsers.snapshot import ParsedRecipe
+from recipes.reparse import ReparseJob, init_worker, reparse_job
 from recipes.utils import clean_instruction_line
 
 logger = logging.getLogger(__name__)
 
+# Recipes read, parsed and written per round
+CHUNK_SIZE = 500
+
 class Command(BaseCommand):
     help = 'Re-parse ingredients and metadata for existing recipes.'
 
@@ -19,11 +26,23 @@ class Command(BaseCommand):
         parser.add_argument('--recipe-id', type=int, help='ID of the recipe to re-parse')
         parser.add_argument('--all', action='store_true', help='Re-parse all recipes')
         parser.add_argument('--dry-run', action='store_true', help='Show changes without saving')
+        parser.add_argument(
+            '--from-snapshot', action='store_true',
+            help='Re-parse the source snapshot stored at import time instead of fetching; never uses the network'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Parse in this many worker processes; results are still written by this process alone'
+        )
+        parser.add_argument('--batch-size', type=int, default=100, help='Recipes saved per transaction')
 
     def handle(self, *args, **options):
         recipe_id = options.get('recipe_id')
         reparse_all = options.get('all')
         dry_run = options.get('dry_run')
+        from_snapshot = options.get('from_snapshot')
+        workers = max(1, options.get('workers') or 1)
+        batch_size = max(1, options.get('batch_size') or 1)
 
         if not recipe_id and not reparse_all:
             self.stderr.write(self.style.ERROR('Please specify --recipe-id or --all'))
@@ -34,117 +53,175 @@ class Command(BaseCommand):
         else:
             recipes = Recipe.objects.all()
 
-        total = recipes.count()
-        self.stdout.write(f"Processing {total} recipes")
+        if from_snapshot:
+            skipped = recipes.filter(source_snapshot__isnull=True).count()
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f"Skipping {skipped} recipes without a stored snapshot (re-parse them once without --from-snapshot)"
+                ))
+            recipes = recipes.filter(source_snapshot__isnull=False)
 
-        for recipe in recipes:
+        total = recipes.count()
+        self.stdout.write(f"Processing {total} recipes" + (f" with {workers} workers" if workers > 1 else ""))
+
+        self.done = 0
+        self.cache = [0, 0, 0, 0, 0]
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker) if workers > 1 else None
+        try:
+            # Submit each chunk before writing the previous one, so workers parse while we write
+            pending = None
+            rows = recipes.order_by('pk').iterator(chunk_size=CHUNK_SIZE)
+            while chunk := list(islice(rows, CHUNK_SIZE)):
+                jobs = self.build_jobs(chunk, from_snapshot)
+                if executor:
+                    results = executor.map(reparse_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+                else:
+                    results = map(reparse_job, jobs)
+                if pending:
+                    self.write_results(*pending, dry_run, batch_size, total)
+                pending = (chunk, results)
+            if pending:
+                self.write_results(*pending, dry_run, batch_size, total)
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+
+        hits, misses, evictions, fast_path, slicer = self.cache
+        lookups = hits + misses
+        parses = fast_path + slicer
+        self.stdout.write(
+            f"Ingredient parse cache: {hits} hits, {misses} misses, "
+            f"{evictions} evictions ({hits / lookups if lookups else 0:.0%} hit rate); "
+            f"{fast_path / parses if parses else 0:.0%} of parses took the fast path"
+        )
+
+    def build_jobs(self, recipes, from_snapshot):
+        """Everything a worker needs for each recipe, read here so workers never touch the database."""
+        existing_lines = defaultdict(list)
+        if not from_snapshot:
+            rows = RecipeIngredient.objects.filter(recipe__in=recipes).order_by('recipe_id', 'order')
+            for recipe_id, raw_text in rows.values_list('recipe_id', 'raw_text'):
+                existing_lines[recipe_id].append(raw_text)
+
+        jobs = [
+            ReparseJob(
+                recipe_id=recipe.id,
+                original_url=recipe.original_url,
+                existing_lines=existing_lines[recipe.id],
+                source_snapshot=bytes(recipe.source_snapshot) if from_snapshot else None,
+                from_snapshot=from_snapshot,
+            )
+            for recipe in recipes
+        ]
+        if settings.INGREDIENT_PARSE_CACHE_DB:
+            self.attach_known_lines(jobs)
+        return jobs
+
+    def attach_known_lines(self, jobs):
+        """Look up the stored parses of every line the chunk is expected to contain, in one pass."""
+        expected = {}
+        for job in jobs:
+            lines = job.existing_lines
+            if job.from_snapshot:
+                try:
+                    lines = ParsedRecipe.unpack(job.source_snapshot).ingredients
+                except ValueError:
+                    lines = ()
+            expected[job.recipe_id] = {normalize_line(line) for line in lines} - {""}
+
+        stored = load_parsed(set().union(*expected.values()))
+        for job in jobs:
+            job.known = {key: stored[key] for key in expected[job.recipe_id] if key in stored}
+
+    def write_results(self, recipes, results, dry_run, batch_size, total):
+        """Report each result in order and save them batch_size recipes per transaction."""
+        batch = []
+        for recipe, result in zip(recipes, results):
+            self.done += 1
+            self.cache = [a + b for a, b in zip(self.cache, result.cache)]
             self.stdout.write(f"Processing recipe: {recipe.title} (ID: {recipe.id})")
-            try:
-                self.reparse_recipe(recipe, dry_run)
-            except Exception as e:
-                self.stderr.write(self.style.ERROR(f"Error processing recipe {recipe.id}: {e}"))
-                logger.exception(f"Failed to re-parse recipe {recipe.id}")
-
-    def reparse_recipe(self, recipe, dry_run):
-        ingredient_lines = []
-        metadata = {}
-
-        if recipe.original_url:
-            self.stdout.write(f"Fetching from URL: {recipe.original_url}")
-            try:
-                parser = ParserRegistry.get_parser(recipe.original_url)
-                ingredient_lines = parser.ingredients
-                metadata = {
-                    'title': parser.title,
-                    'description': parser.description,
-                    'prep_time': parser.prep_time,
-                    'cook_time': parser.cook_time,
-                    'total_time': parser.total_time,
-                    'servings': parser.servings,
-                    'instructions': parser.instructions,
-                    'image_url': parser.image_url,
-                }
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f"Failed to parse URL, falling back to existing ingredients: {e}"))
-                # Fallback to existing ingredients if URL parsing fails
-                ingredient_lines = list(recipe.recipe_ingredients.values_list('raw_text', flat=True))
-        else:
-            self.stdout.write("No URL found, re-processing existing ingredients.")
-            ingredient_lines = list(recipe.recipe_ingredients.values_list('raw_text', flat=True))
-
-        if not ingredient_lines:
-            self.stdout.write(self.style.WARNING("No ingredients found to process."))
-            return
-
-        parsed_list = []
-        for line in ingredient_lines:
-            if not line.strip():
+            for level, message in result.notes:
+                self.stdout.write(self.style.WARNING(message) if level == "warning" else message)
+            if result.error:
+                self.stderr.write(self.style.ERROR(f"Error processing recipe {recipe.id}: {result.error}"))
                 continue
-            # Use centralized parsing logic
-            parsed_item = parse_ingredient_line(line)
-            
-            # If food becomes empty after cleaning, skip this item
-            if not parsed_item.get("food"):
+            if result.skipped:
+                continue
+            if dry_run:
+                self.show_changes(recipe, result)
                 continue
 
-            parsed_list.append(parsed_item)
-
-        # Process (consolidate, format, normalize)
-        processed_ingredients = process_ingredients(parsed_list)
-
-        if dry_run:
-            self.stdout.write("[Dry Run] Proposed changes:")
-            if metadata:
-                self.stdout.write("  - Metadata:")
-                for key, val in metadata.items():
-                    old_val = getattr(recipe, key, None)
-                    display_old = old_val
-                    display_new = val
-                    if key in ['prep_time', 'cook_time', 'total_time']:
-                        display_old = format_time_h_m(old_val) if old_val else "None"
-                        display_new = format_time_h_m(val) if val else "None"
-                    
-                    is_changed = old_val != val
-                    status = "(Changed)" if is_changed else "(Unchanged)"
-                    self.stdout.write(f"    * {key}: {display_old} -> {display_new} {status}")
-            
-            self.stdout.write("  - Ingredients:")
-            for item in processed_ingredients:
-                prep = f" ({item['prep']})" if item.get('prep') else ""
-                parts = [str(item['display_quantity']), str(item['unit']), item['food']]
-                self.stdout.write(f"    * {' '.join(p for p in parts if p).strip()}{prep}")
-            return
+            batch.append((recipe, result))
+            if len(batch) >= batch_size:
+                self.save_batch(batch)
+                batch = []
+        if batch:
+            self.save_batch(batch)
+        if total > CHUNK_SIZE:
+            self.stdout.write(f"Progress: {self.done}/{total} recipes")
 
+    def save_batch(self, batch):
         with transaction.atomic():
-            if metadata:
-                for key, val in metadata.items():
-                    if val is not None:
-                        setattr(recipe, key, val)
-
-            if recipe.instructions:
-                recipe.instructions = clean_instruction_line(recipe.instructions)
-                
-            recipe.save()
-
-            # Replace ingredients
-            recipe.recipe_ingredients.all().delete()
-            
-            for idx, item in enumerate(processed_ingredients):
-                name = item["food"]
-                ingredient, _ = Ingredient.objects.get_or_create(name=name)
-                
-                prep = f" ({item['prep']})" if item.get('prep') else ""
-                parts = [str(item['display_quantity']), str(item['unit']), name]
-                raw_text = f"{' '.join(p for p in parts if p).strip()}{prep}"
-                
-                RecipeIngredient.objects.create(
-                    recipe=recipe,
-                    ingredient=ingredient,
-                    raw_text=raw_text,
-                    quantity=item["display_quantity"],
-                    unit=item["unit"],
-                    preparation=item.get("prep", ""),
-                    order=idx
-                )
-            
-            self.stdout.write(self.style.SUCCESS(f"Successfully updated recipe {recipe.id}"))
+            if settings.INGREDIENT_PARSE_CACHE_DB:
+                save_parsed({key: parsed for _recipe, result in batch for key, parsed in result.parsed_lines.items()})
+            for recipe, result in batch:
+                try:
+                    # A savepoint each, so one bad recipe does not roll back the batch
+                    with transaction.atomic():
+                        self.apply_result(recipe, result)
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(f"Error processing recipe {recipe.id}: {e}"))
+                    logger.exception(f"Failed to re-parse recipe {recipe.id}")
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"Successfully updated recipe {recipe.id}"))
+
+    def show_changes(self, recipe, result):
+        self.stdout.write("[Dry Run] Proposed changes:")
+        if result.metadata:
+            self.stdout.write("  - Metadata:")
+            for key, val in result.metadata.items():
+                old_val = getattr(recipe, key, None)
+                display_old = old_val
+                display_new = val
+                if key in ['prep_time', 'cook_time', 'total_time']:
+                    display_old = format_time_h_m(old_val) if old_val else "None"
+                    display_new = format_time_h_m(val) if val else "None"
+
+                is_changed = old_val != val
+                status = "(Changed)" if is_changed else "(Unchanged)"
+                self.stdout.write(f"    * {key}: {display_old} -> {display_new} {status}")
+
+        self.stdout.write("  - Ingredients:")
+        for item in result.ingredients:
+            prep = f" ({item.prep})" if item.prep else ""
+            self.stdout.write(f"    * {item.raw_text}{prep}")
+
+    def apply_result(self, recipe, result):
+        for key, val in result.metadata.items():
+            if val is not None:
+                setattr(recipe, key, val)
+
+        if recipe.instructions:
+            recipe.instructions = clean_instruction_line(recipe.instructions)
+
+        if result.source_snapshot:
+            recipe.source_snapshot = result.source_snapshot
+        for key, val in result.identity.items():
+            setattr(recipe, key, val)
+
+        recipe.save()
+
+        # Replace ingredients
+        recipe.recipe_ingredients.all().delete()
+
+        for idx, item in enumerate(result.ingredients):
+            ingredient, _ = Ingredient.objects.get_or_create(name=item.food)
+            prep = f" ({item.prep})" if item.prep else ""
+
+            RecipeIngredient.objects.create(
+                recipe=recipe,
+                ingredient=ingredient,
+                raw_text=f"{item.raw_text}{prep}",
+                order=idx,
+                **item.row_fields(),
+            )
@@ -0,0 +1,41 @@
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes import ingredient_processor
+from recipes.models import ParsedIngredientLine, RecipeIngredient
+from recipes.parse_cache import QUERY_CHUNK, purge_stale, warm_lines
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the shared ingredient parse cache from every RecipeIngredient.raw_text, '
+        'and optionally delete results left by older parser versions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--purge', action='store_true', help='Also delete rows from other PARSER_VERSIONs')
+        parser.add_argument('--purge-only', action='store_true', help='Delete stale rows without warming')
+
+    def handle(self, *args, **options):
+        version = ingredient_processor.PARSER_VERSION
+        if options['purge'] or options['purge_only']:
+            deleted = purge_stale()
+            self.stdout.write(f"Deleted {deleted} cached parses from parser versions other than {version}")
+            if options['purge_only']:
+                return
+
+        if not settings.INGREDIENT_PARSE_CACHE_DB:
+            raise CommandError('INGREDIENT_PARSE_CACHE_DB is off; nothing reads the shared cache')
+
+        lines = RecipeIngredient.objects.values_list('raw_text', flat=True).distinct().iterator(chunk_size=2000)
+        seen = parsed = 0
+        while chunk := list(islice(lines, QUERY_CHUNK)):
+            seen += len(chunk)
+            parsed += warm_lines(chunk)
+
+        total = ParsedIngredientLine.objects.filter(parser_version=version).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {seen} distinct lines, parsed {parsed} new; {total} cached for parser version {version}"
+        ))
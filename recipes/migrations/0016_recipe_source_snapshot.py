@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_importbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='source_snapshot',
+            field=models.BinaryField(blank=True, help_text='Compressed ParsedRecipe (JSON-LD and raw ingredient lines) from the import', null=True),
+        ),
+    ]
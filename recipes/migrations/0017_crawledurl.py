@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0016_recipe_source_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawledUrl',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('kind', models.CharField(choices=[('page', 'Page'), ('sitemap', 'Sitemap')], default='page', max_length=10)),
+                ('lastmod', models.DateTimeField(blank=True, help_text='<lastmod> from the sitemap, if it had one', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.ForeignKey(blank=True, help_text='Batch the page was last queued in', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='crawled_urls', to='recipes.importbatch')),
+            ],
+            options={
+                'ordering': ['url'],
+            },
+        ),
+    ]
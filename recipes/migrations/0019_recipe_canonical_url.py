@@ -0,0 +1,112 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:38
+
+import hashlib
+import json
+import re
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.db import migrations, models
+
+# Frozen copies of recipes.parsers.canonical.canonical_url and the version 1
+# snapshot layout and ParsedRecipe.content_hash as they were when this migration
+# was written, so later changes to those modules cannot rewrite what it did
+
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid", "twclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref", "ref_src", "s_cid", "cmpid", "epik",
+}
+_TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_", "oly_")
+_VIEW_PARAMS = {"amp", "print", "format", "output", "noamp"}
+_AMP_CACHE_HOST = re.compile(r"\.cdn\.ampproject\.org$")
+_AMP_CACHE_PATH = re.compile(r"^/(?:[a-z]/)*(?:amp/)?(s/)?(?P<rest>[^/]+\.[^/]+/.*)$")
+_VIEW_SUFFIX = re.compile(r"/(?:amp|print(?:/\d+)?|recipe-print(?:/\d+)?)/?$")
+_AMP_HTML = re.compile(r"\.amp\.html?$")
+
+
+def _unwrap_amp_cache(url):
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if _AMP_CACHE_HOST.search(host) or (host.endswith("google.com") and parts.path.startswith("/amp/")):
+        match = _AMP_CACHE_PATH.match(parts.path)
+        if match:
+            scheme = "https" if match.group(1) or host.endswith("google.com") else "http"
+            query = f"?{parts.query}" if parts.query else ""
+            return f"{scheme}://{match.group('rest')}{query}"
+    return url
+
+
+def _strip_tracking(url):
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PREFIXES)
+    ]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def _canonical_url(url):
+    parts = urlsplit(_strip_tracking(_unwrap_amp_cache(url.strip())))
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = _AMP_HTML.sub(".html", parts.path)
+    path = re.sub(r"/wprm_print/", "/", path)
+    path = _VIEW_SUFFIX.sub("", path).rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _VIEW_PARAMS
+    ))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def _snapshot_content_hash(blob):
+    """content_hash of a version 1 packed snapshot, or "" if it cannot be read."""
+    try:
+        data = json.loads(zlib.decompress(bytes(blob)))
+    except (zlib.error, ValueError):
+        return ""
+    if data.get("v") != 1:
+        return ""
+
+    def normalize(text):
+        return re.sub(r"\s+", " ", text).strip().casefold()
+
+    lines = data.get("ingredients") or ()
+    payload = [normalize(data.get("title") or ""), sorted(normalize(line) for line in lines if line.strip())]
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+
+def backfill_identity(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    for recipe in Recipe.objects.exclude(original_url__isnull=True).exclude(original_url='').iterator():
+        recipe.canonical_url = _canonical_url(recipe.original_url)
+        if recipe.source_snapshot:
+            recipe.content_hash = _snapshot_content_hash(recipe.source_snapshot) or recipe.content_hash
+        recipe.save(update_fields=['canonical_url', 'content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0018_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='canonical_url',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text="Identity key of original_url or the page's rel=canonical (see recipes.parsers.canonical)", max_length=500),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Hash of the parsed title and ingredients, for spotting the same recipe at another URL', max_length=64),
+        ),
+        migrations.RunPython(backfill_identity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# Frozen copies of recipes.units and ingredient_processor.parse_quantity as they were
+# when this migration was written, so later changes to those modules cannot change it
+_TSP = 4.92892159375
+_BASE_UNITS = {}
+for _spellings, _factor, _base in (
+    (("ml", "mls", "milliliter", "milliliters", "millilitre", "millilitres"), 1.0, "ml"),
+    (("cl", "centiliter", "centiliters", "centilitre", "centilitres"), 10.0, "ml"),
+    (("dl", "deciliter", "deciliters", "decilitre", "decilitres"), 100.0, "ml"),
+    (("l", "liter", "liters", "litre", "litres"), 1000.0, "ml"),
+    (("tsp", "tsps", "teaspoon", "teaspoons"), _TSP, "ml"),
+    (("tbsp", "tbsps", "tbs", "tbl", "tablespoon", "tablespoons"), _TSP * 3, "ml"),
+    (("fl oz", "fl. oz", "floz", "fluid ounce", "fluid ounces"), _TSP * 6, "ml"),
+    (("cup", "cups"), _TSP * 48, "ml"),
+    (("pint", "pints", "pt", "pts"), _TSP * 96, "ml"),
+    (("quart", "quarts", "qt", "qts"), _TSP * 192, "ml"),
+    (("gallon", "gallons", "gal", "gals"), _TSP * 768, "ml"),
+    (("mg", "milligram", "milligrams"), 0.001, "g"),
+    (("g", "gs", "gram", "grams", "gramme", "grammes"), 1.0, "g"),
+    (("kg", "kgs", "kilogram", "kilograms", "kilo", "kilos"), 1000.0, "g"),
+    (("oz", "ozs", "ounce", "ounces"), 28.349523125, "g"),
+    (("lb", "lbs", "pound", "pounds"), 453.59237, "g"),
+    *(
+        ((name, plural), 1.0, name)
+        for name, plural in (
+            ("pinch", "pinches"), ("dash", "dashes"), ("drizzle", "drizzles"), ("handful", "handfuls"),
+            ("sprig", "sprigs"), ("clove", "cloves"), ("slice", "slices"), ("piece", "pieces"),
+            ("bunch", "bunches"), ("can", "cans"), ("bottle", "bottles"), ("jar", "jars"),
+            ("package", "packages"), ("packet", "packets"), ("stick", "sticks"), ("drop", "drops"),
+            ("sheet", "sheets"), ("cube", "cubes"), ("ear", "ears"), ("fillet", "fillets"),
+        )
+    ),
+):
+    for _spelling in _spellings:
+        _BASE_UNITS[_spelling] = (_factor, _base)
+
+_DISPLAY_QUANTITY = re.compile(
+    r'(?:(\d+) lb )?(?:(\d+(?:\.\d+)?)?([½⅓⅔¼¾⅕⅖⅗⅘⅙⅚⅛⅜⅝⅞])?|(?:(\d+) )?(\d+)/(\d+))'
+)
+
+
+def _canonical_quantity(display, unit):
+    """(quantity_value, canonical_unit) for a stored quantity such as "1½" or "2 lb 4" and its unit."""
+    factor, base_unit = _BASE_UNITS.get((unit or "").strip().lower().rstrip("."), (None, (unit or "").strip().lower()))
+    match = _DISPLAY_QUANTITY.fullmatch((display or "").strip())
+    if not match:
+        return None, base_unit
+    pounds, whole, char, mixed_whole, num, den = match.groups()
+    if num is not None:
+        if not int(den):
+            return None, base_unit
+        value = int(mixed_whole or 0) + int(num) / int(den)
+    elif whole or char:
+        value = float(whole or 0) + (unicodedata.numeric(char) if char else 0)
+    else:
+        return None, base_unit
+    if pounds is not None:
+        if base_unit != "g" or factor != 28.349523125:
+            return None, base_unit
+        value += int(pounds) * 16
+    if not value:
+        return None, base_unit
+    return (round(value * factor, 3) if factor else value), base_unit
+
+
+def backfill_quantities(apps, schema_editor):
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    fields = ['quantity_value', 'canonical_unit', 'preparation']
+    batch = []
+    for row in RecipeIngredient.objects.only('quantity', 'unit', 'preparation').iterator(chunk_size=BATCH_SIZE):
+        row.quantity_value, row.canonical_unit = _canonical_quantity(row.quantity, row.unit)
+        # Imports before this migration never stored preparation, so a blank one is unknown
+        # rather than "none"; reparse_recipes fills it in
+        row.preparation = row.preparation or None
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            RecipeIngredient.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        RecipeIngredient.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0020_parsedingredientline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='quantity_value',
+            field=models.FloatField(blank=True, db_index=True, help_text='Quantity in canonical_unit; empty when the quantity is not a number', null=True),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='canonical_unit',
+            field=models.CharField(blank=True, db_index=True, help_text='ml, g, a count unit such as clove, or the unit as written when it is not a known one', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='recipeingredient',
+            name='preparation',
+            field=models.CharField(blank=True, db_index=True, help_text='Parsed preparation; empty (null) for rows imported before it was stored, until reparse_recipes runs', max_length=100, null=True),
+        ),
+        migrations.RunPython(backfill_quantities, migrations.RunPython.noop),
+    ]
@@ -23,6 +23,14 @@ class Recipe(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     original_url = models.URLField(blank=True, null=True, help_text="Original recipe URL", unique=True)
+    canonical_url = models.CharField(
+        max_length=500, blank=True, db_index=True, editable=False,
+        help_text="Identity key of original_url or the page's rel=canonical (see recipes.parsers.canonical)"
+    )
+    content_hash = models.CharField(
+        max_length=64, blank=True, db_index=True, editable=False,
+        help_text="Hash of the parsed title and ingredients, for spotting the same recipe at another URL"
+    )
     prep_time = models.PositiveIntegerField(null=True, blank=True, help_text="Prep time in minutes")
     cook_time = models.PositiveIntegerField(null=True, blank=True, help_text="Cook time in minutes")
     total_time = models.PositiveIntegerField(null=True, blank=True, help_text="Total time in minutes")
@@ -37,6 +45,10 @@ class Recipe(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     image_url = models.URLField(blank=True, null=True, max_length=300)
+    image_variants = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Locally cached resizes of image_url (see recipes.images)"
+    )
     tags = models.ManyToManyField('RecipeTag', blank=True, related_name='recipes')
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -46,6 +58,10 @@ class Recipe(models.Model):
     )
     is_future = models.BooleanField(default=False, help_text="Save to try in the future")
     is_on_menu = models.BooleanField(default=False, help_text="Add to weekly menu")
+    source_snapshot = models.BinaryField(
+        null=True, blank=True, editable=False,
+        help_text="Compressed ParsedRecipe (JSON-LD and raw ingredient lines) from the import"
+    )
 
     class Meta:
         ordering = ['-created_at']
@@ -86,7 +102,19 @@ class RecipeIngredient(models.Model):
     raw_text = models.CharField(max_length=200)
     quantity = models.CharField(max_length=50, blank=True)
     unit = models.CharField(max_length=50, blank=True)
-    preparation = models.CharField(max_length=100, blank=True)
+    # quantity as a number in canonical_unit, for sums and comparisons in SQL (see recipes.units)
+    quantity_value = models.FloatField(
+        null=True, blank=True, db_index=True,
+        help_text="Quantity in canonical_unit; empty when the quantity is not a number"
+    )
+    canonical_unit = models.CharField(
+        max_length=50, blank=True, db_index=True,
+        help_text="ml, g, a count unit such as clove, or the unit as written when it is not a known one"
+    )
+    preparation = models.CharField(
+        max_length=100, blank=True, null=True, db_index=True,
+        help_text="Parsed preparation; empty (null) for rows imported before it was stored, until reparse_recipes runs"
+    )
     order = models.PositiveIntegerField(default=0)
 
     class Meta:
@@ -165,3 +193,95 @@ class MealPlan(models.Model):
     def __str__(self) -> str:
         meal_name = self.recipe.title if self.recipe else self.custom_meal
         return f"{self.date} {self.meal_type}: {meal_name}"
+
+
+class ImportBatch(models.Model):
+    """A group of recipe URLs submitted together for background import."""
+    is_future = models.BooleanField(default=False, help_text="Save imported recipes to try in the future")
+    tags = models.JSONField(default=list, blank=True, help_text="Tag names applied to every imported recipe")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self) -> str:
+        return f"Import batch {self.pk} ({self.created_at:%Y-%m-%d %H:%M})"
+
+    def status_counts(self) -> dict[str, int]:
+        """Return the number of items in each status, including zero counts."""
+        counts = dict.fromkeys(ImportBatchItem.Status.values, 0)
+        for row in self.items.values('status').annotate(count=models.Count('id')):
+            counts[row['status']] = row['count']
+        return counts
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.items.filter(status=ImportBatchItem.Status.PENDING).exists()
+
+
+class ImportBatchItem(models.Model):
+    """One URL in an ImportBatch and the outcome of importing it."""
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        IMPORTED = 'imported', 'Imported'
+        DUPLICATE = 'duplicate', 'Duplicate'
+        FAILED = 'failed', 'Failed'
+
+    batch = models.ForeignKey(ImportBatch, on_delete=models.CASCADE, related_name='items')
+    url = models.URLField(max_length=500)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, db_index=True)
+    recipe = models.ForeignKey(Recipe, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_items')
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self) -> str:
+        return f"{self.url} ({self.status})"
+
+
+class CrawledUrl(models.Model):
+    """
+    Last sitemap <lastmod> seen for a page or child sitemap, so that
+    re-running crawl_sitemap only fetches what changed since.
+    """
+    class Kind(models.TextChoices):
+        PAGE = 'page', 'Page'
+        SITEMAP = 'sitemap', 'Sitemap'
+
+    url = models.URLField(max_length=500, unique=True)
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.PAGE)
+    lastmod = models.DateTimeField(null=True, blank=True, help_text="<lastmod> from the sitemap, if it had one")
+    batch = models.ForeignKey(
+        ImportBatch, on_delete=models.SET_NULL, null=True, blank=True, related_name='crawled_urls',
+        help_text="Batch the page was last queued in"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['url']
+
+    def __str__(self) -> str:
+        return f"{self.url} ({self.lastmod or 'no lastmod'})"
+
+
+class ParsedIngredientLine(models.Model):
+    """
+    A parse_ingredient_line result shared by every process (web, Celery,
+    reparse_recipes), keyed by a hash of the normalized line and the
+    PARSER_VERSION that produced it. See recipes.parse_cache.
+    """
+    line_hash = models.CharField(max_length=64)
+    parser_version = models.PositiveIntegerField()
+    line = models.TextField()
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['line_hash', 'parser_version'], name='unique_parsed_line_per_version'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.line} (v{self.parser_version})"
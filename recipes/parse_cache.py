@@ -0,0 +1,92 @@
+"""
+The shared tier of the ingredient parse cache.
+
+parse_ingredient_line memoizes per process; ParsedIngredientLine keeps the
+same results in the database so Gunicorn workers that were recycled, Celery
+workers and reparse_recipes all start warm. warm_lines handles a recipe's
+lines with one query for the stored ones and one bulk insert for the rest,
+after which parse_ingredients runs entirely from memory.
+
+Rows are keyed by a hash of the normalized line plus PARSER_VERSION, so a
+version bump simply stops matching old rows; warm_parse_cache --purge
+deletes them.
+"""
+import hashlib
+
+from django.conf import settings
+
+from . import ingredient_processor
+from .ingredient_processor import (
+    cached_parses,
+    normalize_line,
+    parse_ingredient_line,
+    prime_parse_cache,
+)
+from .models import ParsedIngredientLine
+
+# Lines per query; stays under SQLite's bound-parameter limit
+QUERY_CHUNK = 500
+
+
+def line_hash(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _chunks(items: list, size: int = QUERY_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def load_parsed(keys) -> dict[str, dict]:
+    """Stored results for the given normalized lines at the current PARSER_VERSION."""
+    by_hash = {line_hash(key): key for key in keys}
+    found = {}
+    for hashes in _chunks(list(by_hash)):
+        rows = ParsedIngredientLine.objects.filter(
+            parser_version=ingredient_processor.PARSER_VERSION, line_hash__in=hashes,
+        ).values_list('line_hash', 'result')
+        for digest, result in rows:
+            found[by_hash[digest]] = result
+    return found
+
+
+def save_parsed(results: dict[str, dict]) -> int:
+    """Store results for normalized lines; rows that already exist are left alone. Returns rows sent."""
+    version = ingredient_processor.PARSER_VERSION
+    rows = [
+        ParsedIngredientLine(line_hash=line_hash(key), parser_version=version, line=key, result=result)
+        for key, result in results.items()
+    ]
+    for chunk in _chunks(rows):
+        ParsedIngredientLine.objects.bulk_create(chunk, ignore_conflicts=True)
+    return len(rows)
+
+
+def warm_lines(lines) -> int:
+    """
+    Make sure every line is in both the in-process parse cache and the
+    shared table: one query loads the stored results, and lines the table
+    lacks are parsed (unless this process already has them) and inserted
+    in bulk. Returns how many lines were added to the table. Does nothing
+    when INGREDIENT_PARSE_CACHE_DB is off.
+    """
+    if not settings.INGREDIENT_PARSE_CACHE_DB:
+        return 0
+
+    keys = {normalize_line(line) for line in lines}
+    keys.discard("")
+    if not keys:
+        return 0
+
+    stored = load_parsed(keys)
+    in_memory = cached_parses(keys)
+    prime_parse_cache({key: result for key, result in stored.items() if key not in in_memory})
+    fresh = {key: in_memory.get(key) or parse_ingredient_line(key) for key in keys - stored.keys()}
+    save_parsed(fresh)
+    return len(fresh)
+
+
+def purge_stale() -> int:
+    """Delete rows written by other parser versions. Returns rows deleted."""
+    deleted, _ = ParsedIngredientLine.objects.exclude(parser_version=ingredient_processor.PARSER_VERSION).delete()
+    return deleted
@@ -1,17 +1,17 @@
-import importlib
-import pkgutil
-
-from .demo_parser import DemoParser
+# Parser modules (and their bs4 / recipe-scrapers dependencies) are imported
+# lazily by ParserRegistry the first time a URL for their domain is resolved.
+# See manifest.json, generated by 'manage.py build_parser_manifest'.
+from .manifest import discover_parsers
 from .registry import ParserRegistry, register_parser
-from .scrapers_parser import ScrapersParser
-
 
-# Automatically discover and register all parsers in this package
-def discover_parsers():
-    for loader, module_name, is_pkg in pkgutil.walk_packages(__path__):
-        if module_name not in ["registry", "base", "scrapers_parser", "demo_parser"]:
-            importlib.import_module(f".{module_name}", __package__)
 
-discover_parsers()
+def __getattr__(name):
+    if name == "ScrapersParser":
+        from .scrapers_parser import ScrapersParser
+        return ScrapersParser
+    if name == "DemoParser":
+        from .demo_parser import DemoParser
+        return DemoParser
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = ["ParserRegistry", "register_parser", "ScrapersParser", "DemoParser"]
+__all__ = ["ParserRegistry", "register_parser", "ScrapersParser", "DemoParser", "discover_parsers"]
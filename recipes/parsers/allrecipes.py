@@ -8,3 +8,4 @@ class AllrecipesParser(BaseParser):
     Parser for allrecipes.com.
     """
     SUPPORTED_DOMAINS = ["allrecipes.com"]
+    RECIPE_URL_PATTERNS = [r"/recipe/\d+/", r"-recipe-\d+/?$"]
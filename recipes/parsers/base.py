@@ -1,66 +1,114 @@
-import json
+import asyncio
 import logging
 import re
 from abc import ABC
 
-import httpx
 from bs4 import BeautifulSoup
-
-from recipe_scrapers import scrape_me, scrape_html
+from recipe_scrapers import scrape_html
 
 from recipes.ingredient_processor import format_time_h_m
 
+from .canonical import canonical_url, find_canonical_link
+from .fetch import afetch_page, fetch_page, require_full_body
+from .politeness import increment_counter, parse_path_counter
+from .snapshot import (
+    PARSE_JSON_LD,
+    PARSE_NETWORK_REFETCH,
+    PARSE_SCRAPER_CACHED,
+    ParsedRecipe,
+)
+from .utils import find_json_ld
+
 logger = logging.getLogger(__name__)
 
 
+def _html_to_text(value) -> str:
+    """Strip tags from a JSON-LD string, skipping the soup build for plain text."""
+    text = str(value)
+    if '<' not in text and '&' not in text:
+        return text.strip()
+    return BeautifulSoup(text, "html.parser").get_text().strip()
+
+
+class _SnapshotScraper:
+    """
+    Stands in for recipe-scrapers when re-parsing a stored snapshot: the
+    fallback answers with the values the original parse settled on.
+    """
+
+    def __init__(self, snapshot: ParsedRecipe):
+        self._snapshot = snapshot
+
+    def __getattr__(self, name):
+        field = {"image": "image_url", "yields": "servings"}.get(name, name)
+        value = getattr(self._snapshot, field)
+        if field == "ingredients":
+            value = list(value)
+        return lambda: value
+
+
 class BaseParser(ABC):
     """
     Abstract base class for all recipe parsers.
     Any custom parser should inherit from this and implement the methods.
     """
+    # Regexes (re.search on the URL) that pick recipe pages out of the site's
+    # sitemap for crawl_sitemap; empty means every URL is a candidate.
+    RECIPE_URL_PATTERNS: list[str] = []
     
-    def __init__(self, url: str):
+    def __init__(self, url: str, html: str | None = None, max_wait: float | None = None):
         self.url = url
+        # Longest each fetch waits on the domain's rate limit (see polite_slot)
+        self._max_wait = max_wait
         self._recipe_data = {}
         self._scraper = None  # Optional recipe-scrapers instance
         self._scraper_attempted = False
-        self.html = self._fetch_html(url)
+        # True when the fetch stopped after the JSON-LD block (see fetch_page)
+        self._html_partial = False
+        self.parse_path = PARSE_JSON_LD
+        # Set by from_snapshot; offline re-parses are not counted per path
+        self._offline = False
+        self._canonical_link = None
+        # Callers that already fetched the page (e.g. afrom_url) pass it in
+        self.html = html if html is not None else self._fetch_html(url)
         
         # Perform standard discovery automatically
         self._recipe_data = self._get_json_ld_data()
 
+    @classmethod
+    async def afrom_url(cls, url: str) -> "BaseParser":
+        """
+        Async factory: fetch the page with the pooled AsyncClient, then run
+        JSON-LD extraction in a worker thread so the event loop stays free.
+        """
+        page = await afetch_page(url)
+        parser = await asyncio.to_thread(cls, url, page.html if page else "")
+        parser._html_partial = bool(page and page.partial)
+        return parser
+
+    @classmethod
+    def from_snapshot(cls, snapshot: ParsedRecipe) -> "BaseParser":
+        """
+        Offline factory: re-parse the JSON-LD stored on a snapshot without any
+        network access. Fields the JSON-LD lacks fall back to the snapshot's
+        own values instead of a scraper run.
+        """
+        parser = cls(snapshot.url, html="")
+        parser._recipe_data = snapshot.json_ld or {}
+        parser._scraper = _SnapshotScraper(snapshot)
+        parser._scraper_attempted = True
+        parser.parse_path = snapshot.parse_path
+        parser._canonical_link = snapshot.canonical_url or None
+        parser._offline = True
+        return parser
+
     def _fetch_html(self, url: str) -> str | None:
-        """Fetch HTML content from the URL with robust headers using httpx."""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate',
-            'Referer': 'https://www.google.com/',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'cross-site',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-        }
-        try:
-            with httpx.Client(follow_redirects=True, timeout=15.0) as client:
-                response = client.get(url, headers=headers)
-                
-                if response.status_code == 403:
-                    logger.warning(f"Access forbidden (403) for {url}. Possible bot detection.")
-                
-                response.raise_for_status()
-                return response.text
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code} fetching HTML from {url}")
-            return None
-        except Exception as e:
-            logger.error(f"Failed to fetch HTML from {url}: {e}")
+        """Fetch HTML content from the URL through the shared client and HTML cache."""
+        page = fetch_page(url, max_wait=self._max_wait)
+        if page is None:
             return None
+        self._html_partial = page.partial
+        return page.html
 
     def _get_json_ld_data(self, target_type: str = "Recipe") -> dict | None:
         """
@@ -71,40 +119,7 @@ class BaseParser(ABC):
             return None
 
         try:
-            soup = BeautifulSoup(self.html, 'html.parser')
-            scripts = soup.find_all('script', type='application/ld+json')
-
-            for script in scripts:
-                content = script.string if script.string else ""
-                if not content:
-                    continue
-                
-                try:
-                    data = json.loads(content)
-                except json.JSONDecodeError:
-                    continue
-
-                # JSON-LD can be a single object, a list of objects, or an @graph array
-                blocks = []
-                if isinstance(data, list):
-                    blocks.extend(data)
-                else:
-                    blocks.append(data)
-
-                for block in blocks:
-                    # Check for @graph
-                    if '@graph' in block:
-                        for item in block['@graph']:
-                            item_type = item.get('@type')
-                            if item_type == target_type or (isinstance(item_type, list) and target_type in item_type):
-                                return item
-                    # Check direct type
-                    else:
-                        block_type = block.get('@type')
-                        if block_type == target_type or (isinstance(block_type, list) and target_type in block_type):
-                            return block
-            
-            return None
+            return find_json_ld(self.html, target_type)
         except Exception as e:
             logger.error(f"Error extracting JSON-LD for {self.url}: {e}")
             return None
@@ -116,14 +131,33 @@ class BaseParser(ABC):
             return
 
         try:
-            if self.html:
-                self._scraper = scrape_html(html=self.html, org_url=self.url)
-            else:
-                self._scraper = scrape_me(self.url)
+            html = self.html
+            self.parse_path = PARSE_SCRAPER_CACHED
+            if not html or self._html_partial:
+                # recipe-scrapers reads the whole document, so fetch it in full
+                # (through the same pool, cache and rate limits) rather than the
+                # body we cut short after the JSON-LD block.
+                if self._html_partial:
+                    require_full_body(self.url)
+                page = fetch_page(self.url, full=True, max_wait=self._max_wait)
+                if page is None or not page.from_cache:
+                    self.parse_path = PARSE_NETWORK_REFETCH
+                if page is None:
+                    raise ValueError("page could not be fetched")
+                self.html, self._html_partial = page.html, False
+                html = page.html
+            self._scraper = scrape_html(html=html, org_url=self.url)
             logger.info(f"Initialized scraper fallback for {self.url}")
         except Exception as e:
             logger.warning(f"Scraper fallback failed for {self.url}: {e}")
 
+    @property
+    def canonical_url(self) -> str:
+        """Identity key for the page: its <link rel=canonical> if it has one, else the fetched URL."""
+        if self._canonical_link is None:
+            self._canonical_link = find_canonical_link(self.html) or ""
+        return canonical_url(self._canonical_link or self.url)
+
     def _get_scraper_val(self, method_name: str, default: any = None) -> any:
         """Safely extract a value from the scraper fallback."""
         if not self._scraper and not getattr(self, '_scraper_attempted', False):
@@ -143,7 +177,7 @@ class BaseParser(ABC):
         """Return the recipe title from JSON-LD name or scraper fallback."""
         t = ""
         if self._recipe_data and 'name' in self._recipe_data:
-            t = BeautifulSoup(str(self._recipe_data['name']), "html.parser").get_text().strip()
+            t = _html_to_text(self._recipe_data['name'])
         
         if not t:
             t = self._get_scraper_val("title", "")
@@ -219,7 +253,7 @@ class BaseParser(ABC):
         """Return a brief description from JSON-LD or scraper fallback."""
         d = ""
         if self._recipe_data and 'description' in self._recipe_data:
-            d = BeautifulSoup(str(self._recipe_data['description']), "html.parser").get_text().strip()
+            d = _html_to_text(self._recipe_data['description'])
         
         if not d:
             d = self._get_scraper_val("description", "")
@@ -275,6 +309,13 @@ class BaseParser(ABC):
     @property
     def total_time(self) -> int | None:
         """Return total time from JSON-LD or scraper fallback."""
+        return self._resolve_total_time()
+
+    def _resolve_total_time(self, prep_time: int | None = None, cook_time: int | None = None) -> int | None:
+        """
+        Total time from JSON-LD or the scraper, else the sum of prep and cook.
+        Already computed prep/cook values can be passed in to avoid re-evaluating them.
+        """
         t = None
         if self._recipe_data and 'totalTime' in self._recipe_data:
             from .utils import parse_iso_duration
@@ -287,8 +328,8 @@ class BaseParser(ABC):
             return t
 
         # Fallback to sum
-        pt = self.prep_time or 0
-        ct = self.cook_time or 0
+        pt = (self.prep_time if prep_time is None else prep_time) or 0
+        ct = (self.cook_time if cook_time is None else cook_time) or 0
         return pt + ct if pt + ct > 0 else 0
 
     @property
@@ -311,6 +352,39 @@ class BaseParser(ABC):
         
         return s if s is not None else 1
 
+    def to_snapshot(self) -> ParsedRecipe:
+        """
+        Compute every field exactly once and return them as an immutable,
+        JSON-serializable ParsedRecipe. Subclass property overrides are honoured.
+        Also counts which parse path (see PARSE_PATHS) the page needed.
+        """
+        prep_time = self.prep_time
+        cook_time = self.cook_time
+        if type(self).total_time is BaseParser.total_time:
+            total_time = self._resolve_total_time(prep_time, cook_time)
+        else:
+            total_time = self.total_time
+
+        snapshot = ParsedRecipe(
+            url=self.url,
+            title=self.title,
+            description=self.description,
+            ingredients=tuple(self.ingredients or ()),
+            instructions=self.instructions,
+            image_url=self.image_url,
+            prep_time=prep_time,
+            cook_time=cook_time,
+            total_time=total_time,
+            servings=self.servings,
+            parse_path=self.parse_path,
+            json_ld=self._recipe_data or None,
+            canonical_url=self.canonical_url,
+        )
+        if not self._offline:
+            logger.info(f"Parsed {self.url} via {self.parse_path}")
+            increment_counter(parse_path_counter(self.parse_path))
+        return snapshot
+
     @property
     def prep_time_str(self) -> str:
         return format_time_h_m(self.prep_time)
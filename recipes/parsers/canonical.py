@@ -0,0 +1,87 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a visit came from
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid", "twclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref", "ref_src", "s_cid", "cmpid", "epik",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_", "oly_")
+# Query parameters that switch a recipe page into its AMP or print view
+VIEW_PARAMS = {"amp", "print", "format", "output", "noamp"}
+
+_AMP_CACHE_HOST = re.compile(r"\.cdn\.ampproject\.org$")
+# /c/s/<host>/<path> on the AMP cache, /amp/s/<host>/<path> on google.com
+_AMP_CACHE_PATH = re.compile(r"^/(?:[a-z]/)*(?:amp/)?(s/)?(?P<rest>[^/]+\.[^/]+/.*)$")
+# Trailing AMP and print segments: /amp/, /print/, /print/1234/, /wprm_print/...
+_VIEW_SUFFIX = re.compile(r"/(?:amp|print(?:/\d+)?|recipe-print(?:/\d+)?)/?$")
+_AMP_HTML = re.compile(r"\.amp\.html?$")
+
+_LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_ATTR = re.compile(r"""([a-z:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+_HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+
+
+def _unwrap_amp_cache(url: str) -> str:
+    """Turn an AMP cache or google.com/amp URL back into the publisher's URL."""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if _AMP_CACHE_HOST.search(host) or (host.endswith("google.com") and parts.path.startswith("/amp/")):
+        match = _AMP_CACHE_PATH.match(parts.path)
+        if match:
+            scheme = "https" if match.group(1) or host.endswith("google.com") else "http"
+            query = f"?{parts.query}" if parts.query else ""
+            return f"{scheme}://{match.group('rest')}{query}"
+    return url
+
+
+def strip_tracking(url: str) -> str:
+    """Drop tracking query parameters and the fragment, keeping everything else as given."""
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def canonical_url(url: str) -> str:
+    """
+    The identity key for a recipe URL. Spellings of the same page map to
+    one key: tracking parameters, AMP and print views, AMP cache wrappers,
+    www./m./amp. hosts, http vs https, default ports, trailing slashes and
+    query order are all collapsed. The key is for matching, not fetching.
+    """
+    parts = urlsplit(strip_tracking(_unwrap_amp_cache(url.strip())))
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = _AMP_HTML.sub(".html", parts.path)
+    path = re.sub(r"/wprm_print/", "/", path)
+    path = _VIEW_SUFFIX.sub("", path).rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in VIEW_PARAMS
+    ))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def find_canonical_link(html: str | None) -> str | None:
+    """Return the href of <link rel="canonical"> in the page head, if there is one."""
+    if not html:
+        return None
+    head_end = _HEAD_END.search(html)
+    head = html[:head_end.start()] if head_end else html
+    for tag in _LINK_TAG.findall(head):
+        attrs = {
+            match.group(1).lower(): next(v for v in match.groups()[1:] if v is not None)
+            for match in _ATTR.finditer(tag)
+        }
+        if "canonical" in attrs.get("rel", "").lower().split() and attrs.get("href", "").startswith("http"):
+            return attrs["href"].strip()
+    return None
@@ -0,0 +1,314 @@
+import asyncio
+import codecs
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+from django.conf import settings
+
+from recipes.http_client import BROWSER_HEADERS, http_clients
+
+from .html_cache import CachedPage, HtmlCache, get_html_cache
+from .politeness import (
+    THROTTLE_STATUSES,
+    DomainThrottled,
+    apolite_slot,
+    domain_key,
+    polite_slot,
+    record_fetch_failure,
+    record_response,
+    unavailable_reason,
+)
+from .utils import find_json_ld
+
+logger = logging.getLogger(__name__)
+
+_JSON_LD_MARKER = "application/ld+json"
+_SCRIPT_OPEN = re.compile(r"<script\b", re.IGNORECASE)
+_SCRIPT_CLOSE = re.compile(r"</script\s*>", re.IGNORECASE)
+# Enough trailing text to spot either tag split across two chunks
+_TAG_OVERLAP = 16
+
+# Domains whose pages needed the full body (scraper fallback); reading them
+# in full from the start avoids a second request for every page. Entries
+# expire after FULL_BODY_TTL and at most FULL_BODY_MAX_DOMAINS are kept, so
+# a site that fixes its markup goes back to early stops.
+FULL_BODY_TTL = 24 * 60 * 60
+FULL_BODY_MAX_DOMAINS = 1000
+_full_body_domains: OrderedDict[str, float] = OrderedDict()
+_full_body_lock = threading.Lock()
+
+
+def require_full_body(url: str):
+    """Read later pages from url's domain in full instead of stopping early."""
+    with _full_body_lock:
+        _full_body_domains[domain_key(url)] = time.monotonic() + FULL_BODY_TTL
+        _full_body_domains.move_to_end(domain_key(url))
+        while len(_full_body_domains) > FULL_BODY_MAX_DOMAINS:
+            _full_body_domains.popitem(last=False)
+
+def needs_full_body(url: str) -> bool:
+    with _full_body_lock:
+        domain = domain_key(url)
+        expires = _full_body_domains.get(domain)
+        if expires is not None and expires <= time.monotonic():
+            del _full_body_domains[domain]
+            expires = None
+        return expires is not None
+
+def reset_full_body_domains():
+    with _full_body_lock:
+        _full_body_domains.clear()
+
+
+class _BoundedBody:
+    """
+    Incrementally decodes a streamed response body.
+
+    Reading stops at FETCH_MAX_BYTES, and, unless the full page was asked
+    for, as soon as a complete Recipe JSON-LD block has arrived. Blogs
+    often put that block near the top and follow it with megabytes of ads
+    and comments we never look at.
+    """
+
+    def __init__(self, encoding: str | None, max_bytes: int, stop_at_recipe: bool):
+        self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        self._parts: list[str] = []
+        self._size = 0
+        self._max_bytes = max_bytes
+        self._stop_at_recipe = stop_at_recipe
+        # The <script> element being received (or the last few characters
+        # between elements), and where to resume searching it
+        self._pending = ""
+        self._search_from = 0
+        self._in_script = False
+        self.truncated = False
+        self.stopped_early = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk; returns True once no more of the body is needed."""
+        remaining = self._max_bytes - self._size
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+            self.truncated = True
+        self._size += len(chunk)
+
+        text = self._decoder.decode(chunk)
+        self._parts.append(text)
+        if self.truncated:
+            return True
+
+        if self._stop_at_recipe and self._recipe_complete(text):
+            self.stopped_early = True
+            return True
+        return False
+
+    def _recipe_complete(self, text: str) -> bool:
+        """
+        Check each <script> element once, as its closing tag arrives. Only the
+        element being received is buffered and every character is searched a
+        bounded number of times, so the cost stays linear in the body size.
+        """
+        self._pending += text
+        while True:
+            if not self._in_script:
+                opening = _SCRIPT_OPEN.search(self._pending, self._search_from)
+                if opening is None:
+                    # Keep just enough to catch a "<script" split across chunks
+                    self._pending = self._pending[-_TAG_OVERLAP:]
+                    self._search_from = 0
+                    return False
+                self._pending = self._pending[opening.start():]
+                self._search_from = 0
+                self._in_script = True
+
+            close = _SCRIPT_CLOSE.search(self._pending, self._search_from)
+            if close is None:
+                self._search_from = max(0, len(self._pending) - _TAG_OVERLAP)
+                return False
+            block = self._pending[:close.end()]
+            self._pending = self._pending[close.end():]
+            self._search_from = 0
+            self._in_script = False
+            if _JSON_LD_MARKER in block[:block.find(">") + 1].lower():
+                try:
+                    if find_json_ld(block) is not None:
+                        return True
+                except (AttributeError, TypeError):
+                    # JSON-LD that is valid JSON but not objects; keep reading
+                    continue
+
+    def text(self) -> str:
+        return "".join(self._parts) + self._decoder.decode(b"", final=True)
+
+
+def _lookup(url: str, full: bool = False) -> tuple[HtmlCache | None, CachedPage | None]:
+    cache = get_html_cache()
+    cached = cache.get(url) if cache else None
+    if cached and cached.partial and full:
+        # The cached body stops after the JSON-LD block; the caller needs all of it
+        cached = None
+    return cache, cached
+
+def _request_headers(cached: CachedPage | None) -> dict:
+    headers = dict(BROWSER_HEADERS)
+    if cached:
+        headers.update(cached.conditional_headers())
+    return headers
+
+def _should_retry(url: str, response: httpx.Response, attempt: int) -> bool:
+    """Report the response to the politeness scheduler and decide whether to try again."""
+    delay = record_response(url, response)
+    return delay is not None and attempt < settings.FETCH_MAX_RETRIES
+
+def _new_body(response: httpx.Response, full: bool) -> _BoundedBody | None:
+    """Return a reader for successful responses; error bodies are never read."""
+    if not response.is_success:
+        return None
+    return _BoundedBody(response.encoding, settings.FETCH_MAX_BYTES, settings.FETCH_STOP_AT_RECIPE and not full)
+
+def _read_body(response: httpx.Response, full: bool) -> _BoundedBody | None:
+    body = _new_body(response, full)
+    if body:
+        for chunk in response.iter_bytes():
+            if body.feed(chunk):
+                break
+    return body
+
+async def _aread_body(response: httpx.Response, full: bool) -> _BoundedBody | None:
+    body = _new_body(response, full)
+    if body:
+        async for chunk in response.aiter_bytes():
+            if body.feed(chunk):
+                break
+    return body
+
+def _read_response(url: str, response: httpx.Response, body: _BoundedBody | None,
+                   cache: HtmlCache | None, cached: CachedPage | None) -> CachedPage | None:
+    """Turn a response into a page, refreshing or filling the cache on the way."""
+    if cached and response.status_code == 304:
+        logger.debug(f"HTML cache revalidated (304) for {url}")
+        return cache.touch(cached)
+
+    if response.status_code == 403:
+        logger.warning(f"Access forbidden (403) for {url}. Possible bot detection.")
+
+    response.raise_for_status()
+    html = body.text() if body else ""
+    if body and body.truncated:
+        logger.warning(f"Stopped reading {url} at FETCH_MAX_BYTES ({settings.FETCH_MAX_BYTES} bytes)")
+    if not html:
+        return None
+
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        # A body cut off at FETCH_MAX_BYTES is no more complete than one we stopped on purpose
+        "partial": body.stopped_early or body.truncated,
+    }
+    if cache:
+        return cache.set(url, html, **validators)
+    return CachedPage(url=url, html=html, fetched_at=time.time(), **validators)
+
+
+def _record_error(url: str, error: Exception):
+    """Log a failed fetch and remember it so the next attempt fails fast."""
+    if isinstance(error, DomainThrottled):
+        # Our own rate limit, not a sign the site is unwell
+        logger.warning(f"Skipping fetch of {url}: {error}")
+    elif isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        logger.error(f"HTTP error {status} fetching HTML from {url}")
+        record_fetch_failure(url, f"HTTP {status}", domain_failure=status in THROTTLE_STATUSES or status >= 500)
+    elif isinstance(error, httpx.TransportError):
+        # Timeouts, DNS failures, refused connections
+        logger.error(f"Failed to fetch HTML from {url}: {error!r}")
+        record_fetch_failure(url, type(error).__name__)
+    else:
+        logger.error(f"Failed to fetch HTML from {url}: {error}")
+
+
+def fetch_page(url: str, full: bool = False, max_wait: float | None = None) -> CachedPage | None:
+    """
+    Fetch a recipe page, reading through the on-disk HTML cache.
+
+    Fresh cache entries are returned without touching the network. Stale
+    entries are revalidated with If-None-Match / If-Modified-Since so an
+    unchanged page only costs a 304.
+
+    The body is streamed and capped at FETCH_MAX_BYTES. Unless full is
+    set, reading also stops once a complete Recipe JSON-LD block has
+    arrived and the page is marked partial. Pass full=True when the whole
+    document is needed, e.g. for the recipe-scrapers fallback.
+
+    URLs that failed recently, and domains whose circuit breaker is open,
+    are not fetched at all; a stale cached copy is returned if there is one.
+    max_wait caps how long each attempt waits for the domain's rate limit
+    (FETCH_MAX_WAIT when not given; see polite_slot).
+    """
+    full = full or needs_full_body(url)
+    cache, cached = _lookup(url, full)
+    if cached and cached.is_fresh(cache.ttl):
+        logger.debug(f"HTML cache hit for {url}")
+        return cached
+
+    reason = unavailable_reason(url)
+    if reason:
+        logger.info(f"Not fetching {url}: {reason}")
+        return cached
+
+    try:
+        # polite_slot waits out the domain's rate limit and any backoff a
+        # previous 403/429 set, so retries here are spaced automatically.
+        for attempt in range(settings.FETCH_MAX_RETRIES + 1):
+            with polite_slot(url, max_wait), http_clients.stream(url, headers=_request_headers(cached)) as response:
+                retry = _should_retry(url, response, attempt)
+                body = None if retry else _read_body(response, full)
+            if not retry:
+                break
+        return _read_response(url, response, body, cache, cached)
+    except Exception as e:
+        _record_error(url, e)
+        return None
+
+
+async def afetch_page(url: str, full: bool = False) -> CachedPage | None:
+    """Async counterpart of fetch_page using the event loop's pooled AsyncClient."""
+    full = full or needs_full_body(url)
+    # Cache reads and writes are small but still disk I/O, keep them off the loop
+    cache, cached = await asyncio.to_thread(_lookup, url, full)
+    if cached and cached.is_fresh(cache.ttl):
+        logger.debug(f"HTML cache hit for {url}")
+        return cached
+
+    reason = await asyncio.to_thread(unavailable_reason, url)
+    if reason:
+        logger.info(f"Not fetching {url}: {reason}")
+        return cached
+
+    try:
+        for attempt in range(settings.FETCH_MAX_RETRIES + 1):
+            async with apolite_slot(url), http_clients.astream(url, headers=_request_headers(cached)) as response:
+                retry = await asyncio.to_thread(_should_retry, url, response, attempt)
+                body = None if retry else await _aread_body(response, full)
+            if not retry:
+                break
+        return await asyncio.to_thread(_read_response, url, response, body, cache, cached)
+    except Exception as e:
+        await asyncio.to_thread(_record_error, url, e)
+        return None
+
+
+def fetch_html(url: str, full: bool = False) -> str | None:
+    """Return just the HTML from fetch_page."""
+    page = fetch_page(url, full)
+    return page.html if page else None
+
+
+async def afetch_html(url: str, full: bool = False) -> str | None:
+    """Return just the HTML from afetch_page."""
+    page = await afetch_page(url, full)
+    return page.html if page else None
@@ -0,0 +1,210 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings share a cache entry.
+    Lowercases scheme and host, drops default ports and fragments, and sorts
+    query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+@dataclass
+class CachedPage:
+    """
+    A cached HTML body plus the validators needed to revalidate it.
+    partial is set when the body ends early: the fetch stopped reading once
+    the recipe data was found, or hit FETCH_MAX_BYTES. from_cache marks pages served from disk
+    rather than downloaded, and is never stored.
+    """
+    url: str
+    html: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+    partial: bool = False
+    from_cache: bool = field(default=False, compare=False)
+
+    def is_fresh(self, ttl: float) -> bool:
+        return (time.time() - self.fetched_at) < ttl
+
+    def conditional_headers(self) -> dict:
+        """Return If-None-Match / If-Modified-Since headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HtmlCache:
+    """
+    Gzip-compressed, on-disk cache of fetched recipe pages.
+
+    Entries are keyed by the SHA-256 of the normalized URL and fanned out
+    into two-character subdirectories. A file's mtime doubles as its last
+    access time, so eviction drops the least recently used pages once the
+    directory grows past ``max_bytes``.
+    """
+
+    def __init__(self, directory: str | Path, ttl: float, max_bytes: int):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size_estimate: int | None = None
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def _path(self, url: str) -> Path:
+        key = self.key(url)
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def get(self, url: str) -> CachedPage | None:
+        """Return the cached page for url (fresh or stale) or None."""
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)  # Mark as recently used for LRU eviction
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable HTML cache entry for {url}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        return CachedPage(
+            url=data["url"],
+            html=data["html"],
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+            fetched_at=data["fetched_at"],
+            partial=data.get("partial", False),
+            from_cache=True,
+        )
+
+    def set(self, url: str, html: str, etag: str | None = None, last_modified: str | None = None,
+            partial: bool = False) -> CachedPage:
+        """Store html for url, replacing any previous entry."""
+        page = CachedPage(
+            url=normalize_url(url),
+            html=html,
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=time.time(),
+            partial=partial,
+        )
+        self._write(url, page)
+        return page
+
+    def touch(self, page: CachedPage) -> CachedPage:
+        """Restart the TTL of a page after the origin answered 304 Not Modified."""
+        page.fetched_at = time.time()
+        self._write(page.url, page)
+        return page
+
+    def _write(self, url: str, page: CachedPage):
+        path = self._path(url)
+        payload = json.dumps({
+            "url": page.url,
+            "html": page.html,
+            "etag": page.etag,
+            "last_modified": page.last_modified,
+            "fetched_at": page.fetched_at,
+            "partial": page.partial,
+        }).encode("utf-8")
+        compressed = gzip.compress(payload, compresslevel=6)
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(compressed)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write HTML cache entry for {url}: {e}")
+            return
+
+        with self._lock:
+            if self._size_estimate is not None:
+                self._size_estimate += len(compressed) - previous
+            over_budget = self._size_estimate is None or self._size_estimate > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for path in self.directory.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its size budget."""
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                # Trim to 90% so we don't rescan the directory on every write
+                target = int(self.max_bytes * 0.9)
+                for _, size, path in sorted(entries):
+                    if total <= target:
+                        break
+                    path.unlink(missing_ok=True)
+                    total -= size
+                logger.info(f"HTML cache evicted down to {total} bytes")
+            self._size_estimate = total
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._entries():
+                path.unlink(missing_ok=True)
+            self._size_estimate = 0
+
+
+_caches: dict[tuple, HtmlCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_html_cache() -> HtmlCache | None:
+    """Return the configured HtmlCache, or None when caching is disabled."""
+    if not getattr(settings, "HTML_CACHE_ENABLED", False):
+        return None
+    config = (str(settings.HTML_CACHE_DIR), settings.HTML_CACHE_TTL, settings.HTML_CACHE_MAX_BYTES)
+    with _caches_lock:
+        cache = _caches.get(config)
+        if cache is None:
+            cache = HtmlCache(*config)
+            _caches[config] = cache
+        return cache
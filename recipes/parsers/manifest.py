@@ -0,0 +1,53 @@
+import importlib
+import json
+import logging
+import pkgutil
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = Path(__file__).with_name("manifest.json")
+
+# Modules in this package that are infrastructure rather than site parsers
+NON_PARSER_MODULES = {
+    "base", "canonical", "fetch", "html_cache", "manifest", "politeness", "registry",
+    "scrapers_parser", "snapshot", "utils",
+}
+
+
+def discover_parsers():
+    """Import every site parser module so its @register_parser decorator runs."""
+    package = __name__.rpartition(".")[0]
+    package_path = [str(Path(__file__).parent)]
+    for _, module_name, is_pkg in pkgutil.iter_modules(package_path):
+        if not is_pkg and module_name not in NON_PARSER_MODULES:
+            importlib.import_module(f".{module_name}", package)
+
+
+def build_manifest() -> dict[str, str]:
+    """Import all parsers and return the domain -> module path mapping."""
+    from .registry import ParserRegistry
+
+    discover_parsers()
+    return {
+        domain: parser_class.__module__
+        for domain, parser_class in sorted(ParserRegistry._domain_index.items())
+    }
+
+
+def write_manifest(manifest: dict[str, str], path: Path = MANIFEST_PATH):
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    load_manifest.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def load_manifest() -> dict[str, str] | None:
+    """Return the generated domain -> module mapping, or None if it is missing or unreadable."""
+    try:
+        return json.loads(MANIFEST_PATH.read_text())
+    except FileNotFoundError:
+        logger.warning(f"Parser manifest {MANIFEST_PATH} not found; run 'manage.py build_parser_manifest'")
+    except ValueError as e:
+        logger.error(f"Parser manifest {MANIFEST_PATH} is invalid: {e}")
+    return None
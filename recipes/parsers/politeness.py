@@ -0,0 +1,548 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import redis
+from django.conf import settings
+
+from .html_cache import normalize_url
+from .snapshot import PARSE_PATHS
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down" rather than "this page is broken"
+THROTTLE_STATUSES = {403, 429, 503}
+
+# How long to stop talking to Redis after it fails before trying again
+REDIS_RETRY_SECONDS = 30
+
+# Poll interval while waiting for a free per-domain slot
+SLOT_POLL_SECONDS = 0.1
+
+# Atomically refill a domain's bucket and take a token.
+# Returns the seconds to wait: the remaining block time if the domain is
+# backing off, else 0 when a token was taken, else the time until one refills.
+_TAKE_TOKEN_LUA = """
+local blocked = redis.call('PTTL', KEYS[2])
+if blocked > 0 then
+    return tostring(blocked / 1000)
+end
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+# Lease one of a domain's concurrency slots; leases expire so a crashed
+# worker cannot hold a slot forever.
+_ACQUIRE_SLOT_LUA = """
+local limit = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < limit then
+    redis.call('ZADD', KEYS[1], now + lease, ARGV[3])
+    redis.call('EXPIRE', KEYS[1], math.ceil(lease) + 1)
+    return 1
+end
+return 0
+"""
+
+
+class DomainThrottled(Exception):
+    """Raised when a domain would make a fetch wait longer than its max_wait (FETCH_MAX_WAIT by default)."""
+
+    def __init__(self, domain: str, wait: float):
+        super().__init__(f"{domain} is throttled for another {wait:.1f}s")
+        self.domain = domain
+        self.wait = wait
+
+
+def domain_key(url: str) -> str:
+    """Group www.example.com and example.com under one politeness budget."""
+    host = (urlparse(url).hostname or "").lower()
+    return host.removeprefix("www.")
+
+
+class MemoryPolitenessState:
+    """
+    Per-process politeness state, used when Redis is not configured or unreachable.
+
+    Entries that expire (blocks, failed URLs, open breakers and failure
+    counts) are dropped when read and swept at most every PRUNE_INTERVAL
+    seconds on write, the way Redis key TTLs bound the shared state.
+    """
+
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._blocked_until: dict[str, float] = {}
+        self._strikes: dict[str, int] = {}
+        self._slots: dict[str, dict[str, float]] = {}
+        self._failed_urls: dict[str, tuple[str, float]] = {}
+        # domain -> (consecutive failures, when the count lapses)
+        self._failures: dict[str, tuple[int, float]] = {}
+        self._open_until: dict[str, float] = {}
+        self._counters: dict[str, int] = {}
+        self._next_prune = 0.0
+
+    def _prune(self, now: float):
+        """Drop expired entries; called with the lock held."""
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.PRUNE_INTERVAL
+        for table in (self._blocked_until, self._open_until):
+            for key in [key for key, until in table.items() if until <= now]:
+                del table[key]
+        for table in (self._failed_urls, self._failures):
+            for key in [key for key, (_, expires) in table.items() if expires <= now]:
+                del table[key]
+
+    def take_token(self, domain: str, rate: float, burst: int) -> float:
+        with self._lock:
+            now = self._clock()
+            blocked = self._blocked_until.get(domain, 0) - now
+            if blocked > 0:
+                return blocked
+            tokens, ts = self._buckets.get(domain, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[domain] = (tokens, now)
+            return wait
+
+    def acquire_slot(self, domain: str, limit: int, lease: float) -> str | None:
+        with self._lock:
+            now = self._clock()
+            slots = {token: expiry for token, expiry in self._slots.get(domain, {}).items() if expiry > now}
+            token = None
+            if len(slots) < limit:
+                token = uuid.uuid4().hex
+                slots[token] = now + lease
+            self._slots[domain] = slots
+            return token
+
+    def release_slot(self, domain: str, token: str):
+        with self._lock:
+            self._slots.get(domain, {}).pop(token, None)
+
+    def add_strike(self, domain: str) -> int:
+        with self._lock:
+            self._strikes[domain] = self._strikes.get(domain, 0) + 1
+            return self._strikes[domain]
+
+    def record_success(self, domain: str):
+        with self._lock:
+            self._strikes.pop(domain, None)
+            self._failures.pop(domain, None)
+            self._open_until.pop(domain, None)
+
+    def block(self, domain: str, seconds: float):
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            self._blocked_until[domain] = max(now + seconds, self._blocked_until.get(domain, 0))
+
+    def remember_failed_url(self, url: str, reason: str, ttl: float):
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            self._failed_urls[url] = (reason, now + ttl)
+
+    def failed_url_reason(self, url: str) -> str | None:
+        with self._lock:
+            reason, expires = self._failed_urls.get(url, (None, 0))
+            if expires > self._clock():
+                return reason
+            self._failed_urls.pop(url, None)
+            return None
+
+    def forget_failed_url(self, url: str):
+        with self._lock:
+            self._failed_urls.pop(url, None)
+
+    def add_failure(self, domain: str, threshold: int, cooldown: float) -> int:
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            failures, expires = self._failures.get(domain, (0, 0))
+            failures = failures + 1 if expires > now else 1
+            # Outlive the cooldown so one more failure after it re-opens the breaker
+            self._failures[domain] = (failures, now + cooldown * 3)
+            if failures >= threshold:
+                self._open_until[domain] = now + cooldown
+            return failures
+
+    def breaker_remaining(self, domain: str) -> float:
+        with self._lock:
+            remaining = self._open_until.get(domain, 0) - self._clock()
+            if remaining > 0:
+                return remaining
+            self._open_until.pop(domain, None)
+            return 0.0
+
+    def close_breaker(self, domain: str):
+        self.record_success(domain)
+
+    def increment(self, name: str):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def counters(self, names: list[str]) -> dict[str, int]:
+        with self._lock:
+            return {name: self._counters.get(name, 0) for name in names}
+
+    def status(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            return {
+                "breakers": [
+                    {"domain": domain, "failures": self._failures.get(domain, (0, 0))[0], "remaining": until - now}
+                    for domain, until in sorted(self._open_until.items()) if until > now
+                ],
+                "failed_urls": [
+                    {"url": url, "reason": reason, "remaining": expires - now}
+                    for url, (reason, expires) in sorted(self._failed_urls.items()) if expires > now
+                ],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._blocked_until.clear()
+            self._strikes.clear()
+            self._slots.clear()
+            self._failed_urls.clear()
+            self._failures.clear()
+            self._open_until.clear()
+            self._counters.clear()
+            self._next_prune = 0.0
+
+
+class RedisPolitenessState:
+    """Politeness state shared by every web and Celery process through Redis."""
+
+    PREFIX = "kitchenclip:fetch"
+
+    def __init__(self, client):
+        self._redis = client
+        self._take_token = client.register_script(_TAKE_TOKEN_LUA)
+        self._acquire_slot = client.register_script(_ACQUIRE_SLOT_LUA)
+
+    def _key(self, kind: str, domain: str) -> str:
+        return f"{self.PREFIX}:{kind}:{domain}"
+
+    def take_token(self, domain: str, rate: float, burst: int) -> float:
+        keys = [self._key("bucket", domain), self._key("blocked", domain)]
+        return float(self._take_token(keys=keys, args=[rate, burst]))
+
+    def acquire_slot(self, domain: str, limit: int, lease: float) -> str | None:
+        token = uuid.uuid4().hex
+        acquired = self._acquire_slot(keys=[self._key("slots", domain)], args=[limit, lease, token])
+        return token if acquired else None
+
+    def release_slot(self, domain: str, token: str):
+        self._redis.zrem(self._key("slots", domain), token)
+
+    def add_strike(self, domain: str) -> int:
+        key = self._key("strikes", domain)
+        with self._redis.pipeline() as pipe:
+            pipe.incr(key)
+            pipe.expire(key, int(settings.FETCH_BACKOFF_MAX) * 2)
+            strikes, _ = pipe.execute()
+        return strikes
+
+    def record_success(self, domain: str):
+        self._redis.delete(self._key("strikes", domain), self._key("failures", domain), self._key("open", domain))
+
+    def block(self, domain: str, seconds: float):
+        key = self._key("blocked", domain)
+        ms = max(1, int(seconds * 1000))
+        # Never shorten a longer block another worker already set
+        if not self._redis.set(key, "1", px=ms, nx=True) and (self._redis.pttl(key) or 0) < ms:
+            self._redis.set(key, "1", px=ms)
+
+    def _url_key(self, url: str) -> str:
+        return self._key("failed", hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def remember_failed_url(self, url: str, reason: str, ttl: float):
+        self._redis.set(self._url_key(url), json.dumps({"url": url, "reason": reason}), px=max(1, int(ttl * 1000)))
+
+    def failed_url_reason(self, url: str) -> str | None:
+        raw = self._redis.get(self._url_key(url))
+        return json.loads(raw)["reason"] if raw else None
+
+    def forget_failed_url(self, url: str):
+        self._redis.delete(self._url_key(url))
+
+    def add_failure(self, domain: str, threshold: int, cooldown: float) -> int:
+        key = self._key("failures", domain)
+        with self._redis.pipeline() as pipe:
+            pipe.incr(key)
+            # Outlive the cooldown so one more failure after it re-opens the breaker
+            pipe.expire(key, max(1, math.ceil(cooldown * 3)))
+            failures, _ = pipe.execute()
+        if failures >= threshold:
+            self._redis.set(self._key("open", domain), failures, px=max(1, int(cooldown * 1000)))
+        return failures
+
+    def breaker_remaining(self, domain: str) -> float:
+        return max(0.0, (self._redis.pttl(self._key("open", domain)) or 0) / 1000)
+
+    def close_breaker(self, domain: str):
+        self.record_success(domain)
+
+    def increment(self, name: str):
+        self._redis.incr(self._key("counter", name))
+
+    def counters(self, names: list[str]) -> dict[str, int]:
+        values = self._redis.mget([self._key("counter", name) for name in names])
+        return {name: int(value or 0) for name, value in zip(names, values)}
+
+    def status(self) -> dict:
+        breakers = []
+        for key in self._redis.scan_iter(match=self._key("open", "*"), count=500):
+            domain = key.decode().rpartition(":")[2]
+            remaining = self._redis.pttl(key) / 1000
+            if remaining > 0:
+                breakers.append({"domain": domain, "failures": int(self._redis.get(self._key("failures", domain)) or 0), "remaining": remaining})
+
+        failed_urls = []
+        for key in self._redis.scan_iter(match=self._key("failed", "*"), count=500):
+            raw, remaining = self._redis.get(key), self._redis.pttl(key) / 1000
+            if raw and remaining > 0:
+                failed_urls.append({**json.loads(raw), "remaining": remaining})
+
+        return {
+            "breakers": sorted(breakers, key=lambda b: b["domain"]),
+            "failed_urls": sorted(failed_urls, key=lambda f: f["url"]),
+        }
+
+
+_memory_state = MemoryPolitenessState()
+_redis_states: dict[str, RedisPolitenessState] = {}
+_redis_down_until = 0.0
+
+
+def _get_state():
+    url = getattr(settings, "FETCH_STATE_REDIS_URL", "")
+    if not url or time.monotonic() < _redis_down_until:
+        return _memory_state
+
+    state = _redis_states.get(url)
+    if state is None:
+        client = redis.Redis.from_url(url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        state = _redis_states[url] = RedisPolitenessState(client)
+    return state
+
+
+def _call(method: str, *args):
+    """Run a state operation, falling back to process-local state if Redis fails."""
+    global _redis_down_until
+    state = _get_state()
+    try:
+        return getattr(state, method)(*args)
+    except redis.RedisError as e:
+        if state is _memory_state:
+            raise
+        logger.warning(f"Fetch politeness state unavailable ({e}); using per-process limits for {REDIS_RETRY_SECONDS}s")
+        _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        return getattr(_memory_state, method)(*args)
+
+
+def reset_local_state():
+    """Forget all process-local buckets, blocks and strikes (tests, shell)."""
+    global _redis_down_until
+    _memory_state.reset()
+    _redis_down_until = 0.0
+
+
+def retry_after_seconds(response) -> float | None:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def record_response(url: str, response) -> float | None:
+    """
+    Feed a response back into the scheduler.
+    Throttling responses (403/429/503) block the whole domain for the
+    Retry-After period, or an exponential backoff when the site sends none.
+    Returns that delay, or None when the response was not a throttle.
+    """
+    domain = domain_key(url)
+    if response.status_code not in THROTTLE_STATUSES:
+        if response.status_code < 400:
+            _call("record_success", domain)
+        return None
+
+    strikes = _call("add_strike", domain)
+    delay = retry_after_seconds(response)
+    if delay is None:
+        delay = settings.FETCH_BACKOFF_BASE * 2 ** (strikes - 1)
+    delay = min(delay, settings.FETCH_BACKOFF_MAX)
+    if delay > 0:
+        _call("block", domain, delay)
+    logger.warning(f"{domain} answered {response.status_code}; backing off for {delay:.1f}s (strike {strikes})")
+    return delay
+
+
+def record_fetch_failure(url: str, reason: str, domain_failure: bool = True):
+    """
+    Remember that url failed so fetches of it fail fast for FETCH_FAILURE_TTL.
+    Unless the problem was specific to the page (a 404, say), also count it
+    against the domain's circuit breaker, which opens after
+    FETCH_BREAKER_THRESHOLD consecutive failures for FETCH_BREAKER_COOLDOWN.
+    """
+    _call("remember_failed_url", normalize_url(url), reason, settings.FETCH_FAILURE_TTL)
+    if not domain_failure:
+        return
+
+    domain = domain_key(url)
+    failures = _call("add_failure", domain, settings.FETCH_BREAKER_THRESHOLD, settings.FETCH_BREAKER_COOLDOWN)
+    if failures >= settings.FETCH_BREAKER_THRESHOLD:
+        logger.warning(f"Circuit breaker open for {domain} after {failures} consecutive failures")
+
+
+def unavailable_reason(url: str) -> str | None:
+    """Why url should not be fetched right now, or None if it may be."""
+    domain = domain_key(url)
+    remaining = _call("breaker_remaining", domain)
+    if remaining > 0:
+        return f"circuit breaker open for {domain} ({remaining:.0f}s left)"
+    reason = _call("failed_url_reason", normalize_url(url))
+    if reason:
+        return f"failed recently ({reason})"
+    return None
+
+
+def fetch_health() -> dict:
+    """Open circuit breakers and negatively cached URLs, for the status page."""
+    return _call("status")
+
+
+def increment_counter(name: str):
+    """Add one to a counter shared by every process (metrics for the status page)."""
+    _call("increment", name)
+
+
+def get_counters(names: list[str]) -> dict[str, int]:
+    return _call("counters", names)
+
+
+def parse_path_counter(path: str) -> str:
+    """The counter incremented for each parse that took path (see snapshot.PARSE_PATHS)."""
+    return f"parse_path:{path}"
+
+
+def parse_path_counts() -> dict[str, int]:
+    """How many parses took each path, across all processes."""
+    counts = get_counters([parse_path_counter(path) for path in PARSE_PATHS])
+    return {path: counts[parse_path_counter(path)] for path in PARSE_PATHS}
+
+
+def forget_failed_url(url: str):
+    _call("forget_failed_url", normalize_url(url))
+
+
+def close_breaker(domain: str):
+    _call("close_breaker", domain)
+
+
+def _acquire_step(domain: str, has_token: bool) -> tuple[bool, str | None, float]:
+    """
+    One non-blocking attempt at permission to fetch from domain.
+    Returns (has_token, slot, wait): slot is set when the request may go
+    ahead, otherwise wait is how long to sleep before trying again.
+    """
+    if not has_token:
+        wait = _call("take_token", domain, settings.FETCH_DOMAIN_RATE, settings.FETCH_DOMAIN_BURST)
+        if wait > 0:
+            return False, None, wait
+
+    lease = settings.HTTP_CLIENT_TIMEOUT + 5
+    slot = _call("acquire_slot", domain, settings.FETCH_DOMAIN_CONCURRENCY, lease)
+    if slot:
+        return True, slot, 0.0
+    return True, None, SLOT_POLL_SECONDS
+
+
+def _check_deadline(domain: str, wait: float, deadline: float):
+    if time.monotonic() + wait > deadline:
+        raise DomainThrottled(domain, wait)
+
+
+@contextmanager
+def polite_slot(url: str, max_wait: float | None = None):
+    """
+    Wait until the URL's domain has a free token and concurrency slot, and
+    hold the slot for the duration of the request.
+    Raises DomainThrottled if that would take longer than max_wait seconds
+    (FETCH_MAX_WAIT when not given).
+    """
+    domain = domain_key(url)
+    deadline = time.monotonic() + (settings.FETCH_MAX_WAIT if max_wait is None else max_wait)
+    has_token, slot = False, None
+    while slot is None:
+        has_token, slot, wait = _acquire_step(domain, has_token)
+        if slot is None:
+            _check_deadline(domain, wait, deadline)
+            time.sleep(wait)
+    try:
+        yield
+    finally:
+        _call("release_slot", domain, slot)
+
+
+@asynccontextmanager
+async def apolite_slot(url: str):
+    """Async counterpart of polite_slot; waiting never blocks other domains."""
+    domain = domain_key(url)
+    deadline = time.monotonic() + settings.FETCH_MAX_WAIT
+    has_token, slot = False, None
+    while slot is None:
+        has_token, slot, wait = await asyncio.to_thread(_acquire_step, domain, has_token)
+        if slot is None:
+            _check_deadline(domain, wait, deadline)
+            await asyncio.sleep(wait)
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(_call, "release_slot", domain, slot)
@@ -1,8 +1,22 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import itertools
 import logging
+import threading
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
-from .base import BaseParser
-from .scrapers_parser import ScrapersParser
+from django.conf import settings
+
+from recipes.http_client import http_clients
+
+from .manifest import discover_parsers, load_manifest
+from .politeness import domain_key
+
+if TYPE_CHECKING:
+    from .base import BaseParser
 
 logger = logging.getLogger(__name__)
 
@@ -10,36 +24,168 @@ class ParserRegistry:
     """
     Registry for custom recipe parsers.
     Checks for domain-specific parsers and falls back to ScrapersParser.
+
+    Registration builds a domain -> parser index, so a lookup only walks the
+    hostname's parent domains (m.allrecipes.com -> allrecipes.com -> com)
+    instead of scanning every parser.
+
+    Parser modules are not imported up front. On an index miss the generated
+    manifest says which module owns the domain, and importing it registers
+    the parser.
     """
     
     _parsers: list[type[BaseParser]] = []
+    _domain_index: dict[str, type[BaseParser]] = {}
+    _discovered = False
+    _discover_lock = threading.Lock()
+
+    @staticmethod
+    def _normalize_domain(domain: str) -> str:
+        return domain.strip().lower().rstrip(".")
+
+    @staticmethod
+    def _same_parser(a: type[BaseParser], b: type[BaseParser]) -> bool:
+        # A reloaded module produces a new class object for the same parser
+        return a is b or (a.__module__, a.__qualname__) == (b.__module__, b.__qualname__)
 
     @classmethod
     def register(cls, parser_class: type[BaseParser]):
-        """Register a new custom parser class."""
-        if parser_class not in cls._parsers:
-            cls._parsers.append(parser_class)
+        """
+        Register a new custom parser class.
+        Raises ValueError if one of its SUPPORTED_DOMAINS already belongs to another parser.
+        """
+        domains = [cls._normalize_domain(d) for d in getattr(parser_class, "SUPPORTED_DOMAINS", [])]
+
+        for domain in domains:
+            existing = cls._domain_index.get(domain)
+            if existing and not cls._same_parser(existing, parser_class):
+                raise ValueError(
+                    f"Cannot register {parser_class.__name__} for '{domain}': "
+                    f"already handled by {existing.__module__}.{existing.__name__}"
+                )
+
+        cls._parsers = [p for p in cls._parsers if not cls._same_parser(p, parser_class)]
+        cls._parsers.append(parser_class)
+        for domain in domains:
+            cls._domain_index[domain] = parser_class
+        return parser_class
+
+    @classmethod
+    def _discover_all(cls):
+        """Eagerly import every parser (no manifest, or introspection needs the full table)."""
+        with cls._discover_lock:
+            if not cls._discovered:
+                discover_parsers()
+                cls._discovered = True
+
+    @classmethod
+    def _load_domain(cls, domain: str) -> type[BaseParser] | None:
+        """Import the module the manifest lists for domain and return its parser."""
+        manifest = load_manifest()
+        if manifest is None:
+            cls._discover_all()
+            return cls._domain_index.get(domain)
+
+        module_path = manifest.get(domain)
+        if module_path is None:
+            return None
+
+        importlib.import_module(module_path)
+        parser_class = cls._domain_index.get(domain)
+        if parser_class is None:
+            logger.warning(f"ParserRegistry: manifest maps {domain} to {module_path} but it registered no parser; rebuild the manifest")
         return parser_class
 
     @classmethod
-    def get_parser(cls, url: str) -> BaseParser:
+    def lookup(cls, hostname: str) -> type[BaseParser] | None:
+        """Return the parser registered for hostname or its closest parent domain."""
+        labels = cls._normalize_domain(hostname).split(".")
+        for i in range(len(labels)):
+            domain = ".".join(labels[i:])
+            parser_class = cls._domain_index.get(domain) or cls._load_domain(domain)
+            if parser_class:
+                return parser_class
+        return None
+
+    @classmethod
+    def routing_table(cls) -> dict[str, str]:
+        """Return the domain -> 'module.ParserClass' routing table, sorted by domain."""
+        cls._discover_all()
+        return {
+            domain: f"{parser_class.__module__}.{parser_class.__name__}"
+            for domain, parser_class in sorted(cls._domain_index.items())
+        }
+
+    @classmethod
+    def resolve(cls, url: str) -> type[BaseParser]:
+        """Return the parser class that should handle the given URL."""
+        parser_class = cls.lookup(urlparse(url).hostname or "")
+        if parser_class:
+            logger.info(f"ParserRegistry: Found custom parser {parser_class.__name__} for {url}")
+            return parser_class
+
+        # Fallback to the general scraper
+        from .scrapers_parser import ScrapersParser
+        logger.info(f"ParserRegistry: Falling back to ScrapersParser for {url}")
+        return ScrapersParser
+
+    @classmethod
+    def get_parser(cls, url: str, max_wait: float | None = None) -> BaseParser:
         """
         Factory method to return the best parser for the given URL.
+        max_wait caps each fetch's wait for the site's rate limit.
         """
-        domain = urlparse(url).netloc.lower()
-        if domain.startswith("www."):
-            domain = domain[4:]
+        return cls.resolve(url)(url, max_wait=max_wait)
 
-        for parser_class in cls._parsers:
-            # Check if parser has a list of supported domains
-            supported_domains = getattr(parser_class, "SUPPORTED_DOMAINS", [])
-            if domain in supported_domains:
-                logger.info(f"ParserRegistry: Found custom parser {parser_class.__name__} for {url}")
-                return parser_class(url)
+    @classmethod
+    async def aget_parser(cls, url: str) -> BaseParser:
+        """Awaitable version of get_parser that fetches with httpx.AsyncClient."""
+        return await cls.resolve(url).afrom_url(url)
 
-        # Fallback to the general scraper
-        logger.info(f"ParserRegistry: Falling back to ScrapersParser for {url}")
-        return ScrapersParser(url)
+    @classmethod
+    async def aget_parsers(cls, urls: list[str], concurrency: int | None = None) -> list[BaseParser | Exception]:
+        """
+        Build parsers for many URLs concurrently, never running more than
+        `concurrency` fetches at once (PARSER_ASYNC_CONCURRENCY by default).
+        Results keep the order of `urls`; failures are returned as exceptions.
+
+        URLs are started round-robin across domains so a long run of pages
+        from one rate-limited site does not occupy every slot while other
+        sites sit idle.
+        """
+        limit = concurrency or settings.PARSER_ASYNC_CONCURRENCY
+        semaphore = asyncio.Semaphore(limit)
+
+        async def _parse(url):
+            async with semaphore:
+                return await cls.aget_parser(url)
+
+        order = cls._interleave_by_domain(urls)
+        parsed = await asyncio.gather(*(_parse(urls[i]) for i in order), return_exceptions=True)
+        results: list[BaseParser | Exception] = [None] * len(urls)
+        for i, result in zip(order, parsed):
+            results[i] = result
+        return results
+
+    @staticmethod
+    def _interleave_by_domain(urls: list[str]) -> list[int]:
+        """Return indexes into urls ordered round-robin by domain."""
+        by_domain: dict[str, list[int]] = {}
+        for i, url in enumerate(urls):
+            by_domain.setdefault(domain_key(url), []).append(i)
+        rounds = itertools.zip_longest(*by_domain.values())
+        return [i for batch in rounds for i in batch if i is not None]
+
+    @classmethod
+    def get_parsers(cls, urls: list[str], concurrency: int | None = None) -> list[BaseParser | Exception]:
+        """Synchronous entry point for aget_parsers (management commands, Celery tasks)."""
+        async def _run():
+            try:
+                return await cls.aget_parsers(urls, concurrency)
+            finally:
+                await http_clients.aclose()
+
+        return asyncio.run(_run())
 
 # Helper decorator for easy registration
 def register_parser(cls):
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import re
+import zlib
+from dataclasses import asdict, dataclass, field, fields
+
+# Snapshot fields that map one-to-one onto Recipe model fields
+RECIPE_FIELDS = (
+    "title", "description", "prep_time", "cook_time", "total_time",
+    "servings", "instructions", "image_url",
+)
+
+# How a parse got its data; recorded on every snapshot and counted per path
+PARSE_JSON_LD = "json_ld"                         # JSON-LD only, no scraper
+PARSE_SCRAPER_CACHED = "scraper_cached_html"      # scraper ran on HTML we already had
+PARSE_NETWORK_REFETCH = "network_refetch"         # scraper needed the page downloaded again
+PARSE_PATHS = (PARSE_JSON_LD, PARSE_SCRAPER_CACHED, PARSE_NETWORK_REFETCH)
+
+# Bumped when the packed layout changes; unpack() rejects other versions
+PACK_VERSION = 1
+# Bulky JSON-LD keys that no parser reads, dropped before packing
+_UNUSED_JSON_LD_KEYS = ("review", "comment", "aggregateRating", "video", "interactionStatistic")
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedRecipe:
+    """
+    Immutable result of parsing one recipe page.
+    Every field is computed exactly once by BaseParser.to_snapshot().
+    """
+    url: str
+    title: str
+    description: str
+    ingredients: tuple[str, ...]
+    instructions: str
+    image_url: str
+    prep_time: int | None
+    cook_time: int | None
+    total_time: int | None
+    servings: int | None
+    # Which of PARSE_PATHS produced it; not a Recipe field
+    parse_path: str = PARSE_JSON_LD
+    # The page's Recipe JSON-LD block, kept so it can be re-parsed offline
+    json_ld: dict | None = field(default=None, compare=False)
+    # Identity key from the page's <link rel=canonical> (see parsers.canonical)
+    canonical_url: str = ""
+
+    def as_recipe_fields(self) -> dict:
+        """Return the values to copy onto a Recipe instance, keyed by field name."""
+        return {name: getattr(self, name) for name in RECIPE_FIELDS}
+
+    def content_hash(self) -> str:
+        """
+        Hash of the title and ingredient lines, ignoring case and spacing, so
+        the same recipe reached through unrelated URLs is still recognised.
+        """
+        def normalize(text: str) -> str:
+            return re.sub(r"\s+", " ", text).strip().casefold()
+
+        payload = [normalize(self.title), sorted(normalize(line) for line in self.ingredients if line.strip())]
+        return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["ingredients"] = list(self.ingredients)
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ParsedRecipe":
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        values["ingredients"] = tuple(values.get("ingredients") or ())
+        return cls(**values)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ParsedRecipe":
+        return cls.from_dict(json.loads(raw))
+
+    def pack(self) -> bytes:
+        """
+        Compress the snapshot for Recipe.source_snapshot: the parsed fields,
+        the raw ingredient lines and the JSON-LD block minus reviews and
+        other keys no parser reads.
+        """
+        data = self.to_dict()
+        if self.json_ld:
+            data["json_ld"] = {k: v for k, v in self.json_ld.items() if k not in _UNUSED_JSON_LD_KEYS}
+        data["v"] = PACK_VERSION
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode(), 9)
+
+    @classmethod
+    def unpack(cls, blob: bytes) -> "ParsedRecipe":
+        """Inverse of pack(); raises ValueError for data it cannot read."""
+        try:
+            data = json.loads(zlib.decompress(bytes(blob)))
+        except (zlib.error, ValueError) as e:
+            raise ValueError(f"Unreadable recipe snapshot: {e}") from e
+        if data.get("v") != PACK_VERSION:
+            raise ValueError(f"Unsupported recipe snapshot version {data.get('v')!r}")
+        return cls.from_dict(data)
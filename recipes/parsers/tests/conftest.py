@@ -1,4 +1,5 @@
 import os
+from contextlib import nullcontext
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -18,6 +19,50 @@ def load_fixture():
             return f.read()
     return _loader
 
+def build_response(text="", status_code=200, headers=None, chunk_size=None):
+    """A stand-in httpx response that supports both .text and streamed reads."""
+    body = text.encode("utf-8")
+    chunk_size = chunk_size or max(len(body), 1)
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    async def _aiter_bytes():
+        for chunk in chunks:
+            yield chunk
+
+    mock_resp = MagicMock()
+    mock_resp.text = text
+    mock_resp.status_code = status_code
+    mock_resp.is_success = 200 <= status_code < 300
+    mock_resp.headers = headers or {}
+    mock_resp.encoding = "utf-8"
+    mock_resp.iter_bytes = lambda: iter(chunks)
+    mock_resp.aiter_bytes = _aiter_bytes
+    mock_resp.raise_for_status = lambda: None
+    return mock_resp
+
+@pytest.fixture
+def fake_response():
+    """Factory for responses to hand to a patched httpx stream()/get()."""
+    return build_response
+
+@pytest.fixture(autouse=True)
+def isolated_html_cache(settings, tmp_path):
+    """Keep each test's fetched HTML in its own throwaway cache directory."""
+    from recipes.parsers.fetch import reset_full_body_domains
+
+    settings.HTML_CACHE_DIR = str(tmp_path / "html_cache")
+    reset_full_body_domains()
+
+@pytest.fixture(autouse=True)
+def local_fetch_politeness(settings):
+    """Keep rate limits in-process and start every test with fresh buckets."""
+    from recipes.parsers.politeness import reset_local_state
+
+    settings.FETCH_STATE_REDIS_URL = ""
+    reset_local_state()
+    yield
+    reset_local_state()
+
 @pytest.fixture(autouse=True)
 def mock_recipe_responses(load_fixture, request):
     """
@@ -36,17 +81,19 @@ def mock_recipe_responses(load_fixture, request):
                 "Use @pytest.mark.recipe_fixture('filename.html') to mock this call."
             )
         
-        content = load_fixture(fixture_file)
-        
-        # Mock HTTXP response
-        mock_resp = MagicMock()
-        mock_resp.text = content
-        mock_resp.status_code = 200
-        mock_resp.raise_for_status = lambda: None
-        return mock_resp
-
-    # Intercept httpx (BaseParser)
-    with patch("httpx.Client.get", side_effect=_mock_get):
+        # Mock HTTPX response
+        return build_response(load_fixture(fixture_file))
+
+    async def _mock_async_get(url, *args, **kwargs):
+        return _mock_get(url, *args, **kwargs)
+
+    def _mock_stream(method, url, *args, **kwargs):
+        # nullcontext works with both `with` and `async with`
+        return nullcontext(_mock_get(url))
+
+    # Intercept httpx (BaseParser streams pages, other callers use get)
+    with patch("httpx.Client.get", side_effect=_mock_get), patch("httpx.AsyncClient.get", side_effect=_mock_async_get), \
+            patch("httpx.Client.stream", side_effect=_mock_stream), patch("httpx.AsyncClient.stream", side_effect=_mock_stream):
         with patch("httpx.get", side_effect=_mock_get):
             # Intercept recipe_scrapers
             
@@ -1,6 +1,7 @@
 import pytest
 
 from recipes.parsers.allrecipes import AllrecipesParser
+from recipes.parsers.snapshot import ParsedRecipe
 
 
 @pytest.mark.recipe_fixture("allrecipes_100_grand.html")
@@ -27,4 +28,38 @@ def test_allrecipes_parsing():
     # Check times (converted to minutes)
     assert parser.prep_time == 20
     assert parser.cook_time == 5
-    assert parser.total_time == 95
\ No newline at end of file
+    assert parser.total_time == 95
+
+@pytest.mark.recipe_fixture("allrecipes_100_grand.html")
+def test_allrecipes_snapshot_round_trips_through_json():
+    url = "https://www.allrecipes.com/100-grand-bars-recipe-11918066"
+    snapshot = AllrecipesParser(url).to_snapshot()
+
+    assert snapshot.total_time == 95
+    assert snapshot.servings == 12
+    assert len(snapshot.ingredients) == 4
+    assert snapshot.as_recipe_fields()["title"] == snapshot.title
+
+    restored = ParsedRecipe.from_json(snapshot.to_json())
+    assert restored == snapshot
+
+@pytest.mark.recipe_fixture("allrecipes_100_grand.html")
+def test_allrecipes_snapshot_reparses_offline_from_packed_source():
+    url = "https://www.allrecipes.com/100-grand-bars-recipe-11918066"
+    snapshot = AllrecipesParser(url).to_snapshot()
+    blob = snapshot.pack()
+
+    stored = ParsedRecipe.unpack(blob)
+    assert stored == snapshot
+    assert stored.json_ld["recipeIngredient"] == list(snapshot.ingredients)
+    assert "review" not in stored.json_ld
+    assert len(blob) < len(snapshot.to_json())
+
+    # from_snapshot must not touch the network or the scraper
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("recipes.parsers.base.fetch_page", lambda *a, **kw: pytest.fail("fetched"))
+        assert AllrecipesParser.from_snapshot(stored).to_snapshot() == snapshot
+
+def test_unpack_rejects_garbage():
+    with pytest.raises(ValueError, match="Unreadable"):
+        ParsedRecipe.unpack(b"not zlib")
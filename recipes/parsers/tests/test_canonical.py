@@ -0,0 +1,33 @@
+import pytest
+
+from recipes.parsers.canonical import canonical_url, find_canonical_link
+
+SOUP = "https://site.com/lemon-soup"
+
+
+@pytest.mark.parametrize("url", [
+    "https://site.com/lemon-soup/",
+    "http://www.site.com/lemon-soup?utm_source=pinterest&utm_medium=social#comments",
+    "https://m.site.com/lemon-soup/?fbclid=abc",
+    "https://site.com/lemon-soup/amp/",
+    "https://site.com/lemon-soup/?amp=1",
+    "https://www-site-com.cdn.ampproject.org/c/s/www.site.com/lemon-soup/amp/",
+    "https://www.google.com/amp/s/www.site.com/lemon-soup/amp/",
+    "https://site.com/lemon-soup/print/4321/",
+    "https://site.com/lemon-soup/?print=1",
+])
+def test_canonical_url_collapses_variants(url):
+    assert canonical_url(url) == SOUP
+
+def test_canonical_url_keeps_meaningful_query():
+    assert canonical_url("https://site.com/?p=12&utm_campaign=x") == "https://site.com/?p=12"
+    assert canonical_url("https://site.com/recipe/1/") != canonical_url("https://site.com/recipe/2/")
+
+def test_find_canonical_link_reads_head_only():
+    html = (
+        "<html><head><link rel='stylesheet' href='/a.css'>"
+        "<link href=\"https://www.site.com/lemon-soup/\" rel=\"canonical\"></head>"
+        "<body><link rel=\"canonical\" href=\"https://elsewhere.com/\"></body></html>"
+    )
+    assert find_canonical_link(html) == "https://www.site.com/lemon-soup/"
+    assert find_canonical_link("<html><head></head></html>") is None
@@ -0,0 +1,109 @@
+from contextlib import nullcontext
+from unittest.mock import patch
+
+from recipes.parsers import fetch
+from recipes.parsers.fetch import (
+    _BoundedBody,
+    fetch_page,
+    needs_full_body,
+    require_full_body,
+)
+
+RECIPE_PAGE = (
+    '<html><head><script type="application/ld+json">'
+    '{"@context": "https://schema.org", "@type": "Recipe", "name": "Crème brûlée"}'
+    '</script></head><body>'
+)
+COMMENTS = "<p>" + "Great recipe! " * 20_000 + "</p></body></html>"
+
+
+def _stream(responses):
+    return patch("httpx.Client.stream", side_effect=[nullcontext(r) for r in responses])
+
+
+def test_stops_reading_after_recipe_json_ld(fake_response):
+    response = fake_response(RECIPE_PAGE + COMMENTS, chunk_size=1024)
+
+    with _stream([response]):
+        page = fetch_page("https://example.com/creme-brulee")
+
+    assert page.partial
+    assert len(page.html) < len(RECIPE_PAGE) + 2048
+    # A multi-byte character split across chunks still decodes cleanly
+    assert "Crème brûlée" in page.html
+
+def test_full_fetch_bypasses_partial_cache_entry(fake_response):
+    url = "https://example.com/creme-brulee"
+    with _stream([fake_response(RECIPE_PAGE + COMMENTS, chunk_size=1024)] * 2) as mock_stream:
+        assert fetch_page(url).partial
+        page = fetch_page(url, full=True)
+
+    assert mock_stream.call_count == 2
+    assert not page.partial
+    assert page.html.endswith("</html>")
+
+def test_scraper_fallback_refetches_full_page_once_per_domain(fake_response):
+    from recipes.parsers.scrapers_parser import ScrapersParser
+
+    responses = [fake_response(RECIPE_PAGE + COMMENTS, chunk_size=1024) for _ in range(3)]
+    with _stream(responses) as mock_stream:
+        parser = ScrapersParser("https://example.com/creme-brulee")
+        # The description is missing from the JSON-LD, so the scraper runs
+        assert parser.description is not None
+        assert parser.html.endswith("</html>")
+        assert parser.parse_path == "network_refetch"
+
+        assert not fetch_page("https://example.com/another-recipe").partial
+    assert mock_stream.call_count == 3
+
+def test_each_script_is_checked_once_when_streamed_in_small_chunks():
+    inline_js = "<script>var x = '" + "a" * 5000 + "';</script>"
+    page = ("<html><head>" + inline_js * 5 + RECIPE_PAGE + COMMENTS).encode()
+    body = _BoundedBody("utf-8", len(page), stop_at_recipe=True)
+
+    with patch("recipes.parsers.fetch.find_json_ld", wraps=fetch.find_json_ld) as find:
+        for start in range(0, len(page), 7):
+            if body.feed(page[start:start + 7]):
+                break
+
+    assert body.stopped_early
+    assert find.call_count == 1
+    assert len(body._pending) < 100
+
+def test_full_body_domains_expire(monkeypatch):
+    require_full_body("https://example.com/a")
+    assert needs_full_body("https://example.com/b")
+
+    monkeypatch.setattr(fetch, "FULL_BODY_TTL", -1)
+    require_full_body("https://example.com/a")
+    assert not needs_full_body("https://example.com/b")
+
+def test_body_is_capped_at_max_bytes(settings, fake_response):
+    settings.FETCH_MAX_BYTES = 4096
+    responses = [fake_response(COMMENTS, chunk_size=1000) for _ in range(2)]
+    with _stream(responses) as mock_stream:
+        page = fetch_page("https://example.com/no-recipe")
+        assert len(page.html) == 4096
+        assert page.partial
+
+        # The cut-off copy is never handed to a caller that needs the whole page
+        assert not fetch_page("https://example.com/no-recipe", full=True).from_cache
+        assert mock_stream.call_count == 2
+
+def test_parse_path_is_recorded_and_counted(fake_response):
+    from recipes.parsers.politeness import parse_path_counts
+    from recipes.parsers.scrapers_parser import ScrapersParser
+
+    with _stream([]) as mock_stream:
+        complete = ScrapersParser("https://example.com/creme-brulee", html=RECIPE_PAGE + COMMENTS).to_snapshot()
+    mock_stream.assert_not_called()
+    assert complete.parse_path == "scraper_cached_html"
+
+    full_recipe = RECIPE_PAGE.replace('"name"', (
+        '"description": "Custard.", "recipeIngredient": ["2 cups cream"], "recipeInstructions": "Bake.", '
+        '"image": "https://example.com/c.jpg", "prepTime": "PT10M", "cookTime": "PT50M", "totalTime": "PT1H", '
+        '"recipeYield": "4", "name"'
+    ))
+    assert ScrapersParser("https://example.com/creme-brulee", html=full_recipe).to_snapshot().parse_path == "json_ld"
+
+    assert parse_path_counts() == {"json_ld": 1, "scraper_cached_html": 1, "network_refetch": 0}
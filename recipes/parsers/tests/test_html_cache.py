@@ -0,0 +1,54 @@
+import os
+import time
+from contextlib import nullcontext
+from unittest.mock import patch
+
+import pytest
+
+from recipes.parsers.fetch import fetch_html
+from recipes.parsers.html_cache import HtmlCache, get_html_cache, normalize_url
+
+
+def test_normalize_url_collapses_equivalent_spellings():
+    assert normalize_url("HTTPS://Example.com:443/recipe?b=2&a=1#notes") == "https://example.com/recipe?a=1&b=2"
+    assert HtmlCache.key("https://example.com/recipe?b=2&a=1") == HtmlCache.key("https://EXAMPLE.com/recipe?a=1&b=2")
+
+def test_cache_round_trip_and_lru_eviction(tmp_path):
+    cache = HtmlCache(tmp_path, ttl=60, max_bytes=6_000)
+    cache.set("https://example.com/a", "<html>a</html>", etag='"abc"')
+    page = cache.get("https://example.com/a")
+    assert page.html == "<html>a</html>"
+    assert page.conditional_headers() == {"If-None-Match": '"abc"'}
+
+    # Incompressible bodies so each entry takes a real share of the budget
+    for name in ["old", "recent", "new"]:
+        cache.set(f"https://example.com/{name}", os.urandom(2500).hex())
+        path = cache._path(f"https://example.com/{name}")
+        stamp = time.time() - {"old": 300, "recent": 100, "new": 0}[name]
+        os.utime(path, (stamp, stamp))
+    cache.evict()
+
+    assert cache.get("https://example.com/old") is None
+    assert cache.get("https://example.com/new") is not None
+
+@pytest.mark.recipe_fixture("mock_recipe.html")
+def test_fetch_html_serves_fresh_entries_without_network():
+    url = "https://www.allrecipes.com/recipe/99999/mock-recipe/"
+    first = fetch_html(url)
+
+    with patch("recipes.parsers.fetch.http_clients.stream") as mock_stream:
+        assert fetch_html(url) == first
+        mock_stream.assert_not_called()
+
+def test_fetch_html_revalidates_stale_entries(settings, fake_response):
+    settings.HTML_CACHE_TTL = 0
+    url = "https://example.com/recipe"
+    get_html_cache().set(url, "<html>cached</html>", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    not_modified = fake_response(status_code=304)
+    with patch("recipes.parsers.fetch.http_clients.stream", return_value=nullcontext(not_modified)) as mock_stream:
+        assert fetch_html(url) == "<html>cached</html>"
+
+    sent_headers = mock_stream.call_args.kwargs["headers"]
+    assert sent_headers["If-None-Match"] == '"v1"'
+    assert sent_headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
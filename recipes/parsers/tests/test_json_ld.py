@@ -0,0 +1,45 @@
+import pytest
+
+from recipes.parsers.utils import extract_json_ld_scripts, extract_json_ld_scripts_soup
+
+
+@pytest.mark.parametrize("filename", [
+    "allrecipes_100_grand.html",
+    "houseofnasheats_banana_bread.html",
+    "lesswithlaur_chicken_gnocchi.html",
+    "mock_recipe.html",
+    "purelyyum_shrimp_ramen.html",
+])
+def test_scanner_matches_beautifulsoup(load_fixture, filename):
+    html = load_fixture(filename)
+    assert extract_json_ld_scripts(html) == extract_json_ld_scripts_soup(html)
+
+def test_scanner_handles_attribute_order_and_case():
+    html = """
+    <SCRIPT class='schema' TYPE='application/ld+json'>{"@type": "Recipe"}</SCRIPT>
+    <script type="text/javascript">var x = "application/ld+json";</script>
+    <script type=application/ld+json>{"@type": "Person"}</script >
+    """
+    assert extract_json_ld_scripts(html) == ['{"@type": "Recipe"}', '{"@type": "Person"}']
+
+
+def test_scanner_ignores_data_type_attributes():
+    html = """
+    <script data-type="application/ld+json" type="text/template">{"@type": "Template"}</script>
+    <script type="application/ld+json">{"@type": "Recipe"}</script>
+    """
+    assert extract_json_ld_scripts(html) == ['{"@type": "Recipe"}']
+
+
+@pytest.mark.parametrize("html", [
+    '<script type="application/ld+json">  </script><p>application/ld+json</p>',
+    '<script>var type = "application/ld+json";</script>',
+])
+def test_soup_fallback_only_runs_without_any_json_ld_script(html, monkeypatch):
+    monkeypatch.setattr("recipes.parsers.utils.extract_json_ld_scripts_soup", pytest.fail)
+    assert extract_json_ld_scripts(html) == []
+
+
+def test_soup_fallback_handles_unusual_markup():
+    html = '<script data-note="a>b" type="application/ld+json">{"@type": "Recipe"}</script>'
+    assert extract_json_ld_scripts(html) == ['{"@type": "Recipe"}']
@@ -0,0 +1,163 @@
+from contextlib import nullcontext
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from recipes.parsers.fetch import fetch_html
+from recipes.parsers.politeness import (
+    DomainThrottled,
+    MemoryPolitenessState,
+    RedisPolitenessState,
+    close_breaker,
+    domain_key,
+    fetch_health,
+    polite_slot,
+    record_response,
+    unavailable_reason,
+)
+
+
+def _response(status_code, text="", headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    response.raise_for_status = lambda: None
+    return response
+
+
+def test_token_bucket_allows_burst_then_paces():
+    now = [100.0]
+    state = MemoryPolitenessState(clock=lambda: now[0])
+
+    assert state.take_token("example.com", rate=1, burst=2) == 0
+    assert state.take_token("example.com", rate=1, burst=2) == 0
+    assert state.take_token("example.com", rate=1, burst=2) == pytest.approx(1.0)
+    # Other domains have their own bucket
+    assert state.take_token("other.com", rate=1, burst=2) == 0
+
+    now[0] += 1
+    assert state.take_token("example.com", rate=1, burst=2) == 0
+
+
+def test_concurrency_slots_are_capped_per_domain():
+    state = MemoryPolitenessState()
+    first = state.acquire_slot("example.com", limit=1, lease=30)
+    assert first
+    assert state.acquire_slot("example.com", limit=1, lease=30) is None
+
+    state.release_slot("example.com", first)
+    assert state.acquire_slot("example.com", limit=1, lease=30)
+
+
+def test_retry_after_blocks_the_whole_domain(settings):
+    settings.FETCH_MAX_WAIT = 1
+
+    delay = record_response("https://www.example.com/a", _response(429, headers={"Retry-After": "120"}))
+
+    assert delay == 120
+    with pytest.raises(DomainThrottled), polite_slot("https://example.com/b"):
+        pass
+
+
+def test_interactive_fetches_use_a_shorter_wait(settings):
+    settings.FETCH_MAX_WAIT = 60
+    settings.FETCH_DOMAIN_RATE = 0.1
+    settings.FETCH_DOMAIN_BURST = 1
+
+    with polite_slot("https://example.com/a", max_wait=0.5):
+        pass
+    # The next token is 10s away: far inside FETCH_MAX_WAIT, past max_wait
+    with patch("recipes.parsers.politeness.time.sleep") as mock_sleep, \
+            pytest.raises(DomainThrottled), polite_slot("https://example.com/b", max_wait=0.5):
+        pass
+    mock_sleep.assert_not_called()
+
+
+def test_backoff_grows_exponentially_without_retry_after(settings):
+    settings.FETCH_BACKOFF_BASE = 0.01
+
+    delays = [record_response("https://example.com/", _response(403)) for _ in range(3)]
+    assert delays == pytest.approx([0.01, 0.02, 0.04])
+
+    # A successful response resets the backoff
+    record_response("https://example.com/", _response(200))
+    assert record_response("https://example.com/", _response(403)) == pytest.approx(0.01)
+
+
+def test_fetch_html_retries_after_429(fake_response):
+    responses = [fake_response(status_code=429, headers={"Retry-After": "0"}), fake_response("<html>ok</html>")]
+
+    with patch("httpx.Client.stream", side_effect=[nullcontext(r) for r in responses]) as mock_stream:
+        assert fetch_html("https://example.com/recipe") == "<html>ok</html>"
+    assert mock_stream.call_count == 2
+
+
+def test_domain_key_ignores_www():
+    assert domain_key("https://WWW.Example.com/x") == domain_key("https://example.com/y") == "example.com"
+
+
+def test_breaker_opens_after_consecutive_failures(settings):
+    settings.FETCH_BREAKER_THRESHOLD = 2
+
+    with patch("httpx.Client.stream", side_effect=httpx.ConnectTimeout("timed out")) as mock_stream:
+        assert fetch_html("https://dead.example/a") is None
+        assert fetch_html("https://dead.example/b") is None
+        assert mock_stream.call_count == 2
+
+        # Breaker is open: neither a new URL nor a failed one touches the network
+        assert fetch_html("https://dead.example/c") is None
+        assert fetch_html("https://www.dead.example/a") is None
+        assert mock_stream.call_count == 2
+
+    assert "circuit breaker open" in unavailable_reason("https://dead.example/d")
+    assert [b["domain"] for b in fetch_health()["breakers"]] == ["dead.example"]
+
+    close_breaker("dead.example")
+    assert unavailable_reason("https://dead.example/d") is None
+
+
+def test_missing_page_is_cached_without_tripping_breaker(settings, fake_response):
+    settings.FETCH_BREAKER_THRESHOLD = 1
+    missing = fake_response(status_code=404)
+    missing.raise_for_status = lambda: (_ for _ in ()).throw(
+        httpx.HTTPStatusError("Not Found", request=MagicMock(), response=missing)
+    )
+
+    with patch("httpx.Client.stream", return_value=nullcontext(missing)) as mock_stream:
+        assert fetch_html("https://example.com/gone") is None
+        assert fetch_html("https://example.com/gone") is None
+    assert mock_stream.call_count == 1
+
+    assert unavailable_reason("https://example.com/gone") == "failed recently (HTTP 404)"
+    assert unavailable_reason("https://example.com/other") is None
+
+
+def test_memory_state_drops_expired_entries():
+    now = [100.0]
+    state = MemoryPolitenessState(clock=lambda: now[0])
+    for i in range(50):
+        state.remember_failed_url(f"https://example.com/{i}", "HTTP 404", ttl=10)
+        state.add_failure(f"dead{i}.example", threshold=1, cooldown=10)
+        state.block(f"busy{i}.example", seconds=10)
+
+    assert state.failed_url_reason("https://example.com/0") == "HTTP 404"
+    now[0] += 31 + state.PRUNE_INTERVAL
+    assert state.failed_url_reason("https://example.com/0") is None
+    assert state.breaker_remaining("dead0.example") == 0
+
+    # The next write sweeps everything else that has expired
+    state.remember_failed_url("https://example.com/new", "HTTP 500", ttl=10)
+    assert list(state._failed_urls) == ["https://example.com/new"]
+    assert not state._open_until and not state._failures and not state._blocked_until
+
+
+def test_redis_failure_count_outlives_short_cooldowns():
+    client = MagicMock()
+    pipe = client.pipeline.return_value.__enter__.return_value
+    pipe.execute.return_value = (1, True)
+
+    RedisPolitenessState(client).add_failure("example.com", threshold=5, cooldown=0.2)
+
+    pipe.expire.assert_called_once_with("kitchenclip:fetch:failures:example.com", 1)
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from recipes.parsers.allrecipes import AllrecipesParser
+from recipes.parsers.html_cache import CachedPage
+from recipes.parsers.manifest import build_manifest, load_manifest
+from recipes.parsers.registry import ParserRegistry
+from recipes.parsers.scrapers_parser import ScrapersParser
+
+
+@pytest.mark.recipe_fixture("allrecipes_100_grand.html")
+async def test_aget_parser_fetches_asynchronously():
+    url = "https://www.allrecipes.com/100-grand-bars-recipe-11918066"
+    parser = await ParserRegistry.aget_parser(url)
+
+    assert isinstance(parser, AllrecipesParser)
+    assert "100 Grand Bars" in parser.title
+    assert len(parser.ingredients) == 4
+
+async def test_aget_parsers_respects_concurrency_cap():
+    in_flight = 0
+    peak = 0
+
+    async def _slow_fetch(url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return CachedPage(url, "<html><head><title>Empty</title></head></html>", None, None, 0)
+
+    urls = [f"https://unknown-blog.test/recipe-{i}/" for i in range(10)]
+    with patch("recipes.parsers.base.afetch_page", side_effect=_slow_fetch):
+        parsers = await ParserRegistry.aget_parsers(urls, concurrency=3)
+
+    assert peak == 3
+    assert [p.url for p in parsers] == urls
+    assert all(isinstance(p, ScrapersParser) for p in parsers)
+
+def test_resolve_routes_subdomains_to_parent_domain_parser():
+    assert ParserRegistry.resolve("https://www.allrecipes.com/recipe/1/") is AllrecipesParser
+    assert ParserRegistry.resolve("https://m.allrecipes.com/recipe/1/") is AllrecipesParser
+    assert ParserRegistry.resolve("https://UK.Allrecipes.com:443/recipe/1/") is AllrecipesParser
+    assert ParserRegistry.resolve("https://notallrecipes.com/recipe/1/") is ScrapersParser
+    assert ParserRegistry.routing_table()["allrecipes.com"] == "recipes.parsers.allrecipes.AllrecipesParser"
+
+def test_register_rejects_conflicting_domains():
+    class CopycatParser(ScrapersParser):
+        SUPPORTED_DOMAINS = ["allrecipes.com"]
+
+    with pytest.raises(ValueError, match="already handled by"):
+        ParserRegistry.register(CopycatParser)
+
+    assert ParserRegistry.lookup("allrecipes.com") is AllrecipesParser
+
+def test_manifest_is_up_to_date():
+    # Regenerate with: python manage.py build_parser_manifest
+    assert load_manifest() == build_manifest()
+
+def test_registry_import_does_not_load_parser_dependencies():
+    statement = (
+        "import sys, django; django.setup(); import recipes.views; "
+        "print(','.join(m for m in ('bs4', 'recipe_scrapers', 'recipes.parsers.base') if m in sys.modules))"
+    )
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "KitchenClip.settings"}
+    result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_batch_order_interleaves_domains():
+    urls = [
+        "https://a.com/1", "https://a.com/2", "https://a.com/3",
+        "https://b.com/1", "https://www.b.com/2",
+    ]
+    assert ParserRegistry._interleave_by_domain(urls) == [0, 3, 1, 4, 2]
@@ -1,4 +1,5 @@
 
+import json
 import re
 
 from bs4 import BeautifulSoup
@@ -16,6 +17,67 @@ def parse_iso_duration(duration_str: str) -> int | None:
         return total if total > 0 else None
     return None
 
+# Matches a whole <script type="application/ld+json"> element in one pass,
+# whatever the attribute order or quoting, without building a DOM.
+# The type attribute must not be the tail of another name such as data-type.
+_JSON_LD_SCRIPT_RE = re.compile(
+    r'<script\b[^>]*?(?<![-\w])type\s*=\s*["\']?\s*application/ld\+json\s*["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL,
+)
+# A script tag that mentions JSON-LD, even behind a ">" inside an attribute value
+_JSON_LD_TAG_RE = re.compile(r'<script\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*?["\']?application/ld\+json', re.IGNORECASE)
+
+
+def extract_json_ld_scripts_soup(html: str) -> list[str]:
+    """Return the contents of every JSON-LD script using a full BeautifulSoup parse."""
+    soup = BeautifulSoup(html, 'html.parser')
+    return [
+        script.string
+        for script in soup.find_all('script', type='application/ld+json')
+        if script.string
+    ]
+
+def extract_json_ld_scripts(html: str) -> list[str]:
+    """
+    Return the contents of every JSON-LD script in the page.
+
+    Scans the raw HTML for the script blocks only, which is far cheaper than
+    building a DOM for a 1-2MB recipe page. Only when the scan finds no
+    JSON-LD script element at all, yet some script tag mentions JSON-LD
+    (unusual markup), does it fall back to BeautifulSoup.
+    """
+    if not html:
+        return []
+    matches = _JSON_LD_SCRIPT_RE.findall(html)
+    if matches or not _JSON_LD_TAG_RE.search(html):
+        return [content for content in matches if content.strip()]
+    return extract_json_ld_scripts_soup(html)
+
+def _matches_type(block: dict, target_type: str) -> bool:
+    block_type = block.get('@type')
+    return block_type == target_type or (isinstance(block_type, list) and target_type in block_type)
+
+def find_json_ld(html: str, target_type: str = "Recipe") -> dict | None:
+    """
+    Return the first JSON-LD object of target_type in the page.
+    Handles single objects, lists of objects and @graph arrays.
+    """
+    for content in extract_json_ld_scripts(html):
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            continue
+
+        blocks = data if isinstance(data, list) else [data]
+        for block in blocks:
+            if '@graph' in block:
+                for item in block['@graph']:
+                    if _matches_type(item, target_type):
+                        return item
+            elif _matches_type(block, target_type):
+                return block
+    return None
+
 def get_soup(html: str) -> BeautifulSoup:
     """Return a BeautifulSoup object for the given HTML."""
     return BeautifulSoup(html, 'html.parser')
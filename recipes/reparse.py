@@ -0,0 +1,122 @@
+"""
+The parsing half of reparse_recipes.
+
+reparse_job turns a ReparseJob (plain data read from the database up front)
+into a ReparseResult without touching the database itself, so a library-wide
+reparse can fan the CPU-bound work out over a ProcessPoolExecutor while the
+command's single writer applies the results in batched transactions.
+
+The shared parse cache (recipes.parse_cache) follows the same split: the
+command looks up the lines it can predict and hands them over in
+ReparseJob.known, and workers return the lines they had to parse in
+ReparseResult.parsed_lines for the writer to store.
+"""
+import logging
+from dataclasses import dataclass, field
+
+from .ingredient_processor import (
+    ParsedIngredient,
+    cached_parses,
+    normalize_line,
+    parse_cache_stats,
+    parse_ingredients,
+    prime_parse_cache,
+)
+from .parsers.registry import ParserRegistry
+from .parsers.snapshot import ParsedRecipe
+from .services import RecipeImportService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReparseJob:
+    recipe_id: int
+    original_url: str | None
+    # The recipe's current raw_text lines, the fallback when there is nothing to fetch
+    existing_lines: list[str]
+    source_snapshot: bytes | None = None
+    from_snapshot: bool = False
+    # Stored parse results for lines this recipe is expected to have, by normalized line
+    known: dict[str, dict] = field(default_factory=dict)
+
+
+@dataclass
+class ReparseResult:
+    recipe_id: int
+    ingredients: list[ParsedIngredient] = field(default_factory=list)
+    metadata: dict = field(default_factory=dict)
+    # A fresh packed snapshot to store, and the canonical_url/content_hash that go with it
+    source_snapshot: bytes | None = None
+    identity: dict = field(default_factory=dict)
+    # (level, message) pairs for the command to print, level being "info" or "warning"
+    notes: list[tuple[str, str]] = field(default_factory=list)
+    error: str = ""
+    # True when there were no ingredient lines at all; the recipe is left alone
+    skipped: bool = False
+    # Parse cache (hits, misses, evictions, fast_path, slicer) spent on this job
+    cache: tuple[int, int, int, int, int] = (0, 0, 0, 0, 0)
+    # Parse results for this recipe's lines that were not in ReparseJob.known
+    parsed_lines: dict[str, dict] = field(default_factory=dict)
+
+
+def init_worker():
+    """ProcessPoolExecutor initializer: make sure Django is set up in spawned workers."""
+    import django
+    django.setup()
+
+
+def reparse_job(job: ReparseJob) -> ReparseResult:
+    """Parse one recipe from its stored snapshot, its URL or its existing lines."""
+    prime_parse_cache(job.known)
+    before = parse_cache_stats()
+    result = ReparseResult(job.recipe_id)
+    try:
+        _reparse(job, result)
+    except Exception as e:
+        logger.exception(f"Failed to re-parse recipe {job.recipe_id}")
+        result.error = str(e)
+    after = parse_cache_stats()
+    result.cache = tuple(max(0, after[key] - before[key]) for key in ("hits", "misses", "evictions", "fast_path", "slicer"))
+    return result
+
+
+def _reparse(job: ReparseJob, result: ReparseResult):
+    ingredient_lines = []
+    snapshot = None
+
+    if job.from_snapshot:
+        stored = ParsedRecipe.unpack(job.source_snapshot)
+        snapshot = ParserRegistry.resolve(stored.url).from_snapshot(stored).to_snapshot()
+        ingredient_lines = list(snapshot.ingredients)
+        result.metadata = snapshot.as_recipe_fields()
+    elif job.original_url:
+        result.notes.append(("info", f"Fetching from URL: {job.original_url}"))
+        try:
+            snapshot = ParserRegistry.get_parser(job.original_url).to_snapshot()
+            ingredient_lines = list(snapshot.ingredients)
+            result.metadata = snapshot.as_recipe_fields()
+            if snapshot.title and snapshot.ingredients:
+                result.source_snapshot = snapshot.pack()
+            else:
+                snapshot = None
+        except Exception as e:
+            snapshot = None
+            result.notes.append(("warning", f"Failed to parse URL, falling back to existing ingredients: {e}"))
+            ingredient_lines = list(job.existing_lines)
+    else:
+        result.notes.append(("info", "No URL found, re-processing existing ingredients."))
+        ingredient_lines = list(job.existing_lines)
+
+    if not ingredient_lines:
+        result.notes.append(("warning", "No ingredients found to process."))
+        result.skipped = True
+        return
+
+    if snapshot:
+        result.identity = RecipeImportService.identity_fields(snapshot, job.original_url or snapshot.url)
+
+    # Parse, consolidate, format and normalize; lines with no food are dropped
+    result.ingredients = parse_ingredients(ingredient_lines)
+    keys = {normalize_line(line) for line in ingredient_lines} - job.known.keys()
+    result.parsed_lines = cached_parses(keys - {""})
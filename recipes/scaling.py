@@ -0,0 +1,76 @@
+"""
+Viewing a recipe at another size.
+
+The stored display quantities ("1½", "2 lb 4") are read back into numbers,
+multiplied and rendered again with display_quantity, so scaled lines look
+like freshly imported ones. Lines whose quantity is not a number (a blank,
+"a few") are shown unchanged.
+
+Results are cached per (recipe, factor). Recipe.updated_at is part of the
+key, so editing or re-parsing a recipe leaves its old entries to expire.
+"""
+from django.core.cache import cache
+
+from .ingredient_processor import display_quantity, parse_quantity
+
+# Largest and smallest multiplier accepted from a request
+MAX_FACTOR = 100
+MIN_FACTOR = 0.01
+SCALE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def resolve_factor(recipe, factor=None, servings=None) -> float:
+    """
+    The multiplier for a request giving either a factor ("2", "0.5", "1/2")
+    or a number of servings. An explicit factor wins when both are given.
+    Raises ValueError if neither makes sense.
+    """
+    if factor not in (None, ""):
+        value = _number(factor)
+    elif servings not in (None, ""):
+        if not recipe.servings:
+            raise ValueError("This recipe has no servings to scale from.")
+        value = _number(servings) / recipe.servings
+    else:
+        return 1.0
+
+    if not MIN_FACTOR <= value <= MAX_FACTOR:
+        raise ValueError(f"Scale must be between {MIN_FACTOR:g} and {MAX_FACTOR:g}.")
+    return round(value, 4)
+
+
+def _number(text) -> float:
+    value = parse_quantity(str(text))
+    if value is None:
+        raise ValueError(f"{text!r} is not a number.")
+    return value
+
+
+def scale_line(quantity: str, unit: str, factor: float) -> tuple[str, str, bool]:
+    """A RecipeIngredient's (quantity, unit) multiplied by factor, and whether it could be scaled."""
+    value = parse_quantity(quantity, unit)
+    if value is None or factor == 1:
+        return quantity, unit, False
+    scaled, scaled_unit = display_quantity(value * factor, unit)
+    return scaled, scaled_unit, True
+
+
+def scaled_ingredients(recipe, factor: float) -> list[dict]:
+    """The recipe's ingredient rows in order, with quantity and unit multiplied by factor."""
+    key = f"recipes:scaled:{recipe.pk}:{recipe.updated_at.timestamp()}:{factor:g}"
+    rows = cache.get(key)
+    if rows is None:
+        rows = []
+        for item in recipe.recipe_ingredients.select_related('ingredient'):
+            quantity, unit, scaled = scale_line(item.quantity, item.unit, factor)
+            rows.append({
+                "id": item.pk,
+                "food": item.ingredient.name,
+                "quantity": quantity,
+                "unit": unit,
+                "preparation": item.preparation,
+                "raw_text": item.raw_text,
+                "scaled": scaled,
+            })
+        cache.set(key, rows, SCALE_CACHE_TIMEOUT)
+    return rows
@@ -1,12 +1,28 @@
 import logging
 from datetime import datetime, timedelta
 
-import httpx
 from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from .models import MealPlan
+from .http_client import get_async_client
+from .ingredient_processor import parse_ingredients
+from .models import (
+    CrawledUrl,
+    ImportBatch,
+    ImportBatchItem,
+    Ingredient,
+    MealPlan,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+)
+from .parse_cache import warm_lines
+from .parsers.canonical import canonical_url
+from .parsers.politeness import unavailable_reason
+from .parsers.registry import ParserRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -80,13 +96,205 @@ class NotificationService:
                     sent_count += 1
                 else:
                     try:
-                        async with httpx.AsyncClient(follow_redirects=True) as client:
-                            response = await client.post(settings.BEACON_URL, json=payload, timeout=10.0)
-                            response.raise_for_status()
-                            await mark_as_sent(plan)
-                            sent_count += 1
-                            logger.info(f"Sent reminder for {plan.meal_type} on {today}")
+                        client = get_async_client()
+                        response = await client.post(settings.BEACON_URL, json=payload, timeout=10.0)
+                        response.raise_for_status()
+                        await mark_as_sent(plan)
+                        sent_count += 1
+                        logger.info(f"Sent reminder for {plan.meal_type} on {today}")
                     except Exception as e:
                         logger.error(f"Failed to send reminder for {plan.meal_type}: {e}")
 
         return sent_count
+
+
+class RecipeImportService:
+    @staticmethod
+    def save_ingredients(recipe, ingredient_lines):
+        """Parse, consolidate and store raw ingredient lines for a recipe."""
+        ingredient_lines = list(ingredient_lines)
+        warm_lines(ingredient_lines)
+        for idx, item in enumerate(parse_ingredients(ingredient_lines)):
+            ingredient, _ = Ingredient.objects.get_or_create(name=item.food)
+
+            RecipeIngredient.objects.create(
+                recipe=recipe,
+                ingredient=ingredient,
+                raw_text=item.raw_text,
+                order=idx,
+                **item.row_fields(),
+            )
+
+    @staticmethod
+    def tag_names(raw_tags) -> list[str]:
+        """
+        Tag names from a list of names or a comma-separated string.
+        Raises ValueError for anything else.
+        """
+        if isinstance(raw_tags, str):
+            raw_tags = raw_tags.split(",")
+        elif not isinstance(raw_tags, (list, tuple)) or not all(isinstance(tag, str) for tag in raw_tags):
+            raise ValueError("tags must be a list of strings or a comma-separated string")
+        return [tag.strip() for tag in raw_tags if tag.strip()]
+
+    @staticmethod
+    def set_tags(recipe, raw_tags):
+        """Attach tags given as a list of names or a comma-separated string."""
+        tag_objs = []
+        for name in RecipeImportService.tag_names(raw_tags):
+            slug = name.lower().replace(" ", "-")
+            tag_obj, _ = RecipeTag.objects.get_or_create(name=name, defaults={"slug": slug})
+            tag_objs.append(tag_obj)
+        recipe.tags.set(tag_objs)
+
+    @staticmethod
+    def find_existing(url):
+        """
+        Return the saved Recipe for url without any network or parsing work:
+        an exact original_url match, else one with the same canonical key
+        (tracking parameters, www, AMP and print variants ignored).
+        """
+        return (
+            Recipe.objects.filter(original_url=url).first()
+            or Recipe.objects.filter(canonical_url=canonical_url(url)).first()
+        )
+
+    @staticmethod
+    def find_duplicate(snapshot):
+        """Match a freshly parsed page by its rel=canonical key or its content hash."""
+        match = Q(content_hash=snapshot.content_hash())
+        if snapshot.canonical_url:
+            match |= Q(canonical_url=snapshot.canonical_url)
+        return Recipe.objects.filter(match).first()
+
+    @staticmethod
+    def identity_fields(snapshot, url):
+        """canonical_url and content_hash values for a recipe parsed from url."""
+        return {
+            "canonical_url": snapshot.canonical_url or canonical_url(url),
+            "content_hash": snapshot.content_hash(),
+        }
+
+    @staticmethod
+    def import_from_url(url, is_future=False, tags=()):
+        """
+        Fetch, parse and save a recipe from its URL, returning (recipe, created).
+        URLs that canonicalize to a saved recipe return it before any fetch, and
+        a parsed page matching a saved recipe by rel=canonical or content hash
+        returns that recipe instead of a new row.
+        Raises ValueError if the page has no usable recipe data.
+        """
+        existing = RecipeImportService.find_existing(url)
+        if existing:
+            return existing, False
+
+        snapshot = ParserRegistry.get_parser(url).to_snapshot()
+        if not snapshot.title or not snapshot.ingredients:
+            reason = unavailable_reason(url)
+            if reason:
+                raise ValueError(f"Could not fetch {url}: {reason}")
+            raise ValueError(f"No recipe data found at {url}")
+
+        duplicate = RecipeImportService.find_duplicate(snapshot)
+        if duplicate:
+            logger.info(f"{url} is the same recipe as {duplicate.original_url} (id {duplicate.pk})")
+            return duplicate, False
+
+        with transaction.atomic():
+            recipe = Recipe(
+                original_url=url, is_future=is_future, source_snapshot=snapshot.pack(),
+                **RecipeImportService.identity_fields(snapshot, url),
+                **snapshot.as_recipe_fields()
+            )
+            recipe.save()
+            RecipeImportService.save_ingredients(recipe, snapshot.ingredients)
+            RecipeImportService.set_tags(recipe, tags)
+        return recipe, True
+
+    @staticmethod
+    def create_batch(urls, is_future=False, tags=()):
+        """
+        Create an ImportBatch for the given URLs and queue one Celery task per new URL.
+        See add_batch_items for how the URLs are filtered.
+        """
+        with transaction.atomic():
+            batch = ImportBatch.objects.create(is_future=is_future, tags=RecipeImportService.tag_names(tags))
+            queued, duplicates = RecipeImportService.add_batch_items(batch, urls)
+
+        logger.info(f"Created import batch {batch.pk}: {queued} queued, {duplicates} already imported")
+        return batch
+
+    @staticmethod
+    def add_batch_items(batch, urls):
+        """
+        Add URLs to an existing batch and queue a Celery task for each new one.
+        Blank lines and '#' comments are skipped, URLs with the same canonical key are
+        collapsed, and URLs matching a saved Recipe by original_url or canonical key
+        (or already in the batch) are recorded as duplicates without a fetch.
+        Returns (queued, duplicates).
+        """
+        from .tasks import import_recipe_task
+
+        unique_urls = []
+        keys = {}
+        seen_keys = set()
+        for url in urls:
+            url = url.strip()
+            if url and not url.startswith("#"):
+                key = canonical_url(url)
+                if key not in seen_keys:
+                    seen_keys.add(key)
+                    keys[url] = key
+                    unique_urls.append(url)
+
+        by_url, by_key = {}, {}
+        matches = Recipe.objects.filter(
+            Q(original_url__in=unique_urls) | Q(canonical_url__in=seen_keys)
+        ).values_list('id', 'original_url', 'canonical_url')
+        for recipe_id, original_url, key in matches:
+            by_url[original_url] = recipe_id
+            by_key.setdefault(key, recipe_id)
+        existing = {
+            url: by_url.get(url) or by_key.get(keys[url])
+            for url in unique_urls
+            if url in by_url or keys[url] in by_key
+        }
+        in_batch = set(batch.items.filter(url__in=unique_urls).values_list('url', flat=True))
+        unique_urls = [url for url in unique_urls if url not in in_batch]
+
+        with transaction.atomic():
+            items = ImportBatchItem.objects.bulk_create([
+                ImportBatchItem(
+                    batch=batch,
+                    url=url,
+                    recipe_id=existing.get(url),
+                    status=ImportBatchItem.Status.DUPLICATE if url in existing else ImportBatchItem.Status.PENDING,
+                )
+                for url in unique_urls
+            ])
+            pending_ids = [item.id for item in items if item.status == ImportBatchItem.Status.PENDING]
+            transaction.on_commit(lambda: [import_recipe_task.delay(item_id) for item_id in pending_ids])
+
+        return len(pending_ids), len(items) - len(pending_ids)
+
+    @staticmethod
+    def run_batch_item(item_id):
+        """Import a single batch item and record the outcome on it."""
+        item = ImportBatchItem.objects.select_related('batch').get(id=item_id)
+        if item.status != ImportBatchItem.Status.PENDING:
+            return item
+
+        try:
+            item.recipe, created = RecipeImportService.import_from_url(
+                item.url, is_future=item.batch.is_future, tags=item.batch.tags
+            )
+            item.status = ImportBatchItem.Status.IMPORTED if created else ImportBatchItem.Status.DUPLICATE
+        except Exception as e:
+            logger.exception(f"Bulk import failed for {item.url}")
+            item.status = ImportBatchItem.Status.FAILED
+            item.error = str(e)
+            # Forget the sitemap lastmod recorded when the page was queued, so the next crawl retries it
+            CrawledUrl.objects.filter(url=item.url, batch=item.batch).delete()
+
+        item.save(update_fields=['status', 'recipe', 'error', 'updated_at'])
+        return item
@@ -3,10 +3,20 @@ import logging
 
 from celery import shared_task
 
-from .services import NotificationService
+from .http_client import http_clients
+from .images import cache_recipe_image
+from .services import NotificationService, RecipeImportService
 
 logger = logging.getLogger(__name__)
 
+async def _check_upcoming_meals():
+    # asyncio.run() gives every task its own loop, so release the loop's pooled
+    # client before the loop goes away.
+    try:
+        return await NotificationService.check_and_send_upcoming_meals()
+    finally:
+        await http_clients.aclose()
+
 @shared_task
 def check_upcoming_meals_task():
     """
@@ -17,8 +27,25 @@ def check_upcoming_meals_task():
     
     try:
         # Run the async notification service method
-        sent = asyncio.run(NotificationService.check_and_send_upcoming_meals())
+        sent = asyncio.run(_check_upcoming_meals())
         return f"Checked upcoming meals. Sent {sent} notifications."
     except Exception as e:
         logger.error(f"Error in check_upcoming_meals_task: {e}")
         raise
+
+
+@shared_task
+def import_recipe_task(item_id):
+    """
+    Import one URL from a bulk ImportBatch.
+    Routed to the dedicated 'imports' queue (see CELERY_TASK_ROUTES).
+    """
+    item = RecipeImportService.run_batch_item(item_id)
+    return f"{item.url}: {item.status}"
+
+
+@shared_task
+def cache_recipe_image_task(recipe_id):
+    """Download and resize one recipe image; shares the 'imports' queue with bulk imports."""
+    cached = cache_recipe_image(recipe_id)
+    return f"Recipe {recipe_id}: {'cached' if cached else 'unchanged'}"
@@ -0,0 +1,33 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from recipes.images import IMAGE_FORMATS, variant_url
+
+register = template.Library()
+
+
+@register.filter
+def recipe_image(recipe, size="card"):
+    """URL of the cached JPEG variant of the recipe's image, else the hotlinked image_url."""
+    return variant_url(recipe, size)
+
+
+@register.simple_tag
+def recipe_picture(recipe, size="card", css_class="", alt=None):
+    """
+    Render a <picture> with a WebP source and JPEG fallback for a cached
+    variant, or a plain <img> of image_url while nothing is cached yet.
+    """
+    alt = recipe.title if alt is None else alt
+    fallback = variant_url(recipe, size)
+    if fallback == recipe.image_url:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">', fallback, alt, css_class)
+
+    sources = format_html_join(
+        "", '<source type="image/{}" srcset="{}">',
+        ((ext, variant_url(recipe, size, ext)) for ext in IMAGE_FORMATS if ext != "jpg"),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" class="{}" loading="lazy"></picture>',
+        sources, fallback, alt, css_class,
+    )
@@ -0,0 +1,36 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+from recipes.benchmarks import STAGES, compare_results, load_fixtures, run_benchmark
+
+
+def test_benchmark_covers_every_fixture_and_stage():
+    fixtures = load_fixtures()
+    results = run_benchmark(fixtures, iterations=1)
+
+    assert set(results['fixtures']) == {name for name, _url, _html in fixtures}
+    assert set(results['stages']) == set(STAGES)
+    assert results['pages_per_second'] > 0
+    assert results['stages']['extract']['peak_kb'] > 0
+    assert results['lines_per_second']['batched_cached'] > results['lines_per_second']['batched'] > 0
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {'stages': {'extract': {'ms': 10.0}, 'process': {'ms': 1.0}}, 'pages_per_second': 100.0}
+    current = {'stages': {'extract': {'ms': 10.5}, 'process': {'ms': 2.0}}, 'pages_per_second': 80.0}
+
+    regressions = compare_results(current, baseline, threshold=0.10)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith('process:')
+    assert regressions[1].startswith('throughput:')
+
+
+def test_benchmark_command_saves_json(tmp_path):
+    output = tmp_path / 'baseline.json'
+    call_command('benchmark_parsers', iterations=1, save=output, stdout=StringIO())
+
+    saved = json.loads(output.read_text())
+    assert saved['meta']['iterations'] == 1
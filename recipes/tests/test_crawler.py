@@ -0,0 +1,140 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from recipes.crawler import SitemapCrawler, SitemapError, iter_sitemap
+from recipes.models import CrawledUrl, ImportBatchItem, Recipe
+from recipes.parsers.politeness import reset_local_state
+
+SITEMAP_NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _urlset(base, entries):
+    urls = "".join(f"<url><loc>{base}{path}</loc><lastmod>{lastmod}</lastmod></url>" for path, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {SITEMAP_NS}>{urls}</urlset>'.encode()
+
+
+@pytest.fixture
+def site(settings):
+    """A local HTTP stand-in for a recipe blog; tests edit site.pages to change what it serves."""
+    settings.FETCH_STATE_REDIS_URL = ""
+    settings.FETCH_DOMAIN_RATE = 1000
+    settings.FETCH_DOMAIN_BURST = 1000
+    reset_local_state()
+
+    pages = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages.get(self.path)
+            self.send_response(200 if body is not None else 404)
+            self.end_headers()
+            self.wfile.write(body or b"")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base = f"http://127.0.0.1:{server.server_port}"
+    server.pages = pages
+    yield server
+    server.shutdown()
+    server.server_close()
+    reset_local_state()
+
+
+@pytest.fixture
+def blog(site):
+    base = site.base
+    site.pages["/robots.txt"] = f"User-agent: *\nSitemap: {base}/sitemap_index.xml\n".encode()
+    site.pages["/sitemap_index.xml"] = (
+        f'<sitemapindex {SITEMAP_NS}>'
+        f'<sitemap><loc>{base}/post-sitemap.xml.gz</loc><lastmod>2024-05-01</lastmod></sitemap>'
+        f'<sitemap><loc>{base}/page-sitemap.xml</loc><lastmod>2024-01-01</lastmod></sitemap>'
+        f'</sitemapindex>'
+    ).encode()
+    site.pages["/post-sitemap.xml.gz"] = gzip.compress(_urlset(base, [
+        ("/soup-recipe/", "2024-05-01"),
+        ("/stew-recipe/", "2024-04-01T10:00:00+00:00"),
+        ("/tag/dinner/", "2024-05-01"),
+    ]))
+    site.pages["/page-sitemap.xml"] = _urlset(base, [("/about/", "2024-01-01")])
+    return site
+
+
+def test_iter_sitemap_streams_entries(blog):
+    entries = list(iter_sitemap(f"{blog.base}/post-sitemap.xml.gz"))
+
+    assert [entry.loc for entry in entries] == [
+        f"{blog.base}/soup-recipe/", f"{blog.base}/stew-recipe/", f"{blog.base}/tag/dinner/",
+    ]
+    assert entries[1].lastmod.hour == 10
+
+
+@pytest.mark.django_db(transaction=True)
+@patch('recipes.tasks.import_recipe_task.delay')
+def test_crawl_queues_only_new_or_changed_pages(mock_delay, blog):
+    crawl = {"include": [r"-recipe/$"], "exclude": [r"/tag/"]}
+
+    stats = SitemapCrawler(blog.base + "/", **crawl).run()
+    assert stats.sitemaps == 3
+    assert stats.urls_queued == 2
+    assert mock_delay.call_count == 2
+    assert CrawledUrl.objects.filter(kind=CrawledUrl.Kind.PAGE).count() == 2
+
+    # Nothing changed: both child sitemaps are skipped without a fetch
+    stats = SitemapCrawler(blog.base + "/", **crawl).run()
+    assert (stats.sitemaps_unchanged, stats.urls_queued) == (2, 0)
+
+    # One page edited, one added; the index advertises the newer post sitemap
+    blog.pages["/sitemap_index.xml"] = blog.pages["/sitemap_index.xml"].replace(b"2024-05-01", b"2024-06-01")
+    blog.pages["/post-sitemap.xml.gz"] = gzip.compress(_urlset(blog.base, [
+        ("/soup-recipe/", "2024-05-01"),
+        ("/stew-recipe/", "2024-06-01"),
+        ("/pie-recipe/", "2024-06-01"),
+    ]))
+    Recipe.objects.create(title="Stew", original_url=f"{blog.base}/stew-recipe/")
+
+    stats = SitemapCrawler(blog.base + "/", **crawl).run()
+    assert (stats.urls_unchanged, stats.urls_queued, stats.urls_duplicate) == (1, 1, 1)
+    assert ImportBatchItem.objects.filter(status=ImportBatchItem.Status.PENDING).count() == 3
+
+
+def test_gzip_bomb_is_stopped_at_the_size_limit(settings, site):
+    settings.SITEMAP_MAX_BYTES = 100_000
+    site.pages["/bomb.xml.gz"] = gzip.compress(b"<" * 50_000_000)
+
+    with patch("recipes.crawler._INFLATE_STEP", 10_000), pytest.raises(SitemapError, match="SITEMAP_MAX_BYTES"):
+        list(iter_sitemap(f"{site.base}/bomb.xml.gz"))
+
+
+@pytest.mark.django_db(transaction=True)
+@patch('recipes.tasks.import_recipe_task.delay')
+@patch('recipes.services.RecipeImportService.import_from_url', side_effect=RuntimeError("parse failed"))
+def test_failed_import_is_queued_again_on_the_next_crawl(mock_import, mock_delay, blog):
+    from recipes.services import RecipeImportService
+
+    crawl = {"include": [r"soup-recipe/$"]}
+    SitemapCrawler(blog.base + "/", **crawl).run()
+    item = ImportBatchItem.objects.get()
+    RecipeImportService.run_batch_item(item.id)
+
+    assert not CrawledUrl.objects.filter(kind=CrawledUrl.Kind.PAGE).exists()
+    CrawledUrl.objects.filter(kind=CrawledUrl.Kind.SITEMAP).delete()
+    assert SitemapCrawler(blog.base + "/", **crawl).run().urls_queued == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_crawl_sitemap_dry_run_saves_nothing(blog):
+    out = StringIO()
+    call_command('crawl_sitemap', f"{blog.base}/sitemap_index.xml", r'--include=-recipe/$', '--dry-run', stdout=out)
+
+    assert "Would queue 2 pages" in out.getvalue()
+    assert not CrawledUrl.objects.exists()
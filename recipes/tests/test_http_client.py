@@ -0,0 +1,36 @@
+import threading
+
+from recipes.http_client import HttpClientManager
+
+
+def test_shared_client_is_reused_until_closed(settings):
+    settings.HTTP_CLIENT_HTTP2 = False
+    manager = HttpClientManager()
+
+    client = manager.get_client()
+    assert manager.get_client() is client
+
+    manager.close()
+    assert client.is_closed
+    assert manager.get_client() is not client
+    manager.close()
+
+def test_host_slot_limits_concurrent_requests_per_host(settings):
+    settings.HTTP_CLIENT_PER_HOST_CONNECTIONS = 1
+    manager = HttpClientManager()
+    acquired = threading.Event()
+
+    def _other_request():
+        with manager.host_slot("https://www.allrecipes.com/other"):
+            acquired.set()
+
+    with manager.host_slot("https://www.allrecipes.com/recipe"):
+        # A different host is never blocked by the busy one
+        with manager.host_slot("https://lesswithlaur.com/recipe"):
+            pass
+        worker = threading.Thread(target=_other_request)
+        worker.start()
+        assert not acquired.wait(0.1)
+
+    worker.join(timeout=1)
+    assert acquired.is_set()
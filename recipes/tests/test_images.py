@@ -0,0 +1,94 @@
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template import Context, Template
+
+from recipes.images import build_variants
+from recipes.models import Recipe
+
+IMAGE_URL = "https://cdn.example.test/soup.jpg"
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.RECIPE_IMAGE_CACHE_ENABLED = True
+    return tmp_path
+
+
+def _cached_recipe(**kwargs):
+    sizes = {"card": {"webp": "recipe_images/ab/abc-card.webp", "jpg": "recipe_images/ab/abc-card.jpg"}}
+    return Recipe(title="Soup", image_url=IMAGE_URL, image_variants={"source": IMAGE_URL, "sizes": sizes}, **kwargs)
+
+
+def test_recipe_picture_uses_cached_variants():
+    html = Template('{% load recipe_images %}{% recipe_picture recipe "card" "w-full" %}').render(
+        Context({"recipe": _cached_recipe()})
+    )
+
+    assert '<source type="image/webp" srcset="/media/recipe_images/ab/abc-card.webp">' in html
+    assert 'src="/media/recipe_images/ab/abc-card.jpg"' in html
+    assert IMAGE_URL not in html
+
+
+def test_recipe_image_falls_back_to_hotlink_until_cached():
+    recipe = _cached_recipe()
+    recipe.image_url = "https://cdn.example.test/new-photo.jpg"
+
+    html = Template('{% load recipe_images %}{{ recipe|recipe_image:"card" }}').render(Context({"recipe": recipe}))
+
+    assert html == recipe.image_url
+
+
+@pytest.mark.django_db
+@patch('recipes.tasks.cache_recipe_image_task.delay')
+def test_saving_a_new_image_url_queues_caching(mock_delay, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe = Recipe.objects.create(title="Soup", instructions="", image_url=IMAGE_URL)
+    mock_delay.assert_called_once_with(recipe.pk)
+
+    Recipe.objects.filter(pk=recipe.pk).update(image_variants={"source": IMAGE_URL, "sizes": {}})
+    recipe.refresh_from_db()
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.title = "Better Soup"
+        recipe.save()
+    assert mock_delay.call_count == 1
+
+
+def test_image_files_are_served_with_long_cache_headers(client, settings):
+    settings.DEBUG = True
+    default_storage.save("recipe_images/ab/abc-thumb.jpg", ContentFile(b"\xff\xd8jpeg"))
+
+    response = client.get("/media/recipe_images/ab/abc-thumb.jpg")
+
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert client.get("/media/recipe_images/../../etc/passwd").status_code in (400, 404)
+
+
+def test_images_are_left_to_the_web_server_outside_debug(client, settings):
+    default_storage.save("recipe_images/ab/abc-thumb.jpg", ContentFile(b"\xff\xd8jpeg"))
+    assert client.get("/media/recipe_images/ab/abc-thumb.jpg").status_code == 404
+
+    settings.RECIPE_IMAGE_CACHE_ENABLED = False
+    html = Template('{% load recipe_images %}{{ recipe|recipe_image:"card" }}').render(
+        Context({"recipe": _cached_recipe()})
+    )
+    assert html == IMAGE_URL
+
+
+def test_build_variants_resizes_to_every_size(settings):
+    Image = pytest.importorskip("PIL.Image")
+    buffer = BytesIO()
+    Image.new("RGBA", (2000, 1500), (200, 80, 40, 255)).save(buffer, "PNG")
+
+    variants = build_variants(buffer.getvalue())
+
+    assert set(variants) == set(settings.RECIPE_IMAGE_SIZES)
+    with default_storage.open(variants["thumb"]["jpg"]) as f:
+        assert Image.open(f).size == (96, 96)
+    with default_storage.open(variants["full"]["webp"]) as f:
+        assert Image.open(f).size == (1200, 900)
@@ -1,8 +1,18 @@
 import re
 
 import ingredient_slicer
+import pytest
 
-from recipes.ingredient_processor import (parse_ingredient_line,
+from recipes import ingredient_processor
+from recipes.ingredient_processor import (_fraction_string,
+                                          clear_parse_cache,
+                                          decimal_to_fraction,
+                                          display_quantity,
+                                          format_quantity,
+                                          parse_cache_stats,
+                                          parse_ingredient_line,
+                                          parse_ingredients,
+                                          parse_quantity,
                                           process_ingredients)
 
 
@@ -104,3 +114,79 @@ def test_parse_ingredient_line_clove_fix():
     assert float(parsed["quantity"]) == 2.0
     assert parsed["unit"] == ""
     assert "garlic" in parsed["food"]
+
+def test_parse_ingredient_line_memoizes_normalized_lines():
+    """Whitespace variants share one cached parse, and callers get independent copies."""
+    clear_parse_cache()
+    first = parse_ingredient_line("1 teaspoon salt")
+    first["food"] = "pepper"
+    first["prep"].append("mutated")
+
+    second = parse_ingredient_line("  1 teaspoon   salt ")
+
+    assert second["food"] == "salt"
+    assert "mutated" not in second["prep"]
+    stats = parse_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+def test_parse_cache_evicts_and_drops_entries_on_version_bump(monkeypatch):
+    """The cache stays bounded and forgets everything when PARSER_VERSION changes."""
+    monkeypatch.setattr(ingredient_processor._parse_cache, "maxsize", 2)
+    clear_parse_cache()
+    for line in ("1 cup flour", "2 large eggs", "1 teaspoon salt"):
+        parse_ingredient_line(line)
+    assert parse_cache_stats()["evictions"] == 1
+    assert parse_cache_stats()["size"] == 2
+
+    monkeypatch.setattr(ingredient_processor, "PARSER_VERSION", ingredient_processor.PARSER_VERSION + 1)
+    parse_ingredient_line("1 teaspoon salt")
+
+    stats = parse_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (0, 4, 1)
+    clear_parse_cache()
+
+def test_parse_ingredients_matches_the_per_line_path():
+    """parse_ingredients gives the same result as parse_ingredient_line plus process_ingredients."""
+    lines = ["2 cloves garlic (10g)", "", "Ingredients", "1 tsp salt", "  1 tsp  salt", "20 oz chicken broth"]
+
+    batched = parse_ingredients(lines)
+
+    expected = process_ingredients([parse_ingredient_line(line) for line in lines if line.strip()])
+    assert [item.as_dict() for item in batched] == expected
+    salt = next(item for item in batched if item.food == "Salt")
+    assert salt.raw_text == "2 tsp Salt"
+    assert not hasattr(salt, "__dict__")
+
+def test_process_ingredients_adds_convertible_units():
+    """Volumes of one food are summed in the first unit seen; a mass of it stays separate."""
+    results = process_ingredients([
+        {"food": "flour", "unit": "cup", "quantity": 1.0, "prep": []},
+        {"food": "flour", "unit": "tablespoons", "quantity": 2.0, "prep": []},
+        {"food": "flour", "unit": "g", "quantity": 100.0, "prep": []},
+        {"food": "garlic", "unit": "clove", "quantity": 1.0, "prep": []},
+        {"food": "garlic", "unit": "cloves", "quantity": 2.0, "prep": []},
+    ])
+
+    flour_volume, flour_mass, garlic = results
+    assert (flour_volume["display_quantity"], flour_volume["unit"]) == ("1⅛", "cup")
+    assert (flour_volume["base_quantity"], flour_volume["base_unit"]) == (266.162, "ml")
+    assert (flour_mass["base_quantity"], flour_mass["base_unit"]) == (100.0, "g")
+    assert (garlic["quantity"], garlic["base_unit"]) == (3.0, "clove")
+
+def test_display_quantities_read_back_and_fraction_table():
+    """parse_quantity inverts display_quantity, and the fraction table agrees with the slow path."""
+    for value, unit in ((1.5, "cup"), (0.25, "tsp"), (2.0, "lb"), (36.0, "oz"), (4 / 3, "cup")):
+        shown, shown_unit = display_quantity(value, unit)
+        assert parse_quantity(shown, shown_unit) == pytest.approx(value, abs=0.001)
+    assert parse_quantity("a few") is None
+    assert all(decimal_to_fraction(str(n / 1000)) == _fraction_string(n / 1000) for n in range(1000))
+
+def test_merges_across_units_and_count_spellings():
+    """A remainder too small to show rounds away, and "cloves"/"clove" lines merge."""
+    flour, = parse_ingredients(["1 cup flour", "1 tsp flour"])
+    assert (flour.display_quantity, flour.unit) == ("1", "cup")
+    assert flour.base_quantity == pytest.approx(241.517, abs=0.001)
+
+    garlic, = parse_ingredients(["3 cloves garlic", "1 clove garlic"])
+    assert garlic.raw_text == "4 Cloves garlic"
+    assert format_quantity(0.02) == "0.02"
@@ -0,0 +1,73 @@
+import itertools
+
+import pytest
+
+from recipes.benchmarks import load_fixtures
+from recipes.ingredient_processor import (
+    _parse_ingredient_line,
+    clear_parse_cache,
+    normalize_line,
+    parse_cache_stats,
+    parse_ingredients,
+)
+from recipes.ingredient_tokenizer import PARSED_FIELDS, fast_parse
+from recipes.parsers.registry import ParserRegistry
+
+QUANTITIES = ["1", "2", "1/2", "1 1/2", "½", "1½", "0.5", "12", "2/3", "1 ⅓"]
+UNITS = ["cup", "cups", "tsp", "teaspoon", "Tbsp", "tablespoons", "oz", "ounces", "lb", "pounds", "g", "grams",
+         "ml", "can", "package", "pinch", "slices", "stick", "bunch", "jar", "pint", "sprigs"]
+FOODS = ["flour", "salt", "black pepper", "olive oil", "brown sugar", "heavy cream", "large eggs", "onion",
+         "fresh basil", "chicken broth", "cheddar cheese", "green onions", "frozen peas", "garlic"]
+PREPS = ["", "chopped", "finely chopped", "peeled and deveined", "softened", "divided", "at room temperature",
+         "to taste"]
+
+
+def fixture_lines():
+    lines = []
+    for _name, url, html in load_fixtures():
+        snapshot = ParserRegistry.resolve(url)(url, html=html).to_snapshot()
+        lines.extend(line for line in snapshot.ingredients if line and line.strip())
+    return lines
+
+
+def generated_lines():
+    for quantity, unit, food, prep in itertools.product(QUANTITIES, UNITS, FOODS, PREPS):
+        yield f"{quantity} {unit} {food}" + (f", {prep}" if prep else "")
+
+
+def test_fast_path_matches_the_slicer():
+    """Wherever the fast path answers, the slicer would have given the same result, key for key."""
+    accepted = 0
+    for line in itertools.chain(fixture_lines(), generated_lines()):
+        key = normalize_line(line)
+        fast = fast_parse(key)
+        if fast is None:
+            continue
+        accepted += 1
+        assert fast == _parse_ingredient_line(key), line
+    assert accepted > 1000
+
+
+@pytest.mark.parametrize("line", [
+    "3 eggs",
+    "2 cloves garlic, minced",
+    "1 (12 ounce) bag chocolate chips",
+    "3/4 cup (150g) granulated sugar",
+    "4 cups chicken or vegetable broth",
+    "1 cup walnuts, plus extra for topping",
+    "to taste salt",
+])
+def test_ambiguous_lines_go_to_the_slicer(line):
+    key = normalize_line(line)
+    assert fast_parse(key) is None
+    assert tuple(_parse_ingredient_line(key)) == PARSED_FIELDS
+
+
+def test_fast_path_ratio_is_reported():
+    clear_parse_cache()
+    parse_ingredients(["2 cups flour", "1 tsp salt", "2 cloves garlic, minced", "1 tsp salt"])
+
+    stats = parse_cache_stats()
+    assert (stats["fast_path"], stats["slicer"]) == (2, 1)
+    assert stats["fast_path_ratio"] == pytest.approx(2 / 3)
+    clear_parse_cache()
@@ -1,9 +1,13 @@
 from datetime import time
+from importlib import import_module
 
 import pytest
+from django.apps import apps
+from django.db.models import Sum
 from django.utils import timezone
 
-from recipes.models import MealPlan, Recipe, RecipeTag
+from recipes.models import MealPlan, Recipe, RecipeIngredient, RecipeTag
+from recipes.services import RecipeImportService
 
 
 @pytest.mark.django_db
@@ -44,3 +48,23 @@ def test_tag_auto_color():
     assert tag.color is not None
     assert tag.color.startswith("#")
     assert tag.slug == "vegetarian"
+
+@pytest.mark.django_db
+def test_ingredient_rows_store_numeric_quantities():
+    recipe = Recipe.objects.create(title="Pancakes", original_url="http://pancakes.local", instructions="Cook.")
+    RecipeImportService.save_ingredients(recipe, ["1 cup milk", "2 tbsp milk", "20 oz flour, sifted", "salt to taste"])
+
+    rows = {row.ingredient.name: row for row in recipe.recipe_ingredients.all()}
+    assert (rows["Milk"].quantity, rows["Milk"].quantity_value, rows["Milk"].canonical_unit) == ("1⅛", 266.162, "ml")
+    assert (rows["Flour"].quantity, rows["Flour"].unit, rows["Flour"].preparation) == ("1 lb 4", "oz", "sifted")
+    assert rows["Flour"].quantity_value == pytest.approx(566.99, abs=0.01)
+    assert RecipeIngredient.objects.filter(recipe=recipe, canonical_unit="ml").aggregate(Sum("quantity_value")) == \
+        {"quantity_value__sum": 266.162}
+
+    # The migration's backfill derives the same values from quantity and unit alone
+    RecipeIngredient.objects.filter(recipe=recipe).update(quantity_value=None, canonical_unit="")
+    import_module("recipes.migrations.0021_recipeingredient_quantity_value").backfill_quantities(apps, None)
+    flour = RecipeIngredient.objects.get(pk=rows["Flour"].pk)
+    assert (flour.quantity_value, flour.canonical_unit, flour.preparation) == (rows["Flour"].quantity_value, "g", "sifted")
+    milk = RecipeIngredient.objects.get(pk=rows["Milk"].pk)
+    assert (milk.quantity_value, milk.canonical_unit, milk.preparation) == (266.162, "ml", None)
@@ -0,0 +1,51 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from recipes import ingredient_processor
+from recipes.ingredient_processor import clear_parse_cache, parse_ingredient_line
+from recipes.models import Ingredient, ParsedIngredientLine, Recipe, RecipeIngredient
+from recipes.parse_cache import line_hash, warm_lines
+
+
+@pytest.mark.django_db
+def test_warm_lines_shares_results_between_processes(django_assert_num_queries):
+    lines = ["1 teaspoon salt", "2 large eggs", "  1 teaspoon   salt", ""]
+    clear_parse_cache()
+    with django_assert_num_queries(2):  # one lookup, one bulk insert
+        assert warm_lines(lines) == 2
+
+    row = ParsedIngredientLine.objects.get(line_hash=line_hash("2 large eggs"))
+    assert row.result == parse_ingredient_line("2 large eggs")
+
+    # A fresh process (empty memo) is served from the table without parsing
+    clear_parse_cache()
+    with django_assert_num_queries(1):
+        assert warm_lines(lines) == 0
+    parse_ingredient_line("1 teaspoon salt")
+    assert ingredient_processor.parse_cache_stats()["misses"] == 0
+    clear_parse_cache()
+
+
+@pytest.mark.django_db
+def test_warm_parse_cache_command_warms_and_purges(monkeypatch):
+    recipe = Recipe.objects.create(title="Soup", instructions="")
+    water = Ingredient.objects.create(name="Water")
+    for order, raw_text in enumerate(["2 cups Water", "2 cups Water", "1 tsp Salt"]):
+        RecipeIngredient.objects.create(recipe=recipe, ingredient=water, raw_text=raw_text, order=order)
+    clear_parse_cache()
+
+    call_command('warm_parse_cache', stdout=StringIO())
+    assert ParsedIngredientLine.objects.count() == 2
+
+    monkeypatch.setattr(ingredient_processor, "PARSER_VERSION", ingredient_processor.PARSER_VERSION + 1)
+    out = StringIO()
+    call_command('warm_parse_cache', '--purge', stdout=out)
+
+    assert "Deleted 2 cached parses" in out.getvalue()
+    assert set(ParsedIngredientLine.objects.values_list('parser_version', flat=True)) == {
+        ingredient_processor.PARSER_VERSION
+    }
+    assert ParsedIngredientLine.objects.count() == 2
+    clear_parse_cache()
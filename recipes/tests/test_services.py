@@ -1,17 +1,26 @@
 from datetime import timedelta
+from io import StringIO
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from django.core.management import call_command
 from django.utils import timezone
 
-from recipes.models import MealPlan, Recipe
-from recipes.services import NotificationService
+from recipes.models import (
+    ImportBatch,
+    ImportBatchItem,
+    MealPlan,
+    Recipe,
+    RecipeIngredient,
+)
+from recipes.parsers.snapshot import ParsedRecipe
+from recipes.services import NotificationService, RecipeImportService
 
 
 @pytest.mark.django_db
 @pytest.mark.asyncio
 @patch('recipes.services.timezone.localtime')
-@patch('recipes.services.httpx.AsyncClient.post')
+@patch('httpx.AsyncClient.post')
 async def test_check_and_send_upcoming_meals_dummy_mode(mock_post, mock_localtime, settings):
     # Setup dummy mode
     settings.ENABLE_COOKING_NOTIFICATIONS = False
@@ -48,9 +57,9 @@ async def test_check_and_send_upcoming_meals_dummy_mode(mock_post, mock_localtim
 @pytest.mark.django_db
 @pytest.mark.asyncio
 @patch('recipes.services.timezone.localtime')
-@patch('recipes.services.httpx.AsyncClient')
-async def test_check_and_send_upcoming_meals_live_mode(mock_client_class, mock_localtime, settings):
-    # Setup live mode and mock the context manager httpx post response
+@patch('recipes.services.get_async_client')
+async def test_check_and_send_upcoming_meals_live_mode(mock_get_client, mock_localtime, settings):
+    # Setup live mode and mock the shared httpx client post response
     settings.ENABLE_COOKING_NOTIFICATIONS = True
     settings.BEACON_URL = "http://testserver.local"
     
@@ -58,7 +67,7 @@ async def test_check_and_send_upcoming_meals_live_mode(mock_client_class, mock_l
     mock_post = AsyncMock()
     mock_post.raise_for_status = lambda: None
     mock_client.post.return_value = mock_post
-    mock_client_class.return_value.__aenter__.return_value = mock_client
+    mock_get_client.return_value = mock_client
     
     # Fix time to noon to prevent midnight wraparound flakes in CI
     fixed_now = timezone.now().astimezone(timezone.get_current_timezone()).replace(hour=12, minute=0, second=0, microsecond=0)
@@ -98,3 +107,134 @@ async def test_check_and_send_upcoming_meals_live_mode(mock_client_class, mock_l
     # Ensure db was updated
     await plan.arefresh_from_db()
     assert plan.notification_sent is True
+
+@pytest.mark.django_db
+@patch('recipes.tasks.import_recipe_task.delay')
+def test_create_import_batch_dedupes_and_queues(mock_delay, django_capture_on_commit_callbacks):
+    existing = Recipe.objects.create(title="Already Here", original_url="https://example.com/already")
+    urls = [
+        "https://example.com/new-one",
+        "https://example.com/new-one",
+        "# a comment",
+        "",
+        "https://example.com/already",
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        batch = RecipeImportService.create_batch(urls, tags=["bulk"])
+
+    assert batch.status_counts() == {"pending": 1, "imported": 0, "duplicate": 1, "failed": 0}
+    assert batch.items.get(url="https://example.com/already").recipe == existing
+    mock_delay.assert_called_once_with(batch.items.get(url="https://example.com/new-one").id)
+
+@pytest.mark.django_db
+@patch('recipes.services.ParserRegistry.get_parser')
+def test_run_batch_item_imports_recipe(mock_get_parser):
+    mock_get_parser.return_value.to_snapshot.return_value = ParsedRecipe(
+        url="https://example.com/soup", title="Soup", description="", ingredients=("2 cups water", "1 tsp salt"),
+        instructions="Boil.", image_url="", prep_time=5, cook_time=10, total_time=15, servings=2,
+    )
+    batch = ImportBatch.objects.create(tags=["bulk"])
+    item = ImportBatchItem.objects.create(batch=batch, url="https://example.com/soup")
+
+    item = RecipeImportService.run_batch_item(item.id)
+
+    assert item.status == ImportBatchItem.Status.IMPORTED
+    assert item.recipe.title == "Soup"
+    assert item.recipe.recipe_ingredients.count() == 2
+    assert list(item.recipe.tags.values_list("name", flat=True)) == ["bulk"]
+    assert batch.is_complete
+
+@pytest.mark.django_db
+@patch('recipes.services.ParserRegistry.get_parser')
+def test_reparse_from_snapshot_runs_offline(mock_get_parser):
+    snapshot = ParsedRecipe(
+        url="https://soup.test/soup", title="Soup", description="", ingredients=("2 cups water",),
+        instructions="Boil.", image_url="", prep_time=5, cook_time=10, total_time=15, servings=2,
+        json_ld={"@type": "Recipe", "name": "Better Soup", "recipeIngredient": ["2 cups water", "1 tsp salt"]},
+    )
+    mock_get_parser.return_value.to_snapshot.return_value = snapshot
+    recipe, _ = RecipeImportService.import_from_url(snapshot.url)
+    assert ParsedRecipe.unpack(recipe.source_snapshot).json_ld == snapshot.json_ld
+    Recipe.objects.create(title="Typed In", instructions="")
+
+    with patch('recipes.parsers.fetch.http_clients.stream', side_effect=AssertionError("network used")):
+        call_command('reparse_recipes', '--all', '--from-snapshot', stdout=StringIO())
+
+    recipe.refresh_from_db()
+    assert recipe.title == "Better Soup"
+    assert recipe.servings == 2  # not in the JSON-LD, kept from the stored parse
+    assert recipe.recipe_ingredients.count() == 2
+
+@pytest.mark.django_db
+def test_reparse_with_workers_matches_serial_run():
+    recipes = []
+    for n in range(3):
+        stored = ParsedRecipe(
+            url=f"https://soup.test/soup-{n}", title=f"Soup {n}", description="", ingredients=(),
+            instructions="Boil.", image_url="", prep_time=5, cook_time=10, total_time=15, servings=2,
+            json_ld={"@type": "Recipe", "name": f"Soup {n}", "recipeIngredient": ["2 cups water", f"{n + 1} tsp salt"]},
+        )
+        recipes.append(Recipe.objects.create(title=f"Soup {n}", instructions="", source_snapshot=stored.pack()))
+    broken = Recipe.objects.create(title="Broken", instructions="", source_snapshot=b"not a snapshot")
+
+    def saved():
+        return {r.pk: list(r.recipe_ingredients.values_list('raw_text', flat=True)) for r in recipes}
+
+    call_command('reparse_recipes', '--all', '--from-snapshot', stdout=StringIO(), stderr=StringIO())
+    serial = saved()
+
+    RecipeIngredient.objects.filter(recipe__in=recipes).delete()
+    out, err = StringIO(), StringIO()
+    call_command('reparse_recipes', '--all', '--from-snapshot', '--workers=2', '--batch-size=2', stdout=out, stderr=err)
+
+    assert saved() == serial
+    assert serial[recipes[2].pk] == ["2 cups Water", "3 tsp Salt"]
+    assert "with 2 workers" in out.getvalue()
+    assert f"Error processing recipe {broken.pk}" in err.getvalue()
+
+@pytest.mark.django_db
+@patch('recipes.services.ParserRegistry.get_parser')
+def test_import_short_circuits_to_existing_recipe(mock_get_parser):
+    snapshot = ParsedRecipe(
+        url="https://soup.test/lemon-soup/", title="Lemon Soup", description="", ingredients=("1 lemon",),
+        instructions="Boil.", image_url="", prep_time=5, cook_time=10, total_time=15, servings=2,
+        canonical_url="https://soup.test/lemon-soup",
+    )
+    mock_get_parser.return_value.to_snapshot.return_value = snapshot
+    recipe, created = RecipeImportService.import_from_url(snapshot.url)
+    assert created and recipe.canonical_url == "https://soup.test/lemon-soup"
+
+    # A tracking/AMP spelling of the same URL never reaches the parser
+    mock_get_parser.reset_mock()
+    same, created = RecipeImportService.import_from_url("https://www.soup.test/lemon-soup/amp/?utm_source=x")
+    assert (same, created) == (recipe, False)
+    mock_get_parser.assert_not_called()
+
+    # An unrelated URL whose page parses to the same recipe is matched by content hash
+    mock_get_parser.return_value.to_snapshot.return_value = ParsedRecipe(
+        **{**snapshot.to_dict(), "url": "https://mirror.test/soup", "canonical_url": "https://mirror.test/soup",
+           "title": "  LEMON soup", "ingredients": ("1  Lemon",)}
+    )
+    same, created = RecipeImportService.import_from_url("https://mirror.test/soup")
+    assert (same, created) == (recipe, False)
+    assert not Recipe.objects.filter(original_url="https://mirror.test/soup").exists()
+
+@pytest.mark.django_db
+@patch('recipes.tasks.import_recipe_task.delay')
+def test_batch_collapses_canonical_duplicates(mock_delay, django_capture_on_commit_callbacks):
+    existing = Recipe.objects.create(
+        title="Stew", original_url="https://stew.test/stew/", canonical_url="https://stew.test/stew"
+    )
+    urls = [
+        "https://stew.test/stew/?utm_source=newsletter",
+        "https://bread.test/loaf/",
+        "https://www.bread.test/loaf/?fbclid=1",
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        batch = RecipeImportService.create_batch(urls)
+
+    assert batch.status_counts() == {"pending": 1, "imported": 0, "duplicate": 1, "failed": 0}
+    assert batch.items.get(status="duplicate").recipe == existing
+    assert mock_delay.call_count == 1
@@ -0,0 +1,18 @@
+import pytest
+
+from recipes import units
+
+
+def test_convert_within_a_dimension_only():
+    assert units.convert(1, "cup", "tbsp") == pytest.approx(16)
+    assert units.convert(3, "Tsp.", "tablespoon") == pytest.approx(1)
+    assert units.convert(2, "lbs", "oz") == pytest.approx(32)
+    assert units.convert(1, "cup", "g") is None
+    assert units.convert(1, "clove", "slice") is None
+
+
+def test_to_base_handles_count_and_unknown_units():
+    assert units.to_base(1.5, "kg") == (1500.0, "g")
+    assert units.to_base(2, "cans") == (2, "can")
+    assert units.to_base(1, "Knob") == (1, "knob")
+    assert units.to_base(3, "") == (3, "")
@@ -1,10 +1,14 @@
 import json
+from unittest.mock import patch
 
 import pytest
 from django.urls import reverse
 from django.utils import timezone
 
-from recipes.models import MealPlan, Recipe
+from recipes.ingredient_processor import FRACTION_TABLE, format_quantity
+from recipes.models import ImportBatch, MealPlan, Recipe
+from recipes.parsers.politeness import record_fetch_failure, reset_local_state
+from recipes.services import RecipeImportService
 
 
 @pytest.mark.django_db
@@ -85,3 +89,111 @@ def test_meal_plan_api_update(client):
     assert plan is not None
     assert plan.recipe == recipe
     assert plan.ready_at.strftime('%H:%M') == '12:30'
+
+@pytest.mark.django_db
+@patch('recipes.tasks.import_recipe_task.delay')
+def test_bulk_import_api_creates_batch(mock_delay, client):
+    payload = {'urls': ['https://example.com/a', 'https://example.com/b'], 'tags': ['weeknight']}
+    response = client.post(reverse('recipes:bulk_import'), data=json.dumps(payload), content_type='application/json')
+    assert response.status_code == 202
+
+    status = client.get(response.json()['status_url']).json()
+    assert status['counts']['pending'] == 2
+    assert [item['url'] for item in status['items']] == payload['urls']
+    assert status['is_complete'] is False
+
+@pytest.mark.django_db
+@patch('recipes.tasks.import_recipe_task.delay')
+def test_bulk_import_api_validates_tags_and_is_future(mock_delay, client):
+    def post(**extra):
+        payload = {'urls': ['https://example.com/a'], **extra}
+        return client.post(reverse('recipes:bulk_import'), data=json.dumps(payload), content_type='application/json')
+
+    response = post(tags='dinner, quick', is_future=True)
+    assert response.status_code == 202
+    batch = ImportBatch.objects.get(pk=response.json()['batch_id'])
+    assert (batch.tags, batch.is_future) == (['dinner', 'quick'], True)
+
+    assert post(tags=['dinner', 3]).status_code == 400
+    assert post(tags={'name': 'dinner'}).status_code == 400
+    assert post(is_future='false').status_code == 400
+    assert ImportBatch.objects.count() == 1
+
+@pytest.mark.django_db
+def test_fetch_status_lists_and_closes_breakers(client, settings):
+    settings.FETCH_STATE_REDIS_URL = ""
+    settings.FETCH_BREAKER_THRESHOLD = 1
+    reset_local_state()
+    record_fetch_failure("https://dead.example/recipe", "ConnectTimeout")
+
+    response = client.get(reverse('recipes:fetch_status'))
+    assert response.status_code == 200
+    assert [b['domain'] for b in response.context['breakers']] == ['dead.example']
+    assert response.context['failed_urls'][0]['reason'] == 'ConnectTimeout'
+    assert set(response.context['parse_paths']) == {'json_ld', 'scraper_cached_html', 'network_refetch'}
+
+    client.post(reverse('recipes:fetch_status'), {'domain': 'dead.example'})
+    assert client.get(reverse('recipes:fetch_status')).context['breakers'] == []
+    reset_local_state()
+
+@pytest.mark.django_db
+@patch('recipes.views.ParserRegistry.get_parser')
+def test_import_view_redirects_to_existing_recipe_without_parsing(mock_get_parser, client):
+    recipe = Recipe.objects.create(
+        title="Stew", original_url="https://stew.test/stew/", canonical_url="https://stew.test/stew"
+    )
+
+    response = client.post(reverse('recipes:add_recipe'), {'original_url': "https://www.stew.test/stew?utm_source=x"})
+
+    assert response.status_code == 302
+    assert response.url == recipe.get_absolute_url()
+    mock_get_parser.assert_not_called()
+
+@pytest.mark.django_db
+def test_scale_api_and_detail_page(client):
+    recipe = Recipe.objects.create(title="Scaled Cookies", instructions="Bake.", servings=4)
+    RecipeImportService.save_ingredients(recipe, ["1 1/2 cups flour", "12 oz chocolate chips", "a pinch of salt"])
+
+    response = client.get(reverse('recipes:scale_recipe_api', kwargs={'pk': recipe.pk}), {'servings': '8'})
+    data = response.json()
+    assert data['scale'] == 2.0
+    assert data['servings'] == 8
+    assert [(row['quantity'], row['unit']) for row in data['ingredients'][:2]] == [('3', 'cups'), ('1 lb 8', 'oz')]
+
+    response = client.get(reverse('recipes:detail_recipe', kwargs={'pk': recipe.pk}), {'scale': '1/2'})
+    quantities = [item['quantity'] for item in response.context['ingredients_with_confidence']]
+    assert quantities[:2] == ['¾', '6']
+
+    bad = client.get(reverse('recipes:scale_recipe_api', kwargs={'pk': recipe.pk}), {'scale': '-1'})
+    assert bad.status_code == 400
+
+@pytest.mark.django_db
+def test_scale_buttons_win_over_the_servings_field(client):
+    recipe = Recipe.objects.create(title="Scaled Soup", instructions="Simmer.", servings=4)
+    RecipeImportService.save_ingredients(recipe, ["2 cups broth"])
+    url = reverse('recipes:detail_recipe', kwargs={'pk': recipe.pk})
+
+    # A scale button and a filled-in servings field arriving together
+    response = client.get(url, {'scale': '2', 'servings': '4'})
+    assert response.context['scale'] == 2.0
+    assert response.context['ingredients_with_confidence'][0]['quantity'] == '4'
+
+    # 1x resets a page that was scaled by servings
+    assert client.get(url, {'scale': '1', 'servings': '8'}).context['scale'] == 1.0
+    assert client.get(url, {'servings': '8'}).context['scale'] == 2.0
+
+    # The buttons and the servings field submit separately
+    html = response.content.decode()
+    forms = html.split('<form method="GET"')[1:]
+    assert not any('name="scale"' in form and 'name="servings"' in form for form in forms)
+
+@pytest.mark.django_db
+def test_scaling_a_merged_line_shows_whole_numbers(client):
+    recipe = Recipe.objects.create(title="Merged Flour", instructions="Mix.", servings=2)
+    RecipeImportService.save_ingredients(recipe, ["1 cup flour", "1 tsp flour"])
+
+    response = client.get(reverse('recipes:scale_recipe_api', kwargs={'pk': recipe.pk}), {'scale': '3'})
+    row, = response.json()['ingredients']
+    assert (row['quantity'], row['unit']) == ('3', 'cup')
+    assert not any(entry.endswith('/1') for entry in FRACTION_TABLE)
+    assert format_quantity(3.1) == '3 1/10'
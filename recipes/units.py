@@ -0,0 +1,119 @@
+"""
+Units of measure and conversions between them.
+
+Every spelling of a unit ("tbsp", "Tablespoons", "tbsp.") resolves to one
+Unit through the UNITS table, which is built once at import time. A Unit knows
+its dimension and its size in that dimension's base unit: millilitres for
+volume and grams for mass. Count units such as cloves, cans and pinches only
+merge with other spellings of themselves.
+
+Converting is two lookups and a multiplication, so consolidating
+"1 cup" and "2 tbsp" of the same food costs no more than adding two
+quantities in the same unit.
+"""
+from dataclasses import dataclass
+
+VOLUME = "volume"
+MASS = "mass"
+COUNT = "count"
+
+BASE_UNITS = {VOLUME: "ml", MASS: "g"}
+
+# US customary volumes are whole multiples of the teaspoon, so their ratios stay exact
+_TSP = 4.92892159375
+
+# (dimension, canonical name, size in the base unit, spellings)
+UNIT_DEFINITIONS = (
+    (VOLUME, "ml", 1.0, ("ml", "mls", "milliliter", "milliliters", "millilitre", "millilitres")),
+    (VOLUME, "cl", 10.0, ("cl", "centiliter", "centiliters", "centilitre", "centilitres")),
+    (VOLUME, "dl", 100.0, ("dl", "deciliter", "deciliters", "decilitre", "decilitres")),
+    (VOLUME, "l", 1000.0, ("l", "liter", "liters", "litre", "litres")),
+    (VOLUME, "tsp", _TSP, ("tsp", "tsps", "teaspoon", "teaspoons")),
+    (VOLUME, "tbsp", _TSP * 3, ("tbsp", "tbsps", "tbs", "tbl", "tablespoon", "tablespoons")),
+    (VOLUME, "fl oz", _TSP * 6, ("fl oz", "fl. oz", "floz", "fluid ounce", "fluid ounces")),
+    (VOLUME, "cup", _TSP * 48, ("cup", "cups")),
+    (VOLUME, "pint", _TSP * 96, ("pint", "pints", "pt", "pts")),
+    (VOLUME, "quart", _TSP * 192, ("quart", "quarts", "qt", "qts")),
+    (VOLUME, "gallon", _TSP * 768, ("gallon", "gallons", "gal", "gals")),
+    (MASS, "mg", 0.001, ("mg", "milligram", "milligrams")),
+    (MASS, "g", 1.0, ("g", "gs", "gram", "grams", "gramme", "grammes")),
+    (MASS, "kg", 1000.0, ("kg", "kgs", "kilogram", "kilograms", "kilo", "kilos")),
+    (MASS, "oz", 28.349523125, ("oz", "ozs", "ounce", "ounces")),
+    (MASS, "lb", 453.59237, ("lb", "lbs", "pound", "pounds")),
+    *(
+        (COUNT, name, 1.0, (name, plural))
+        for name, plural in (
+            ("pinch", "pinches"), ("dash", "dashes"), ("drizzle", "drizzles"), ("handful", "handfuls"),
+            ("sprig", "sprigs"), ("clove", "cloves"), ("slice", "slices"), ("piece", "pieces"),
+            ("bunch", "bunches"), ("can", "cans"), ("bottle", "bottles"), ("jar", "jars"),
+            ("package", "packages"), ("packet", "packets"), ("stick", "sticks"), ("drop", "drops"),
+            ("sheet", "sheets"), ("cube", "cubes"), ("ear", "ears"), ("fillet", "fillets"),
+        )
+    ),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Unit:
+    name: str
+    dimension: str
+    # Size in BASE_UNITS[dimension]; 1 for count units
+    factor: float
+
+    @property
+    def base_unit(self) -> str:
+        return BASE_UNITS.get(self.dimension, self.name)
+
+    @property
+    def group(self) -> str:
+        """Units with the same group can be added together."""
+        return self.dimension if self.dimension in BASE_UNITS else self.name
+
+
+UNITS: dict[str, Unit] = {
+    spelling: unit
+    for dimension, name, factor, spellings in UNIT_DEFINITIONS
+    for unit in (Unit(name, dimension, factor),)
+    for spelling in spellings
+}
+
+
+def lookup(unit: str | None) -> Unit | None:
+    """The Unit for any known spelling, ignoring case and a trailing period."""
+    if not unit:
+        return None
+    return UNITS.get(unit.strip().lower().rstrip("."))
+
+
+def unit_group(unit: str | None) -> str:
+    """
+    What a quantity in this unit can be added to: its dimension for volumes
+    and masses, its canonical name for count units and the lowercased unit
+    itself when it is not in the table.
+    """
+    known = lookup(unit)
+    return known.group if known else (unit or "").strip().lower()
+
+
+def convert(quantity: float, from_unit: str | None, to_unit: str | None) -> float | None:
+    """quantity in from_unit expressed in to_unit, or None if they measure different things."""
+    if from_unit == to_unit:
+        return quantity
+    source, target = lookup(from_unit), lookup(to_unit)
+    if source is None or target is None:
+        return quantity if unit_group(from_unit) == unit_group(to_unit) else None
+    if source.group != target.group:
+        return None
+    return quantity * source.factor / target.factor
+
+
+def to_base(quantity: float, unit: str | None) -> tuple[float, str]:
+    """
+    quantity in its dimension's base unit (ml or g), rounded to 3 places.
+    Count units come back under their canonical name and anything unknown
+    is returned as given.
+    """
+    known = lookup(unit)
+    if known is None:
+        return quantity, (unit or "").strip().lower()
+    return round(quantity * known.factor, 3), known.base_unit
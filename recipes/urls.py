@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path
 
 from recipes import views
+from recipes.images import IMAGE_DIR
 
 app_name = "recipes"
 
@@ -24,4 +26,9 @@ urlpatterns = [
     path("api/recipes/search/", views.search_recipes_api, name="search_recipes_api"),
     path("api/recipes/toggle-menu/", views.toggle_menu_status, name="toggle_menu_status"),
     path("api/recipes/sidebar/", views.sidebar_pagination_api, name="sidebar_pagination_api"),
+    path("api/recipes/<int:pk>/scale/", views.scale_recipe_api, name="scale_recipe_api"),
+    path("api/recipes/bulk-import/", views.bulk_import_api, name="bulk_import"),
+    path("api/recipes/bulk-import/<int:pk>/", views.bulk_import_status_api, name="bulk_import_status"),
+    path("fetch-status/", views.FetchStatusView.as_view(), name="fetch_status"),
+    path(f"{settings.MEDIA_URL.strip('/')}/{IMAGE_DIR}/<path:path>", views.recipe_image_file, name="recipe_image_file"),
 ]
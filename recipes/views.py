@@ -3,27 +3,44 @@ import json
 import logging
 import operator
 from functools import reduce
+from pathlib import Path
 
+from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Q
-from django.http import HttpResponseRedirect, JsonResponse
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.utils.timezone import now
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+from django.views.generic import (
+    CreateView,
+    DeleteView,
+    DetailView,
+    ListView,
+    TemplateView,
+    UpdateView,
+)
+from django.views.static import serve
 
 from .forms import RecipeImportForm, RecipeManualForm, RecipeUpdateForm
-from .ingredient_processor import parse_ingredient_line, process_ingredients
+from .images import IMAGE_DIR, variant_url
 from .mixins import AdminRequiredMixin, require_admin
-from .models import Ingredient, MealPlan, Recipe, RecipeIngredient, RecipeTag
+from .models import ImportBatch, MealPlan, Recipe, RecipeTag
+from .parsers.politeness import (
+    close_breaker,
+    fetch_health,
+    forget_failed_url,
+    parse_path_counts,
+)
 from .parsers.registry import ParserRegistry
+from .scaling import resolve_factor, scaled_ingredients
+from .services import RecipeImportService
 from .utils import clean_instruction_line, is_valid_ingredient
 
 logger = logging.getLogger(__name__)
@@ -153,12 +170,27 @@ class RecipeDetailView(DetailView):
 
         context["instructions_list"] = [line for line in recipe.instructions.splitlines() if line.strip()]
 
+        # ?scale=2 or ?servings=6 shows the ingredients at another size
+        try:
+            factor = resolve_factor(recipe, self.request.GET.get("scale"), self.request.GET.get("servings"))
+        except ValueError as e:
+            factor = 1.0
+            context["scale_error"] = str(e)
+        scaled = {row["id"]: row for row in scaled_ingredients(recipe, factor)} if factor != 1 else {}
+        context["scale"] = factor
+        context["scale_choices"] = [(0.5, "½×"), (1.0, "1×"), (2.0, "2×"), (3.0, "3×")]
+        context["scaled_servings"] = round(recipe.servings * factor, 1) if recipe.servings and factor != 1 else None
+
         ingredients_with_confidence = []
         for i in recipe.recipe_ingredients.all():
             is_confident = is_valid_ingredient(i.quantity, i.unit, i.ingredient, raw_text=i.raw_text)
+            row = scaled.get(i.pk)
             ingredients_with_confidence.append({
                 "ingredient": i,
-                "is_confident": is_confident
+                "is_confident": is_confident,
+                "quantity": row["quantity"] if row else i.quantity,
+                "unit": row["unit"] if row else i.unit,
+                "scaled": bool(row and row["scaled"]),
             })
         context["ingredients_with_confidence"] = ingredients_with_confidence
 
@@ -188,26 +220,38 @@ class RecipeCreateView(CreateView):
         kwargs['is_readonly'] = getattr(self.request, 'is_readonly', False)
         return kwargs
 
+    def _already_saved(self, recipe):
+        messages.info(self.request, f'"{recipe.title}" is already in your recipes.')
+        return HttpResponseRedirect(recipe.get_absolute_url())
+
     def form_valid(self, form):
         original_url = form.cleaned_data["original_url"]
 
+        # Same recipe under another spelling of the URL: no fetch, no parse
+        existing = RecipeImportService.find_existing(original_url)
+        if existing:
+            return self._already_saved(existing)
+
         try:
-            parser = ParserRegistry.get_parser(original_url)
-            form.instance.title = parser.title
-            form.instance.description = parser.description
-            form.instance.prep_time = parser.prep_time
-            form.instance.cook_time = parser.cook_time
-            form.instance.total_time = parser.total_time
-            form.instance.servings = parser.servings
-            form.instance.instructions = parser.instructions
-            form.instance.image_url = parser.image_url
+            # A throttled site fails the form quickly instead of holding the worker
+            parser = ParserRegistry.get_parser(original_url, max_wait=settings.FETCH_INTERACTIVE_MAX_WAIT)
+            snapshot = parser.to_snapshot()
+            duplicate = RecipeImportService.find_duplicate(snapshot)
+            if duplicate:
+                return self._already_saved(duplicate)
+
+            for field, value in snapshot.as_recipe_fields().items():
+                setattr(form.instance, field, value)
             form.instance.original_url = original_url
+            form.instance.source_snapshot = snapshot.pack()
+            for field, value in RecipeImportService.identity_fields(snapshot, original_url).items():
+                setattr(form.instance, field, value)
 
             if getattr(self.request, 'is_readonly', False):
                 form.instance.is_future = True
                 form.instance.is_on_menu = False
 
-            ingredient_lines = parser.ingredients
+            ingredient_lines = snapshot.ingredients
         except Exception:
             logger.exception(f"RecipeCreateView: Parsing failed for {original_url}")
             self.request.session['failed_recipe_url'] = original_url
@@ -232,44 +276,13 @@ class RecipeCreateView(CreateView):
             raise
 
         try:
-            # Parse all lines first
-            parsed_list = []
-            for line in ingredient_lines:
-                parsed_item = parse_ingredient_line(line)
-                parsed_list.append(parsed_item)
-            
-            # Process (consolidate, format, normalize)
-            processed_ingredients = process_ingredients(parsed_list)
-
-            for idx, item in enumerate(processed_ingredients):
-                name = item["food"]
-                ingredient, _ = Ingredient.objects.get_or_create(name=name)
-                
-                RecipeIngredient.objects.create(
-                    recipe=self.object,
-                    ingredient=ingredient,
-                    raw_text=f"{item['display_quantity']} {item['unit']} {name}".strip(),
-                    quantity=item["display_quantity"],
-                    unit=item["unit"],
-                    order=idx
-                )
+            RecipeImportService.save_ingredients(self.object, ingredient_lines)
         except Exception:
             logger.exception("Failed to process ingredients")
             raise
 
         try:
-            raw_tags = form.cleaned_data["tags"]
-            if isinstance(raw_tags, str):
-                tag_names = [tag.strip() for tag in raw_tags.split(",") if tag.strip()]
-            else:
-                tag_names = list(raw_tags)
-
-            tag_objs = []
-            for name in tag_names:
-                slug = name.lower().replace(" ", "-")
-                tag_obj, created = RecipeTag.objects.get_or_create(name=name, defaults={"slug": slug})
-                tag_objs.append(tag_obj)
-            self.object.tags.set(tag_objs)
+            RecipeImportService.set_tags(self.object, form.cleaned_data["tags"])
         except (TypeError, AttributeError):
             logger.exception("Tag processing failed")
             raise
@@ -343,44 +356,11 @@ class RecipeManualCreateView(CreateView):
 
         ingredients_text = form.cleaned_data.get('ingredients_text', '')
         try:
-            # Parse all lines first
-            parsed_list = []
-            for line in ingredients_text.split('\n'):
-                line = line.strip()
-                if line:
-                    parsed_item = parse_ingredient_line(line)
-                    parsed_list.append(parsed_item)
-            
-            # Process (consolidate, format, normalize)
-            processed_ingredients = process_ingredients(parsed_list)
-
-            for idx, item in enumerate(processed_ingredients):
-                name = item["food"]
-                ingredient, _ = Ingredient.objects.get_or_create(name=name)
-                
-                RecipeIngredient.objects.create(
-                    recipe=self.object,
-                    ingredient=ingredient,
-                    raw_text=f"{item['display_quantity']} {item['unit']} {name}".strip(),
-                    quantity=item["display_quantity"],
-                    unit=item["unit"],
-                    order=idx
-                )
+            RecipeImportService.save_ingredients(self.object, ingredients_text.split('\n'))
         except Exception:
             logger.exception("Failed to process manual ingredients")
 
-        raw_tags = form.cleaned_data["tags"]
-        if isinstance(raw_tags, str):
-            tag_names = [tag.strip() for tag in raw_tags.split(",") if tag.strip()]
-        else:
-            tag_names = list(raw_tags)
-
-        tag_objs = []
-        for name in tag_names:
-            slug = name.lower().replace(" ", "-")
-            tag_obj, created = RecipeTag.objects.get_or_create(name=name, defaults={"slug": slug})
-            tag_objs.append(tag_obj)
-        self.object.tags.set(tag_objs)
+        RecipeImportService.set_tags(self.object, form.cleaned_data["tags"])
 
         return response
 
@@ -412,17 +392,7 @@ class RecipeUpdateView(AdminRequiredMixin, UpdateView):
         form.instance.instructions = clean_instruction_line(form.instance.instructions)
 
         response = super().form_valid(form)
-        raw_tags = form.cleaned_data["tags"]
-        if isinstance(raw_tags, str):
-            tag_names = [tag.strip() for tag in raw_tags.split(",") if tag.strip()]
-        else:
-            tag_names = list(raw_tags)
-        tag_objs = []
-        for name in tag_names:
-            slug = name.lower().replace(" ", "-")
-            tag_obj, created = RecipeTag.objects.get_or_create(name=name, defaults={"slug": slug})
-            tag_objs.append(tag_obj)
-        self.object.tags.set(tag_objs)
+        RecipeImportService.set_tags(self.object, form.cleaned_data["tags"])
 
         return response
 
@@ -613,10 +583,39 @@ def search_recipes_api(request):
             'title': r.title,
             'is_future': r.is_future,
             'is_on_menu': r.is_on_menu,
-            'image_url': r.image_url
+            'image_url': variant_url(r, 'card'),
+            'thumb_url': variant_url(r, 'thumb'),
         })
         
     return JsonResponse({'recipes': data})
+
+def scale_recipe_api(request, pk):
+    """API endpoint for a recipe's ingredients at ?scale=<factor> or ?servings=<n>."""
+    recipe = get_object_or_404(Recipe, pk=pk)
+    try:
+        factor = resolve_factor(recipe, request.GET.get('scale'), request.GET.get('servings'))
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    return JsonResponse({
+        'recipe_id': recipe.pk,
+        'scale': factor,
+        'servings': round(recipe.servings * factor, 1) if recipe.servings else None,
+        'ingredients': scaled_ingredients(recipe, factor),
+    })
+
+def recipe_image_file(request, path):
+    """
+    Serve a cached recipe image variant in development. File names contain
+    a hash of the source image, so a name never points at different bytes
+    and browsers may keep them for a year without revalidating. Outside
+    DEBUG the web server serves MEDIA_ROOT and this view returns 404.
+    """
+    if not settings.DEBUG:
+        raise Http404("Media files are served by the web server")
+    response = serve(request, path, document_root=Path(settings.MEDIA_ROOT) / IMAGE_DIR)
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
 class MealPlanKioskView(MealPlanView):
     template_name = "recipes/meal_plan_kiosk.html"
 
@@ -624,3 +623,82 @@ class MealPlanKioskView(MealPlanView):
         context = super().get_context_data(**kwargs)
         context['today'] = now().date()
         return context
+
+@csrf_exempt
+@require_POST
+@require_admin
+def bulk_import_api(request):
+    """API endpoint to queue a list of recipe URLs for background import."""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+
+    urls = data.get('urls')
+    if isinstance(urls, str):
+        urls = urls.splitlines()
+    if not isinstance(urls, list) or not urls:
+        return JsonResponse({'status': 'error', 'message': 'Provide a non-empty list of urls'}, status=400)
+
+    is_future = data.get('is_future', False)
+    if not isinstance(is_future, bool):
+        return JsonResponse({'status': 'error', 'message': 'is_future must be true or false'}, status=400)
+    try:
+        tags = RecipeImportService.tag_names(data.get('tags') or [])
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    batch = RecipeImportService.create_batch([str(url) for url in urls], is_future=is_future, tags=tags)
+    return JsonResponse({
+        'status': 'success',
+        'batch_id': batch.pk,
+        'status_url': reverse('recipes:bulk_import_status', kwargs={'pk': batch.pk}),
+        'counts': batch.status_counts(),
+    }, status=202)
+
+def bulk_import_status_api(request, pk):
+    """API endpoint to report the progress of an import batch."""
+    batch = get_object_or_404(ImportBatch, pk=pk)
+    items = [
+        {
+            'url': item.url,
+            'status': item.status,
+            'recipe_id': item.recipe_id,
+            'error': item.error,
+        }
+        for item in batch.items.all()
+    ]
+    return JsonResponse({
+        'batch_id': batch.pk,
+        'created_at': batch.created_at,
+        'is_complete': batch.is_complete,
+        'counts': batch.status_counts(),
+        'items': items,
+    })
+
+class FetchStatusView(AdminRequiredMixin, TemplateView):
+    """Open circuit breakers, recently failed URLs and parse path counts, shared by every worker."""
+    template_name = 'recipes/fetch_status.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        health = fetch_health()
+        context.update({
+            'breakers': health['breakers'],
+            'failed_urls': health['failed_urls'],
+            'parse_paths': parse_path_counts(),
+            'failure_ttl': settings.FETCH_FAILURE_TTL,
+            'breaker_threshold': settings.FETCH_BREAKER_THRESHOLD,
+            'breaker_cooldown': settings.FETCH_BREAKER_COOLDOWN,
+        })
+        return context
+
+    def post(self, request, *args, **kwargs):
+        """Close a breaker or forget a failed URL so the next import tries it again."""
+        if domain := request.POST.get('domain'):
+            close_breaker(domain)
+            messages.success(request, f'Closed the circuit breaker for {domain}.')
+        if url := request.POST.get('url'):
+            forget_failed_url(url)
+            messages.success(request, f'{url} will be fetched again on the next import.')
+        return HttpResponseRedirect(reverse('recipes:fetch_status'))
@@ -126,7 +126,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const response = await fetch(`/api/recipes/search/?q=${encodeURIComponent(query)}`);
             const data = await response.json();
             document.getElementById('sidebar-results').innerHTML = `<h4 class="sidebar-header" style="margin-top:0">Search Results</h4><div class="space-y-2">${data.recipes.map(r => {
-                const img = r.image_url ? `<img src="${r.image_url}" class="w-10 h-10 rounded-lg object-cover">` : `<div class="w-10 h-10 rounded-lg bg-gray-200 flex items-center justify-center text-[10px] font-black">${r.title.charAt(0)}</div>`;
+                const img = r.image_url ? `<img src="${r.thumb_url || r.image_url}" class="w-10 h-10 rounded-lg object-cover">` : `<div class="w-10 h-10 rounded-lg bg-gray-200 flex items-center justify-center text-[10px] font-black">${r.title.charAt(0)}</div>`;
                 return `<div class="recipe-card p-2 bg-gray-50 rounded-xl flex items-center gap-3 cursor-grab hover:bg-white border border-transparent hover:border-gray-100 transition-all group" draggable="true" data-id="${r.id}" data-title="${r.title}" data-image="${r.image_url || ''}">${img}<span class="font-bold text-gray-700 text-xs truncate">${r.title}</span></div>`;
             }).join('')}</div>`;
         };